@@ -27,7 +27,9 @@ class RouteGenerator {
       case Routes.forgotPassword:
         return MaterialPageRoute(builder: (_) => const ForgotPasswordScreen());
       case Routes.verifyOtp:
-        return MaterialPageRoute(builder: (_) => const VerifyOtpScreen());
+        return MaterialPageRoute(
+          builder: (_) => VerifyOtpScreen(email: settings.arguments as String),
+        );
       case Routes.dashboard:
         return MaterialPageRoute(builder: (_) => const DashboardScreen());
       case Routes.products:
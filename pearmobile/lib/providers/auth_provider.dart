@@ -10,6 +10,7 @@ class AuthProvider with ChangeNotifier {
   User? _user;
   bool _loading = false;
   String _error = '';
+  String? _resetToken;
 
   User? get user => _user;
   bool get isAuthenticated => _user != null;
@@ -45,8 +46,10 @@ class AuthProvider with ChangeNotifier {
     return await _execute(() => _authService.forgotPassword(email));
   }
 
-  Future<bool> verifyOtp(String otp) async {
-    return await _execute(() => _authService.verifyOtp(otp));
+  Future<bool> verifyOtp(String email, String otp) async {
+    return await _execute(() async {
+      _resetToken = await _authService.verifyOtp(email, otp);
+    });
   }
 
   Future<void> logout() async {
@@ -67,8 +70,16 @@ class AuthProvider with ChangeNotifier {
     if (newPassword != confirmPassword) {
       throw Exception("Passwords do not match.");
     }
-    // TODO: Implement the actual password reset logic, e.g., make an API call.
-    return true;
+    final resetToken = _resetToken;
+    if (resetToken == null) {
+      throw Exception("Verify the code from your email first.");
+    }
+    final success = await _execute(
+        () => _authService.resetPassword(resetToken, newPassword));
+    if (success) {
+      _resetToken = null;
+    }
+    return success;
   }
 
   Future<void> _setLoadingState(bool state) async {
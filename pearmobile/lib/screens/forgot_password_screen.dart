@@ -35,7 +35,11 @@ class _ForgotPasswordScreenState extends State<ForgotPasswordScreen> {
 
         if (success && mounted) {
           // Navigate to OTP verification
-          Navigator.pushReplacementNamed(context, Routes.verifyOtp);
+          Navigator.pushReplacementNamed(
+            context,
+            Routes.verifyOtp,
+            arguments: _emailController.text.trim(),
+          );
         }
       } catch (e) {
         if (mounted) {
@@ -4,7 +4,10 @@ import 'package:pearmobile/providers/auth_provider.dart';
 import 'package:pearmobile/config/routes.dart';
 
 class VerifyOtpScreen extends StatefulWidget {
-  const VerifyOtpScreen({super.key});
+  // The address the code was sent to; the server checks codes per user.
+  final String email;
+
+  const VerifyOtpScreen({super.key, required this.email});
 
   @override
   State<VerifyOtpScreen> createState() => _VerifyOtpScreenState();
@@ -28,6 +31,7 @@ class _VerifyOtpScreenState extends State<VerifyOtpScreen> {
       try {
         final authProvider = Provider.of<AuthProvider>(context, listen: false);
         final success = await authProvider.verifyOtp(
+          widget.email,
           _otpController.text.trim(),
         );
 
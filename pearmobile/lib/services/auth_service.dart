@@ -60,21 +60,23 @@ class AuthService {
     }
   }
 
-  // Verify OTP
-  Future<void> verifyOtp(String otp) async {
+  // Verify OTP; returns the token that allows one password reset
+  Future<String> verifyOtp(String email, String otp) async {
     try {
-      await _apiService.post(ApiConfig.verifyOtp, {'otp': otp});
+      final response = await _apiService
+          .post(ApiConfig.verifyOtp, {'email': email, 'otp': otp});
+      return response['reset_token'];
     } catch (e) {
       rethrow;
     }
   }
 
   // Reset Password
-  Future<void> resetPassword(String password, String confirmPassword) async {
+  Future<void> resetPassword(String resetToken, String password) async {
     try {
       await _apiService.post(ApiConfig.resetPassword, {
+        'reset_token': resetToken,
         'password': password,
-        'confirmPassword': confirmPassword,
       });
     } catch (e) {
       rethrow;
@@ -0,0 +1,126 @@
+"""
+Inventory valuation aggregates and their daily rollups.
+
+``valuation()`` computes product counts, units in stock and inventory value
+(``price * stock``) in one grouped query, so clients no longer download the
+catalog to add it up. ``take_snapshot()`` stores the same per store/type
+figures for one day in ``InventorySnapshot``. Trend queries over months then
+read at most one row per store/type/day, never the catalog history. Run
+``manage.py snapshot_inventory`` daily (cron), or enqueue the
+``snapshot_inventory`` task.
+"""
+from datetime import date as Date, timedelta
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import Count, DecimalField, ExpressionWrapper, F, Sum
+from django.utils import timezone
+
+from .models import InventorySnapshot, Products
+from .routers import pinned_to_primary
+from .tasks import task
+
+GROUPS = {
+    "store": ("store",),
+    "type": ("type",),
+    "store,type": ("store", "type"),
+}
+
+# Output key -> the product lookup reading it from its dimension table.
+NAMES = {"store": "store__name", "type": "type__name"}
+
+CENTS = Decimal("0.01")
+
+VALUE = ExpressionWrapper(
+    F("price") * F("stock"), output_field=DecimalField(max_digits=20, decimal_places=2)
+)
+
+
+def money(value):
+    return str((value or Decimal(0)).quantize(CENTS))
+
+
+def filtered(queryset, store=None, type=None, lookups=None):
+    """Filter by store/type name; ``lookups`` maps each to its lookup path."""
+    lookups = lookups or {}
+    if store:
+        queryset = queryset.filter(**{lookups.get("store", "store"): store})
+    if type:
+        queryset = queryset.filter(**{lookups.get("type", "type"): type})
+    return queryset
+
+
+def by_name(row):
+    """Rename ``store__name``/``type__name`` keys back to ``store``/``type``."""
+    keys = {lookup: key for key, lookup in NAMES.items()}
+    return {keys.get(name, name): value for name, value in row.items()}
+
+
+def valuation(group_by=("store",), store=None, type=None):
+    """Totals plus one row per group, by descending value, in one query."""
+    keys = [NAMES[key] for key in group_by]
+    rows = [
+        by_name(row)
+        for row in filtered(Products.objects.all(), store, type, NAMES)
+        .values(*keys)
+        .annotate(products=Count("id"), units=Sum("stock"), value=Sum(VALUE))
+        .order_by("-value", *keys)
+    ]
+    return {
+        "totals": {
+            "products": sum(row["products"] for row in rows),
+            "units": sum(row["units"] or 0 for row in rows),
+            "value": money(sum((row["value"] or Decimal(0) for row in rows), Decimal(0))),
+        },
+        "groups": [{**row, "value": money(row["value"])} for row in rows],
+    }
+
+
+def take_snapshot(date=None):
+    """Replace the rollup rows for ``date`` (today) and return how many."""
+    date = date or timezone.localdate()
+    rows = (
+        Products.objects.values(*NAMES.values())
+        .annotate(products=Count("id"), units=Sum("stock"), value=Sum(VALUE))
+        .order_by()
+    )
+    with pinned_to_primary(), transaction.atomic():
+        snapshots = [
+            InventorySnapshot(
+                date=date,
+                store=row["store__name"],
+                type=row["type__name"],
+                products=row["products"],
+                units=row["units"] or 0,
+                value=(row["value"] or Decimal(0)).quantize(CENTS),
+            )
+            for row in rows
+        ]
+        InventorySnapshot.objects.filter(date=date).delete()
+        InventorySnapshot.objects.bulk_create(snapshots)
+    return len(snapshots)
+
+
+@task(name="snapshot_inventory")
+def snapshot_inventory(date=None):
+    return take_snapshot(Date.fromisoformat(date) if date else None)
+
+
+def trends(days=90, group_by=(), store=None, type=None, today=None):
+    """Daily totals from the snapshots, oldest first."""
+    today = today or timezone.localdate()
+    queryset = filtered(
+        InventorySnapshot.objects.filter(date__gt=today - timedelta(days=days)),
+        store,
+        type,
+    )
+    keys = ("date", *group_by)
+    rows = (
+        queryset.values(*keys)
+        .annotate(products=Sum("products"), units=Sum("units"), value=Sum("value"))
+        .order_by(*keys)
+    )
+    return [
+        {**row, "date": row["date"].isoformat(), "value": money(row["value"])}
+        for row in rows
+    ]
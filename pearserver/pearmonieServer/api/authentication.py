@@ -0,0 +1,101 @@
+import hashlib
+import threading
+
+from django.conf import settings
+from django.core.cache import caches
+from django.utils.translation import gettext_lazy as _
+from rest_framework import exceptions
+from rest_framework.authentication import TokenAuthentication
+from rest_framework.authtoken.models import Token
+
+from pearmonieServer.lru import LRUCache
+
+DEFAULTS = {
+    "MAXSIZE": 1024,
+    "LOCAL_TTL": 60,
+    "TTL": 300,
+    "CACHE_ALIAS": None,
+}
+
+
+def cache_settings():
+    return {**DEFAULTS, **getattr(settings, "TOKEN_AUTH_CACHE", {})}
+
+
+_local_cache = None
+_local_cache_lock = threading.Lock()
+
+
+def local_cache():
+    global _local_cache
+    if _local_cache is None:
+        with _local_cache_lock:
+            if _local_cache is None:
+                config = cache_settings()
+                _local_cache = LRUCache(config["MAXSIZE"], config["LOCAL_TTL"])
+    return _local_cache
+
+
+def shared_cache():
+    alias = cache_settings()["CACHE_ALIAS"]
+    return caches[alias] if alias else None
+
+
+def cache_key(key):
+    # Never use the raw token as a key in a shared cache.
+    return "auth-token:" + hashlib.sha256(key.encode()).hexdigest()
+
+
+def get_cached_token(key):
+    shared = shared_cache()
+    if shared is not None:
+        # Other workers revoke tokens here, so a local copy could outlive them.
+        return shared.get(cache_key(key))
+    return local_cache().get(key)
+
+
+def cache_token(token):
+    shared = shared_cache()
+    if shared is not None:
+        shared.set(cache_key(token.key), token, cache_settings()["TTL"])
+    else:
+        local_cache().set(token.key, token)
+
+
+def invalidate_token(key):
+    local_cache().delete(key)
+    shared = shared_cache()
+    if shared is not None:
+        shared.delete(cache_key(key))
+
+
+def invalidate_user(user):
+    for key in Token.objects.filter(user_id=user.pk).values_list("key", flat=True):
+        invalidate_token(key)
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    """
+    ``TokenAuthentication`` that resolves tokens from a cache before falling
+    back to the database: ``TOKEN_AUTH_CACHE["CACHE_ALIAS"]`` when configured,
+    otherwise an in-process LRU.
+
+    Entries are dropped on logout and whenever the token or its user is
+    saved or deleted. Through a shared cache every worker sees that at once;
+    without one, other worker processes keep their copies for up to
+    ``LOCAL_TTL`` seconds.
+    """
+
+    def authenticate_credentials(self, key):
+        token = get_cached_token(key)
+        if token is None:
+            try:
+                token = Token.objects.select_related("user").get(key=key)
+            except Token.DoesNotExist:
+                raise exceptions.AuthenticationFailed(_("Invalid token."))
+            cache_token(token)
+
+        if not token.user.is_active:
+            raise exceptions.AuthenticationFailed(_("User inactive or deleted."))
+
+        return (token.user, token)
@@ -0,0 +1,113 @@
+"""
+Batched product upserts for ``POST /api/products/bulk/``.
+
+Rows are validated one by one but written ``batch_size`` at a time with a
+single ``INSERT ... ON CONFLICT (name) DO UPDATE`` per batch, each batch in
+its own transaction. A failing row is reported with its index and does not
+stop the rest of the upload. A name may only appear once per upload; a
+single INSERT cannot upsert the same key twice, so later rows with a name
+already seen are reported rather than written.
+"""
+from django.conf import settings
+from django.db import DatabaseError, transaction
+from rest_framework.exceptions import ParseError
+
+from pearmonieServer import events, stock_summary
+from pearmonieServer.models import Products, ProductType, Store
+from pearmonieServer.routers import pinned_to_primary
+
+from .serializers import ProductSerializer
+
+UPDATE_FIELDS = [
+    "model", "type", "store", "price", "image", "thumbnail", "stock", "updated_at"
+]
+
+
+class ProductImportSerializer(ProductSerializer):
+    class Meta(ProductSerializer.Meta):
+        # Uniqueness is resolved by the upsert; skip the per-row SELECT.
+        extra_kwargs = {"name": {"validators": []}}
+
+
+def import_products(rows, user, batch_size=None):
+    batch_size = batch_size or getattr(settings, "PRODUCT_BULK_BATCH_SIZE", 500)
+    result = {"processed": 0, "upserted": 0, "errors": []}
+    batch = []
+    first_rows = {}
+
+    for index, row in enumerate(rows):
+        result["processed"] += 1
+        if isinstance(row, ParseError):
+            result["errors"].append({"row": index, "errors": [str(row.detail)]})
+            continue
+        if not isinstance(row, dict):
+            result["errors"].append({"row": index, "errors": ["Expected an object."]})
+            continue
+
+        serializer = ProductImportSerializer(data=row)
+        if not serializer.is_valid():
+            result["errors"].append({"row": index, "errors": serializer.errors})
+            continue
+
+        name = serializer.validated_data["name"]
+        if name in first_rows:
+            result["errors"].append(
+                {
+                    "row": index,
+                    "errors": {
+                        "name": [f"Duplicate of row {first_rows[name]} in this upload."]
+                    },
+                }
+            )
+            continue
+        first_rows[name] = index
+
+        batch.append((index, serializer.validated_data))
+        if len(batch) >= batch_size:
+            write_batch(batch, user, result)
+            batch = []
+
+    if batch:
+        write_batch(batch, user, result)
+    return result
+
+
+def write_batch(batch, user, result):
+    # Names are unique within an upload; import_products() rejects repeats.
+    by_name = {data["name"]: data for _, data in batch}
+    try:
+        with pinned_to_primary(), transaction.atomic():
+            existing = {
+                row.pop("name"): row
+                for row in Products.objects.filter(name__in=list(by_name)).values(
+                    "name", *Products.SUMMARY_FIELDS, "store__name"
+                )
+            }
+            stores = Store.objects.resolve_many(d["store"] for d in by_name.values())
+            types = ProductType.objects.resolve_many(d["type"] for d in by_name.values())
+            products = [
+                Products(
+                    user=user,
+                    **{**data, "store": stores[data["store"]], "type": types[data["type"]]},
+                )
+                for data in by_name.values()
+            ]
+            Products.objects.bulk_create(
+                products,
+                update_conflicts=True,
+                unique_fields=["name"],
+                update_fields=UPDATE_FIELDS,
+            )
+            stock_summary.apply_changes(
+                (existing.get(product.name), stock_summary.snapshot(product))
+                for product in products
+            )
+            events.products_imported(
+                len(products),
+                set(stores) | {row["store__name"] for row in existing.values()},
+            )
+    except DatabaseError as exc:
+        for index, _ in batch:
+            result["errors"].append({"row": index, "errors": [str(exc)]})
+        return
+    result["upserted"] += len(by_name)
@@ -0,0 +1,126 @@
+"""
+Result cache for product list queries.
+
+Entries are keyed on the catalog generation (version and timestamp of the
+stock summary row) plus the normalized query, so any product write makes
+every older entry unreachable without an explicit purge; stale entries then
+age out of the LRU. ``PRODUCT_LIST_CACHE["BACKEND"]`` picks an in-process LRU
+bounded by entries and bytes (``"local"``) or a Django cache alias such as a
+Redis cache shared by all workers (``"django"``).
+"""
+import hashlib
+import pickle
+import threading
+
+from django.conf import settings
+from django.core.cache import caches
+
+from pearmonieServer.lru import LRUCache
+
+DEFAULTS = {
+    "ENABLED": True,
+    "BACKEND": "local",
+    "MAXSIZE": 256,
+    "MAX_BYTES": 32 * 1024 * 1024,
+    "CACHE_ALIAS": "default",
+    "TTL": 300,
+}
+
+# Query parameters that shape a product list response; anything else is
+# ignored when building the key so junk parameters cannot fragment the cache.
+KEY_PARAMS = (
+    "search",
+    "type",
+    "store",
+    "cursor",
+    "page_size",
+    "ordering",
+    "format",
+    "fields",
+    "exclude",
+)
+
+
+def cache_settings():
+    return {**DEFAULTS, **getattr(settings, "PRODUCT_LIST_CACHE", {})}
+
+
+class LocalResultCache:
+    def __init__(self, config):
+        self.lru = LRUCache(config["MAXSIZE"], maxbytes=config["MAX_BYTES"])
+
+    def get(self, key):
+        value = self.lru.get(key)
+        return pickle.loads(value) if value is not None else None
+
+    def set(self, key, data):
+        # Store pickled bytes: the size is exact and hits cannot share
+        # mutable objects with earlier responses.
+        value = pickle.dumps(data, pickle.HIGHEST_PROTOCOL)
+        self.lru.set(key, value, size=len(value))
+
+    def clear(self):
+        self.lru.clear()
+
+    def stats(self):
+        return {"backend": "local", **self.lru.stats()}
+
+
+class DjangoResultCache:
+    def __init__(self, config):
+        self.cache = caches[config["CACHE_ALIAS"]]
+        self.ttl = config["TTL"]
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        data = self.cache.get(key)
+        with self._lock:
+            if data is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return data
+
+    def set(self, key, data):
+        self.cache.set(key, data, self.ttl)
+
+    def clear(self):
+        # Only our entries would be stale, and a new generation already
+        # hides them; never flush a shared cache from here.
+        pass
+
+    def stats(self):
+        return {"backend": "django", "hits": self.hits, "misses": self.misses}
+
+
+BACKENDS = {"local": LocalResultCache, "django": DjangoResultCache}
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def product_list_cache():
+    """The process-wide result cache, or ``None`` when disabled."""
+    global _cache
+    config = cache_settings()
+    if not config["ENABLED"]:
+        return None
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = BACKENDS[config["BACKEND"]](config)
+    return _cache
+
+
+def cache_key(request, summary):
+    params = sorted(
+        (name, value)
+        for name in KEY_PARAMS
+        for value in request.query_params.getlist(name)
+    )
+    # Pagination links are absolute, so the origin is part of the response.
+    raw = repr((request.scheme, request.get_host(), params))
+    generation = f"{summary.version}.{summary.updated_at.timestamp()}"
+    return f"products:{generation}:{hashlib.sha1(raw.encode()).hexdigest()}"
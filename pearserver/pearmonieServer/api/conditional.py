@@ -0,0 +1,50 @@
+"""
+Helpers for answering conditional GETs before any serialization work.
+
+Views compute a validator from something cheap (the catalog version or a
+row's ``updated_at``), return early with ``not_modified()`` when the client
+already holds that representation, and otherwise stamp the fresh response
+with ``add_validators()``.
+"""
+import hashlib
+
+from django.utils.cache import get_conditional_response, patch_cache_control, patch_vary_headers
+from django.utils.http import http_date
+
+
+def make_etag(request, *parts):
+    """
+    A strong ETag over ``parts`` and everything else that shapes the body:
+    the full URL (filters, cursor) and the negotiated ``Accept`` header.
+    """
+    key = "|".join(
+        [request.build_absolute_uri(), request.META.get("HTTP_ACCEPT", "")]
+        + [str(part) for part in parts]
+    )
+    return '"%s"' % hashlib.sha1(key.encode()).hexdigest()
+
+
+def timestamp(value):
+    return int(value.timestamp()) if value is not None else None
+
+
+def not_modified(request, etag, last_modified=None):
+    """Return a 304 response if the client's validators match, else ``None``."""
+    response = get_conditional_response(
+        request, etag=etag, last_modified=timestamp(last_modified)
+    )
+    if response is not None:
+        add_validators(response, etag, last_modified)
+    return response
+
+
+def add_validators(response, etag, last_modified=None):
+    if response.status_code != 200 and response.status_code != 304:
+        return response
+    response["ETag"] = etag
+    if last_modified is not None:
+        response["Last-Modified"] = http_date(timestamp(last_modified))
+    # Let clients keep a copy but revalidate it on every use.
+    patch_cache_control(response, private=True, no_cache=True)
+    patch_vary_headers(response, ["Accept", "Authorization"])
+    return response
@@ -0,0 +1,81 @@
+"""
+Read-only product serialization straight from ``values_list()`` rows.
+
+Produces exactly what ``ProductSerializer`` would for the same rows, without
+building model instances or dispatching through one serializer field object
+per value. Used for unpaginated list responses and exports.
+"""
+from decimal import Decimal
+
+from rest_framework.exceptions import ValidationError
+
+from .serializers import ProductSerializer
+
+PRODUCT_FIELDS = tuple(ProductSerializer.Meta.fields)
+
+# Output field -> ORM lookup, where the two differ.
+PRODUCT_LOOKUPS = {"user": "user_id", "store": "store__name", "type": "type__name"}
+
+PRICE_QUANTUM = Decimal("0.01")
+
+
+def format_price(value):
+    # Mirrors DecimalField(max_digits=10, decimal_places=2).to_representation
+    # with COERCE_DECIMAL_TO_STRING.
+    return None if value is None else "{:f}".format(value.quantize(PRICE_QUANTUM))
+
+
+CONVERTERS = {"price": format_price}
+
+
+def split_names(values):
+    return [name.strip() for value in values for name in value.split(",") if name.strip()]
+
+
+def select_fields(query_params, available=PRODUCT_FIELDS):
+    """
+    The output fields picked by ``?fields=a,b`` and/or ``?exclude=c``, always
+    in declaration order.
+    """
+    chosen = split_names(query_params.getlist("fields"))
+    excluded = split_names(query_params.getlist("exclude"))
+    unknown = sorted(set(chosen + excluded) - set(available))
+    if unknown:
+        raise ValidationError(
+            {"fields": f"Unknown field(s): {', '.join(unknown)}. "
+                       f"Choose from {', '.join(available)}."}
+        )
+    fields = tuple(
+        field
+        for field in available
+        if (not chosen or field in chosen) and field not in excluded
+    )
+    if not fields:
+        raise ValidationError({"fields": "At least one field must be selected."})
+    return fields
+
+
+def iter_product_rows(queryset, fields=PRODUCT_FIELDS, chunk_size=None, convert=True):
+    """
+    Yield one output dict per product in ``queryset``; with ``convert=False``
+    values keep their Python types (Decimal prices) for non-JSON encoders.
+    """
+    lookups = [PRODUCT_LOOKUPS.get(field, field) for field in fields]
+    converters = [
+        (index, CONVERTERS[field])
+        for index, field in enumerate(fields)
+        if convert and field in CONVERTERS
+    ]
+    rows = queryset.values_list(*lookups)
+    if chunk_size:
+        rows = rows.iterator(chunk_size=chunk_size)
+    for row in rows:
+        if converters:
+            row = list(row)
+            for index, convert in converters:
+                row[index] = convert(row[index])
+        yield dict(zip(fields, row))
+
+
+def serialize_products(queryset, fields=PRODUCT_FIELDS):
+    return list(iter_product_rows(queryset, fields))
@@ -0,0 +1,20 @@
+"""
+Product list filters, shared by ``ProductViewSet`` and background exports,
+which replay a request's query string outside the request.
+"""
+from pearmonieServer.search import get_search_backend
+
+# Filters by the name of a store or type dimension.
+DIMENSION_FILTERS = ("type", "store")
+
+
+def filter_products(queryset, params, skip=None):
+    """Narrow ``queryset`` by ?search=, ?type= and ?store= (except ``skip``)."""
+    search = params.get("search", None)
+    if search:
+        queryset = get_search_backend(queryset.db).search(queryset, search)
+    for field in DIMENSION_FILTERS:
+        value = params.get(field, None)
+        if value and field != skip:
+            queryset = queryset.filter(**{f"{field}__name": value})
+    return queryset
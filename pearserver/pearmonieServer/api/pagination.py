@@ -0,0 +1,141 @@
+import base64
+import json
+
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import ValidationError
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+class ProductKeysetPagination(BasePagination):
+    """
+    Opt-in keyset (cursor) pagination for the product catalog.
+
+    Requests without ``page_size`` or ``cursor`` are left unpaginated so the
+    existing clients keep receiving a plain list. Pages are sliced with a
+    ``WHERE (key) > (last key)`` predicate instead of an OFFSET, so deep pages
+    cost the same as the first one.
+    """
+
+    cursor_query_param = "cursor"
+    page_size_query_param = "page_size"
+    ordering_query_param = "ordering"
+    page_size = 50
+    max_page_size = 1000
+    orderings = {
+        "id": ("id",),
+        "-id": ("-id",),
+        "updated_at": ("updated_at", "id"),
+        "-updated_at": ("-updated_at", "-id"),
+    }
+    default_ordering = "id"
+
+    def paginate_queryset(self, queryset, request, view=None):
+        params = request.query_params
+        if (
+            self.cursor_query_param not in params
+            and self.page_size_query_param not in params
+        ):
+            return None
+
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        cursor = self.decode_cursor(params.get(self.cursor_query_param))
+        self.ordering = cursor["o"] if cursor else self.get_ordering(request)
+        fields = self.orderings[self.ordering]
+
+        queryset = queryset.order_by(*fields)
+        if cursor:
+            queryset = queryset.filter(self.after(fields, cursor["v"]))
+
+        rows = list(queryset[: self.page_size + 1])
+        self.has_next = len(rows) > self.page_size
+        self.page = rows[: self.page_size]
+        return self.page
+
+    def get_paginated_response(self, data):
+        return Response({"next": self.get_next_link(), "results": data})
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            "type": "object",
+            "properties": {
+                "next": {"type": "string", "nullable": True},
+                "results": schema,
+            },
+        }
+
+    def get_page_size(self, request):
+        value = request.query_params.get(self.page_size_query_param)
+        if value is None:
+            return self.page_size
+        try:
+            page_size = int(value)
+        except ValueError:
+            raise ValidationError({"page_size": "Must be an integer."})
+        if page_size < 1:
+            raise ValidationError({"page_size": "Must be a positive integer."})
+        return min(page_size, self.max_page_size)
+
+    def get_ordering(self, request):
+        ordering = request.query_params.get(
+            self.ordering_query_param, self.default_ordering
+        )
+        if ordering not in self.orderings:
+            raise ValidationError(
+                {"ordering": f"Must be one of {', '.join(self.orderings)}."}
+            )
+        return ordering
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        last = self.page[-1]
+        values = []
+        for field in self.orderings[self.ordering]:
+            value = getattr(last, field.lstrip("-"))
+            values.append(value.isoformat() if hasattr(value, "isoformat") else value)
+        url = self.request.build_absolute_uri()
+        return replace_query_param(
+            url, self.cursor_query_param, self.encode_cursor(self.ordering, values)
+        )
+
+    def after(self, fields, values):
+        """
+        Build the row-value comparison ``(f1, f2) > (v1, v2)`` as the
+        equivalent ``f1 > v1 OR (f1 = v1 AND f2 > v2)``.
+        """
+        condition = Q()
+        for index, field in enumerate(fields):
+            lookup = "lt" if field.startswith("-") else "gt"
+            ties = {f.lstrip("-"): values[i] for i, f in enumerate(fields[:index])}
+            ties[f"{field.lstrip('-')}__{lookup}"] = values[index]
+            condition |= Q(**ties)
+        return condition
+
+    def encode_cursor(self, ordering, values):
+        payload = json.dumps({"o": ordering, "v": values}, separators=(",", ":"))
+        return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+    def decode_cursor(self, encoded):
+        if not encoded:
+            return None
+        try:
+            padded = encoded + "=" * (-len(encoded) % 4)
+            cursor = json.loads(base64.urlsafe_b64decode(padded.encode()).decode())
+            fields = self.orderings[cursor["o"]]
+            values = list(cursor["v"])
+            if len(values) != len(fields):
+                raise ValueError("cursor arity mismatch")
+            for index, field in enumerate(fields):
+                if field.lstrip("-") == "updated_at":
+                    values[index] = parse_datetime(values[index])
+                    if values[index] is None:
+                        raise ValueError("bad timestamp")
+                else:
+                    values[index] = int(values[index])
+        except (TypeError, ValueError, KeyError, AttributeError):
+            raise ValidationError({"cursor": "Invalid cursor."})
+        return {"o": cursor["o"], "v": values}
@@ -0,0 +1,53 @@
+import codecs
+import csv
+import json
+
+from django.conf import settings
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import BaseParser
+
+
+def decoded_lines(stream, encoding):
+    decoder = codecs.getincrementaldecoder(encoding)()
+    for line in stream:
+        yield decoder.decode(line)
+
+
+class CSVParser(BaseParser):
+    """
+    Parses ``text/csv`` into a lazy iterator of row dicts keyed by the header
+    line, so large uploads are never held in memory as a whole.
+    """
+
+    media_type = "text/csv"
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        if stream is None:
+            return iter(())
+        encoding = (parser_context or {}).get("encoding", settings.DEFAULT_CHARSET)
+        return csv.DictReader(decoded_lines(stream, encoding))
+
+
+class NDJSONParser(BaseParser):
+    """
+    Parses newline-delimited JSON into a lazy iterator of objects. A line that
+    is not valid JSON is yielded as a ``ParseError`` so callers can report it
+    against its row instead of failing the whole upload.
+    """
+
+    media_type = "application/x-ndjson"
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        if stream is None:
+            return iter(())
+        encoding = (parser_context or {}).get("encoding", settings.DEFAULT_CHARSET)
+        return self.rows(decoded_lines(stream, encoding))
+
+    def rows(self, lines):
+        for line in lines:
+            if not line.strip():
+                continue
+            try:
+                yield json.loads(line)
+            except ValueError as exc:
+                yield ParseError(f"NDJSON parse error - {exc}")
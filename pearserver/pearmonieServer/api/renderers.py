@@ -0,0 +1,294 @@
+import csv
+import json
+import tempfile
+
+from asgiref.sync import sync_to_async
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+from pearmonieServer import metrics
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional speedup
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:  # pragma: no cover - optional encoding
+    msgpack = None
+
+try:
+    import openpyxl
+    from openpyxl.cell import WriteOnlyCell
+except ImportError:  # pragma: no cover - optional encoding
+    openpyxl = None
+
+LINE_SEPARATORS = (
+    ("\u2028".encode(), b"\\u2028"),
+    ("\u2029".encode(), b"\\u2029"),
+)
+
+
+def dumps(data):
+    """
+    Compact UTF-8 JSON, byte-identical to DRF's default ``JSONRenderer``.
+
+    Uses orjson when it is installed and ``data`` only holds JSON-native
+    types; anything it cannot encode the same way (Decimal, datetime, lazy
+    strings) falls back to the stdlib encoder with DRF's ``JSONEncoder``.
+    """
+    if orjson is not None:
+        try:
+            ret = orjson.dumps(data, option=orjson.OPT_PASSTHROUGH_DATETIME)
+        except TypeError:
+            pass
+        else:
+            for raw, escaped in LINE_SEPARATORS:
+                ret = ret.replace(raw, escaped)
+            return ret
+    ret = json.dumps(
+        data,
+        cls=JSONEncoder,
+        ensure_ascii=False,
+        allow_nan=False,
+        separators=(",", ":"),
+    )
+    return ret.replace("\u2028", "\\u2028").replace("\u2029", "\\u2029").encode()
+
+
+class FastJSONRenderer(JSONRenderer):
+    """``JSONRenderer`` that encodes compact responses through ``dumps()``."""
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+        with metrics.timer("render"):
+            indent = self.get_indent(accepted_media_type, renderer_context or {})
+            if indent is not None or self.ensure_ascii or not self.compact:
+                return super().render(data, accepted_media_type, renderer_context)
+            return dumps(data)
+
+
+# Spreadsheets evaluate cells starting with these as formulas, so exported
+# text could run one (OWASP "CSV injection").
+FORMULA_PREFIXES = ("=", "+", "-", "@", "\t", "\r")
+
+
+def escape_formula(value):
+    """Prefix text a spreadsheet would read as a formula with ``'``."""
+    if isinstance(value, str) and value.startswith(FORMULA_PREFIXES):
+        return "'" + value
+    return value
+
+
+class ExportRenderer(BaseRenderer):
+    """
+    A file format for product exports.
+
+    ``encode(rows, fields)`` yields the file for an iterable of row dicts in
+    chunks. Streamed exports call it directly and bypass ``render()``, which
+    only serves content negotiation and error payloads (as a one-row file).
+    """
+
+    charset = None
+    extension = None
+    # Whether rows keep Python values (Decimal prices) instead of their
+    # JSON representations.
+    native_values = False
+
+    def encode(self, rows, fields):
+        raise NotImplementedError
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+        rows = [
+            {key: "; ".join(map(str, value)) if isinstance(value, list) else value
+             for key, value in (row if isinstance(row, dict) else {"detail": row}).items()}
+            for row in (data if isinstance(data, list) else [data])
+        ]
+        return b"".join(self.encode(rows, list(rows[0]) if rows else []))
+
+
+class NDJSONRenderer(ExportRenderer):
+    """Newline-delimited JSON, one object per line."""
+
+    media_type = "application/x-ndjson"
+    format = "ndjson"
+    extension = "ndjson"
+
+    def encode(self, rows, fields):
+        for row in rows:
+            yield dumps(row) + b"\n"
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        # Errors keep their JSON shape, lists included.
+        if data is None:
+            return b""
+        return b"".join(self.encode(data if isinstance(data, list) else [data], None))
+
+
+class Echo:
+    """A file-like object that hands back whatever ``csv.writer`` writes."""
+
+    def write(self, value):
+        return value
+
+
+class CSVRenderer(ExportRenderer):
+    """Comma-separated values with a header row, as RFC 4180 describes."""
+
+    media_type = "text/csv"
+    format = "csv"
+    extension = "csv"
+
+    def encode(self, rows, fields):
+        writer = csv.writer(Echo())
+        yield writer.writerow(fields).encode()
+        for row in rows:
+            yield writer.writerow(
+                [escape_formula(row.get(field)) for field in fields]
+            ).encode()
+
+
+class XLSXRenderer(ExportRenderer):
+    """
+    An Excel workbook; only offered when ``openpyxl`` is installed.
+
+    A workbook is a zip archive that can only be finished once every row is
+    in, so rows go through openpyxl's write-only mode into a temporary file,
+    which is then streamed. Memory stays flat; time to first byte does not.
+    Text is always written as a string cell, so none of it becomes a formula.
+    """
+
+    media_type = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+    format = "xlsx"
+    extension = "xlsx"
+    native_values = True
+    chunk_size = 64 * 1024
+
+    def encode(self, rows, fields):
+        workbook = openpyxl.Workbook(write_only=True)
+        sheet = workbook.create_sheet("Products")
+        sheet.append(list(fields))
+        for row in rows:
+            sheet.append([self.cell(sheet, row.get(field)) for field in fields])
+        with tempfile.TemporaryFile() as out:
+            workbook.save(out)
+            out.seek(0)
+            yield from iter(lambda: out.read(self.chunk_size), b"")
+
+    @staticmethod
+    def cell(sheet, value):
+        if not isinstance(value, str):
+            return value
+        cell = WriteOnlyCell(sheet, value)
+        cell.data_type = "s"
+        return cell
+
+
+def to_columns(data):
+    """
+    ``[{"id": 1, "name": "a"}, ...]`` -> ``{"columns": ["id", "name"],
+    "rows": [[1, "a"], ...]}``, so field names are sent once per response
+    instead of once per product. Paginated bodies have their ``results``
+    converted; anything else (a single object, errors) is left as is.
+    """
+    if isinstance(data, dict) and isinstance(data.get("results"), list):
+        return {**data, "results": to_columns(data["results"])}
+    if not isinstance(data, list) or not all(isinstance(row, dict) for row in data):
+        return data
+    columns = list(data[0]) if data else []
+    return {"columns": columns, "rows": [list(row.values()) for row in data]}
+
+
+class ColumnarJSONRenderer(BaseRenderer):
+    """Compact JSON with list responses reshaped by ``to_columns()``."""
+
+    media_type = "application/vnd.pearstock.columnar+json"
+    format = "columnar"
+    charset = None
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+        with metrics.timer("render"):
+            return dumps(to_columns(data))
+
+
+class MessagePackRenderer(BaseRenderer):
+    """MessagePack; only offered for negotiation when ``msgpack`` is installed."""
+
+    media_type = "application/msgpack"
+    format = "msgpack"
+    charset = None
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+        with metrics.timer("render"):
+            # Lazy strings and other non-native values go through str().
+            return msgpack.packb(data, default=str)
+
+
+# Extra encodings for product reads, negotiated through ``Accept``
+# (or ``?format=``) after the default JSON renderers.
+COMPACT_RENDERERS = [ColumnarJSONRenderer] + (
+    [MessagePackRenderer] if msgpack is not None else []
+)
+
+
+# Formats for ``/api/products/export/``, picked by ``Accept`` or ``?format=``;
+# NDJSON stays the default.
+EXPORT_RENDERERS = [NDJSONRenderer, CSVRenderer] + (
+    [XLSXRenderer] if openpyxl is not None else []
+)
+
+
+def buffered(chunks, size=64 * 1024):
+    """Join small chunks into ``size``-byte writes for streamed responses."""
+    buffer, length = [], 0
+    for chunk in chunks:
+        buffer.append(chunk)
+        length += len(chunk)
+        if length >= size:
+            yield b"".join(buffer)
+            buffer, length = [], 0
+    if buffer:
+        yield b"".join(buffer)
+
+
+async def pulled(chunks):
+    """
+    Serve a sync chunk iterator to an ASGI response one chunk at a time.
+
+    Django's ASGI handler reads a sync iterator with ``sync_to_async(list)``,
+    building the whole body before the first byte. Each ``next()`` runs on
+    the request's sync thread instead, where its database connection lives.
+    """
+    iterator = iter(chunks)
+    step = sync_to_async(next)
+    try:
+        while True:
+            chunk = await step(iterator, None)
+            if chunk is None:
+                return
+            yield chunk
+    finally:
+        # Release the server-side cursor when the client goes away early.
+        if hasattr(iterator, "close"):
+            await sync_to_async(iterator.close)()
+
+
+class PrometheusRenderer(BaseRenderer):
+    """Prometheus text exposition format; the view returns the finished text."""
+
+    media_type = "text/plain"
+    format = "prometheus"
+    charset = "utf-8"
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if isinstance(data, str):
+            return data.encode(self.charset)
+        return dumps(data)
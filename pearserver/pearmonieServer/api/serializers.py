@@ -1,4 +1,6 @@
-from pearmonieServer.models import CustomUser, Products
+from django.core.exceptions import ValidationError as DjangoValidationError
+from pearmonieServer import media
+from pearmonieServer.models import CustomUser, Products, ProductType, Store
 from rest_framework import serializers
 
 
@@ -24,7 +26,71 @@ class UserSerializer(serializers.ModelSerializer):
         return user
 
 
+class ProductImageField(serializers.Field):
+    """
+    Accepts an uploaded file, a ``data:`` URI or a URL/path string. Inline
+    images are offloaded to storage by ``ProductSerializer.validate``, so
+    only the short URL is ever saved or returned.
+    """
+
+    default_error_messages = {
+        "invalid": "Expected an image file, a data URI or a URL.",
+        "blank": "This field may not be blank.",
+        "max_length": "Ensure this field has no more than {max_length} characters.",
+    }
+    max_length = Products._meta.get_field("image").max_length
+
+    def to_internal_value(self, data):
+        if hasattr(data, "read"):
+            return data
+        if not isinstance(data, str):
+            self.fail("invalid")
+        data = data.strip()
+        if not data:
+            self.fail("blank")
+        if not media.is_inline(data) and len(data) > self.max_length:
+            self.fail("max_length", max_length=self.max_length)
+        return data
+
+    def to_representation(self, value):
+        return value
+
+
+class DimensionField(serializers.CharField):
+    """
+    A store or product type, read and written by name. ``validated_data``
+    keeps the name; ``ProductSerializer`` resolves it to its dimension row
+    (creating it on first use) only when saving.
+    """
+
+    def __init__(self, model, **kwargs):
+        self.model = model
+        kwargs.setdefault("max_length", model._meta.get_field("name").max_length)
+        super().__init__(**kwargs)
+
+    def to_representation(self, value):
+        return value.name
+
+
+def resolve_dimensions(validated_data):
+    for field, model in (("store", Store), ("type", ProductType)):
+        if field in validated_data:
+            validated_data[field] = model.objects.resolve(validated_data[field])
+    return validated_data
+
+
 class ProductSerializer(serializers.ModelSerializer):
+    image = ProductImageField()
+    type = DimensionField(ProductType)
+    store = DimensionField(Store)
+
+    def __init__(self, *args, fields=None, **kwargs):
+        # ``fields`` narrows the output to a subset of Meta.fields.
+        super().__init__(*args, **kwargs)
+        if fields is not None:
+            for name in set(self.fields) - set(fields):
+                self.fields.pop(name)
+
     class Meta:
         model = Products
         fields = [
@@ -35,7 +101,42 @@ class ProductSerializer(serializers.ModelSerializer):
             "store",
             "price",
             "image",
+            "thumbnail",
             "stock",
             "user",
         ]
-        read_only_fields = ["user"]
\ No newline at end of file
+        read_only_fields = ["user", "thumbnail"]
+
+    def validate(self, attrs):
+        image = attrs.get("image")
+        if image is None:
+            return attrs
+        if self.instance is not None and image == self.instance.image:
+            return attrs
+        try:
+            attrs["image"], thumbnail = media.ingest(image)
+        except DjangoValidationError as e:
+            raise serializers.ValidationError({"image": e.messages})
+        # A new image replaces the old thumbnail, even with none of its own.
+        attrs["thumbnail"] = thumbnail or ""
+        return attrs
+
+    def create(self, validated_data):
+        return super().create(resolve_dimensions(validated_data))
+
+    def update(self, instance, validated_data):
+        return super().update(instance, resolve_dimensions(validated_data))
+
+
+class StockAdjustmentSerializer(serializers.Serializer):
+    delta = serializers.IntegerField()
+    reason = serializers.CharField(max_length=100, required=False, allow_blank=True)
+
+    def validate_delta(self, value):
+        if value == 0:
+            raise serializers.ValidationError("Delta must not be zero.")
+        return value
+
+
+class StockBatchAdjustmentSerializer(StockAdjustmentSerializer):
+    id = serializers.IntegerField()
@@ -0,0 +1,129 @@
+"""
+Server-Sent Events stream of product and stock changes: ``/api/events/``.
+
+Clients authenticate with the usual ``Authorization: Token ...`` header and
+may narrow the stream with ``?store=Lagos&store=Abuja``. Each message is
+named after the event kind (``product.created``, ``product.updated``,
+``product.deleted``, ``stock.adjusted``, ``products.imported``, or
+``resync``) and carries a JSON body. A comment line is sent every
+``EVENTS["HEARTBEAT_SECONDS"]`` to keep proxies from closing idle streams.
+
+Nothing is replayed on reconnect. A client catches up through
+``/api/products/changes/`` after connecting or on ``resync``.
+
+A stream is an open-ended async response, so it is only served by the ASGI
+application (``manage.py serve --mode asgi``). Under WSGI it would pin a
+worker thread per client, so WSGI requests get a 503 instead.
+
+Django 4.2 does not listen for ``http.disconnect`` while it streams, and the
+server's ``send()`` just returns once the client is gone, so a stream would
+never end. ``watch_disconnect()`` wraps the ASGI application to hand the
+``receive`` channel to the view, and the stream stops when it reports the
+disconnect.
+"""
+import asyncio
+import json
+
+from asgiref.sync import sync_to_async
+from django.core.handlers.asgi import ASGIRequest
+from django.http import JsonResponse, StreamingHttpResponse
+from rest_framework.exceptions import AuthenticationFailed
+
+from pearmonieServer import events
+
+from .async_views import run_with_connections
+from .authentication import CachedTokenAuthentication
+
+
+def authenticate(request):
+    try:
+        return CachedTokenAuthentication().authenticate(request)
+    except AuthenticationFailed:
+        return None
+
+
+# Scope key under which ``watch_disconnect()`` passes on ``receive``.
+RECEIVE = "pearstock.receive"
+
+
+def watch_disconnect(application):
+    """Wrap an ASGI application so views can see ``receive`` in the scope."""
+
+    async def wrapper(scope, receive, send):
+        if scope["type"] == "http":
+            scope = {**scope, RECEIVE: receive}
+        return await application(scope, receive, send)
+
+    return wrapper
+
+
+async def disconnected(receive):
+    # Django has read the whole body by now, so nothing else reads receive.
+    while (await receive())["type"] != "http.disconnect":
+        pass
+
+
+def format_event(event):
+    return f"event: {event.kind}\ndata: {json.dumps(event.data)}\n\n".encode()
+
+
+async def stream(stores, config, receive=None):
+    loop = asyncio.get_running_loop()
+    queue = asyncio.Queue(maxsize=config["QUEUE_SIZE"])
+    subscription = events.broker().subscribe(loop, queue, stores)
+    gone = asyncio.ensure_future(
+        disconnected(receive) if receive else loop.create_future()
+    )
+    waiting = None
+    try:
+        yield f"retry: {config['RETRY_MS']}\n\n".encode()
+        while True:
+            waiting = waiting or asyncio.ensure_future(queue.get())
+            await asyncio.wait(
+                {waiting, gone},
+                timeout=config["HEARTBEAT_SECONDS"],
+                return_when=asyncio.FIRST_COMPLETED,
+            )
+            if gone.done():
+                return
+            if not waiting.done():
+                yield b": ping\n\n"
+                continue
+            event, waiting = waiting.result(), None
+            yield format_event(event)
+    finally:
+        for pending in (waiting, gone):
+            if pending is not None:
+                pending.cancel()
+        subscription.close()
+
+
+async def product_events(request):
+    if request.method != "GET":
+        return JsonResponse({"error": "Method not allowed."}, status=405)
+    if not isinstance(request, ASGIRequest):
+        return JsonResponse(
+            {"error": "Event streams are only served by the ASGI application."},
+            status=503,
+        )
+    config = events.events_settings()
+    if not config["ENABLED"]:
+        return JsonResponse({"error": "Event streams are disabled."}, status=503)
+
+    credentials = await sync_to_async(run_with_connections, thread_sensitive=False)(
+        authenticate, request
+    )
+    if credentials is None:
+        return JsonResponse(
+            {"detail": "Authentication credentials were not provided."}, status=401
+        )
+
+    stores = [store for store in request.GET.getlist("store") if store]
+    response = StreamingHttpResponse(
+        stream(stores, config, request.scope.get(RECEIVE)),
+        content_type="text/event-stream",
+    )
+    response["Cache-Control"] = "no-cache"
+    # Stop nginx from buffering the stream.
+    response["X-Accel-Buffering"] = "no"
+    return response
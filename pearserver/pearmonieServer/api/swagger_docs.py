@@ -1,6 +1,11 @@
 from drf_yasg import openapi
 from drf_yasg.utils import swagger_auto_schema
-from .serializers import UserSerializer, ProductSerializer
+from .serializers import (
+    ProductSerializer,
+    StockAdjustmentSerializer,
+    StockBatchAdjustmentSerializer,
+    UserSerializer,
+)
 
 security_requirement = {
     'TokenAuth': []   
@@ -44,9 +49,23 @@ verify_otp_docs = swagger_auto_schema(
         type=openapi.TYPE_OBJECT,
         properties={
             'otp': openapi.Schema(type=openapi.TYPE_STRING, description='OTP code'),
-        }
+            'email': openapi.Schema(type=openapi.TYPE_STRING, description='Email address the code was sent to'),
+        },
+        required=['otp', 'email'],
+    ),
+    responses={200: 'OTP verified; returns a reset_token for /api/reset-password/', 400: 'Invalid or expired OTP'}
+)
+
+reset_password_docs = swagger_auto_schema(
+    request_body=openapi.Schema(
+        type=openapi.TYPE_OBJECT,
+        properties={
+            'reset_token': openapi.Schema(type=openapi.TYPE_STRING, description='Token returned by /api/verify-otp/'),
+            'password': openapi.Schema(type=openapi.TYPE_STRING, description='New password'),
+        },
+        required=['reset_token', 'password'],
     ),
-    responses={200: 'OTP verified'}
+    responses={200: 'Password reset; existing tokens are revoked', 400: 'Invalid or expired reset token, or a rejected password'}
 )
 
 logout_docs = swagger_auto_schema(
@@ -61,13 +80,283 @@ dashboard_docs = swagger_auto_schema(
     responses={200: 'Dashboard statistics'}
 )
 
+analytics_filter_params = [
+    openapi.Parameter(
+        'store',
+        openapi.IN_QUERY,
+        description="Only count products in this store",
+        type=openapi.TYPE_STRING
+    ),
+    openapi.Parameter(
+        'type',
+        openapi.IN_QUERY,
+        description="Only count products of this type",
+        type=openapi.TYPE_STRING
+    ),
+]
+
+analytics_docs = swagger_auto_schema(
+    operation_description=(
+        "Inventory value (price * stock), units and product counts, in total "
+        "and grouped by store, type or both, computed in the database"
+    ),
+    manual_parameters=[
+        token_param,
+        openapi.Parameter(
+            'group_by',
+            openapi.IN_QUERY,
+            description="store (default), type or store,type",
+            type=openapi.TYPE_STRING
+        ),
+    ] + analytics_filter_params,
+    security=[security_requirement],
+    responses={200: 'Totals and per-group rows', 400: 'Invalid group_by'}
+)
+
+analytics_trends_docs = swagger_auto_schema(
+    operation_description="Daily inventory totals from the stored rollups, oldest first",
+    manual_parameters=[
+        token_param,
+        openapi.Parameter(
+            'days',
+            openapi.IN_QUERY,
+            description="How many days back to read (default 90, at most 3660)",
+            type=openapi.TYPE_INTEGER
+        ),
+        openapi.Parameter(
+            'group_by',
+            openapi.IN_QUERY,
+            description="Optionally split each day by store, type or store,type",
+            type=openapi.TYPE_STRING
+        ),
+    ] + analytics_filter_params,
+    security=[security_requirement],
+    responses={200: 'One row per day (and group)', 400: 'Invalid parameters'}
+)
+
+product_field_params = [
+    openapi.Parameter(
+        'fields',
+        openapi.IN_QUERY,
+        description="Comma-separated fields to return, e.g. id,name,stock,price",
+        type=openapi.TYPE_STRING
+    ),
+    openapi.Parameter(
+        'exclude',
+        openapi.IN_QUERY,
+        description="Comma-separated fields to leave out",
+        type=openapi.TYPE_STRING
+    ),
+]
+
+product_list_params = [
+    openapi.Parameter(
+        'page_size',
+        openapi.IN_QUERY,
+        description="Opt into cursor pagination with this many products per page",
+        type=openapi.TYPE_INTEGER
+    ),
+    openapi.Parameter(
+        'cursor',
+        openapi.IN_QUERY,
+        description="Opaque cursor taken from the `next` link of the previous page",
+        type=openapi.TYPE_STRING
+    ),
+    openapi.Parameter(
+        'ordering',
+        openapi.IN_QUERY,
+        description="Cursor key: id, -id, updated_at or -updated_at",
+        type=openapi.TYPE_STRING
+    ),
+] + product_field_params
+
 product_list_docs = swagger_auto_schema(
-    operation_description="Retrieve a list of products",
-    manual_parameters=[token_param],
+    operation_description=(
+        "Retrieve a list of products. Send Accept: "
+        "application/vnd.pearstock.columnar+json (or application/msgpack when "
+        "available) for a compact encoding"
+    ),
+    manual_parameters=[token_param] + product_list_params,
     security=[security_requirement],  
     responses={200: ProductSerializer(many=True)}
 )
 
+product_bulk_docs = swagger_auto_schema(
+    operation_description=(
+        "Create or update products by name from a JSON array, a CSV file "
+        "(text/csv) or an NDJSON stream (application/x-ndjson)"
+    ),
+    request_body=ProductSerializer(many=True),
+    manual_parameters=[token_param],
+    security=[security_requirement],
+    responses={
+        200: 'Counts of processed and upserted rows with per-row errors',
+        400: 'No row could be imported'
+    }
+)
+
+product_adjust_stock_docs = swagger_auto_schema(
+    operation_description="Atomically add a (possibly negative) delta to the product's stock",
+    request_body=StockAdjustmentSerializer,
+    manual_parameters=[token_param],
+    security=[security_requirement],
+    responses={
+        200: 'Product id, applied delta and new stock level',
+        404: 'Product not found',
+        409: 'Insufficient stock'
+    }
+)
+
+product_adjust_stock_batch_docs = swagger_auto_schema(
+    operation_description="Apply several stock adjustments in a single transaction",
+    request_body=StockBatchAdjustmentSerializer(many=True),
+    manual_parameters=[token_param],
+    security=[security_requirement],
+    responses={
+        200: 'New stock level for each adjustment',
+        404: 'A product was not found; nothing was applied',
+        409: 'A product has insufficient stock; nothing was applied'
+    }
+)
+
+product_cache_stats_docs = swagger_auto_schema(
+    operation_description="Product list result cache statistics (staff only)",
+    manual_parameters=[token_param],
+    security=[security_requirement],
+    responses={200: 'Cache backend, entries, bytes, hits, misses and evictions'}
+)
+
+metrics_docs = swagger_auto_schema(
+    operation_description="Request latency, query and cache metrics in Prometheus text format (staff only)",
+    manual_parameters=[token_param],
+    security=[security_requirement],
+    responses={200: 'Prometheus text exposition'}
+)
+
+product_filter_params = [
+    openapi.Parameter(
+        'search',
+        openapi.IN_QUERY,
+        description="Only export products matching this search",
+        type=openapi.TYPE_STRING
+    ),
+    openapi.Parameter(
+        'store',
+        openapi.IN_QUERY,
+        description="Only export products in this store",
+        type=openapi.TYPE_STRING
+    ),
+    openapi.Parameter(
+        'type',
+        openapi.IN_QUERY,
+        description="Only export products of this type",
+        type=openapi.TYPE_STRING
+    ),
+] + product_field_params
+
+product_export_docs = swagger_auto_schema(
+    operation_description=(
+        "Stream all matching products as a file download, without building "
+        "the list in memory"
+    ),
+    manual_parameters=[
+        token_param,
+        openapi.Parameter(
+            'format',
+            openapi.IN_QUERY,
+            description="ndjson (default), csv or xlsx (when openpyxl is installed)",
+            type=openapi.TYPE_STRING
+        ),
+    ] + product_filter_params,
+    security=[security_requirement],
+    responses={200: 'NDJSON, CSV or XLSX file of products'}
+)
+
+product_export_start_docs = swagger_auto_schema(
+    operation_description=(
+        "Export the matching products in the background. Poll the returned "
+        "`url` until `status` is done, then fetch `download`"
+    ),
+    request_body=openapi.Schema(
+        type=openapi.TYPE_OBJECT,
+        properties={
+            'format': openapi.Schema(
+                type=openapi.TYPE_STRING, description='ndjson (default), csv or xlsx'
+            ),
+        },
+    ),
+    manual_parameters=[token_param] + product_filter_params,
+    security=[security_requirement],
+    responses={202: 'The queued export job', 400: 'Invalid format or fields'}
+)
+
+product_export_status_docs = swagger_auto_schema(
+    operation_description="Status of one of your background exports",
+    manual_parameters=[token_param],
+    security=[security_requirement],
+    responses={200: 'Export job status and download link', 404: 'No such export'}
+)
+
+product_export_download_docs = swagger_auto_schema(
+    operation_description="Download a finished background export",
+    manual_parameters=[token_param],
+    security=[security_requirement],
+    responses={
+        200: 'The export file',
+        404: 'No such export, or not finished',
+        410: 'The export file has expired'
+    }
+)
+
+product_facets_docs = swagger_auto_schema(
+    operation_description=(
+        "Product counts per store and per type for the current filters. Each "
+        "facet ignores its own filter, so the store counts for ?store=Lagos "
+        "still list every store"
+    ),
+    manual_parameters=[
+        token_param,
+        openapi.Parameter(
+            'search',
+            openapi.IN_QUERY,
+            description="Only count products matching this search",
+            type=openapi.TYPE_STRING
+        ),
+    ] + analytics_filter_params,
+    security=[security_requirement],
+    responses={200: 'Store and type names with product counts, largest first'}
+)
+
+product_changes_docs = swagger_auto_schema(
+    operation_description=(
+        "Products created, updated or deleted since a sync cursor. Start "
+        "without `since`, store the returned `cursor` and pass it back; keep "
+        "calling while `has_more` is true. A 410 means the cursor is too old "
+        "and the client must resync from scratch"
+    ),
+    manual_parameters=[
+        token_param,
+        openapi.Parameter(
+            'since',
+            openapi.IN_QUERY,
+            description="Cursor returned by the previous sync",
+            type=openapi.TYPE_STRING
+        ),
+        openapi.Parameter(
+            'page_size',
+            openapi.IN_QUERY,
+            description="Maximum changes per response",
+            type=openapi.TYPE_INTEGER
+        ),
+    ] + product_field_params,
+    security=[security_requirement],
+    responses={
+        200: 'Changed products, deleted product ids, the next cursor and has_more',
+        400: 'Invalid cursor',
+        410: 'Cursor expired; resync from scratch'
+    }
+)
+
 home_docs = swagger_auto_schema(
     operation_description="Check if user is authenticated based on token in header",
     manual_parameters=[token_param],
@@ -0,0 +1,69 @@
+"""
+Login and OTP throttles, checked by DRF before the view body runs, so a throttled
+attempt costs one cache lookup and never reaches the database or the
+password hasher.
+
+Attempts are counted per email address and per client IP. The IP is
+``REMOTE_ADDR`` unless ``REST_FRAMEWORK["NUM_PROXIES"]`` says how many
+trusted proxies append to ``X-Forwarded-For``; a client-supplied header is
+never trusted on its own, or a new value per request would dodge the
+limit. Rates come from
+``settings.LOGIN_THROTTLE`` on every request, so they can be changed (or
+throttling switched off) without a restart. Counters live in the default
+cache, which must be shared between workers for the limits to hold across
+processes.
+"""
+import hashlib
+
+from django.conf import settings
+from rest_framework.throttling import SimpleRateThrottle
+
+DEFAULTS = {
+    "ENABLED": True,
+    "EMAIL_RATE": "5/min",
+    "IP_RATE": "30/min",
+}
+
+
+def throttle_settings():
+    return {**DEFAULTS, **getattr(settings, "LOGIN_THROTTLE", {})}
+
+
+class LoginThrottle(SimpleRateThrottle):
+    rate_setting = None
+
+    def get_rate(self):
+        config = throttle_settings()
+        return config[self.rate_setting] if config["ENABLED"] else None
+
+    def get_identity(self, request):
+        raise NotImplementedError
+
+    def get_cache_key(self, request, view):
+        identity = self.get_identity(request)
+        if not identity:
+            return None
+        # Never put raw email addresses into a shared cache.
+        digest = hashlib.sha256(identity.encode()).hexdigest()
+        return self.cache_format % {"scope": self.scope, "ident": digest}
+
+
+class LoginEmailThrottle(LoginThrottle):
+    scope = "login_email"
+    rate_setting = "EMAIL_RATE"
+
+    def get_identity(self, request):
+        email = request.data.get("email") if hasattr(request.data, "get") else None
+        return str(email).strip().lower() if email else None
+
+
+class LoginIPThrottle(LoginThrottle):
+    scope = "login_ip"
+    rate_setting = "IP_RATE"
+
+    def get_identity(self, request):
+        return self.get_ident(request)
+
+
+class VerifyOTPThrottle(LoginIPThrottle):
+    scope = "otp_ip"
@@ -1,19 +1,37 @@
+from django.conf import settings
 from django.urls import include, path
 from rest_framework.routers import DefaultRouter
 
-from . import views
+from . import async_views, streams, views
 
 router = DefaultRouter()
 router.register(r"products", views.ProductViewSet)
 
+if settings.ASYNC_READ_VIEWS:
+    read_views = [
+        path("dashboard/", async_views.dashboard, name="dashboard"),
+        path("home/", async_views.home, name="home"),
+        path("health/", async_views.health_check, name="health_check"),
+        path("products/", async_views.product_collection, name="products-list"),
+    ]
+else:
+    read_views = [
+        path("dashboard/", views.dashboard, name="dashboard"),
+        path("home/", views.home, name="home"),
+        path("health/", views.health_check, name="health_check"),
+    ]
+
 urlpatterns = [
     path("login/", views.login, name="login"),
     path("signup/", views.signup, name="signup"),
     path("forgot-password/", views.forgot_password, name="forgot-password"),
     path("verify-otp/", views.verify_otp, name="verify-otp"),
+    path("reset-password/", views.reset_password, name="reset-password"),
     path("logout/", views.logout, name="logout"),
-    path("dashboard/", views.dashboard, name="dashboard"),
-    path("home/", views.home, name="home"),
-    path("health/", views.health_check, name="health_check"),
+    path("metrics/", views.prometheus_metrics, name="metrics"),
+    path("analytics/", views.inventory_analytics, name="analytics"),
+    path("analytics/trends/", views.inventory_trends, name="analytics-trends"),
+    path("events/", streams.product_events, name="events"),
+    *read_views,
     path("", include(router.urls)),
 ]
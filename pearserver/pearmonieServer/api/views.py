@@ -1,151 +1,267 @@
 import logging
 
 from django.contrib.auth import authenticate, get_user_model
+from django.contrib.auth.password_validation import validate_password
 from django.contrib.auth.models import User
-from django.http import HttpResponse
-from pearmonieServer.models import Products
+from django.core.exceptions import ValidationError
+from django.core.handlers.asgi import ASGIRequest
+from django.db.models import Count, Sum
+from django.http import FileResponse, HttpResponse, StreamingHttpResponse
+from pearmonieServer import analytics, events, exports, metrics, stock_summary
+from pearmonieServer.models import Products, StockBreakdown, Task
+from pearmonieServer.otp import (
+    check_reset_token,
+    issue_reset_token,
+    send_password_reset_code,
+    verify as verify_code,
+)
+from pearmonieServer.sqlite import skip_write_queue
+from pearmonieServer.stock import InsufficientStock, ProductNotFound, adjust_stock
+from pearmonieServer.sync import CursorExpired, InvalidCursor, changes as product_changes
 from rest_framework import status, viewsets
 from rest_framework.authtoken.models import Token
-from rest_framework.decorators import api_view, permission_classes
-from rest_framework.permissions import AllowAny, IsAuthenticated
+from rest_framework.decorators import (
+    action,
+    api_view,
+    permission_classes,
+    renderer_classes,
+    throttle_classes,
+)
+from rest_framework.parsers import JSONParser
+from rest_framework.permissions import AllowAny, IsAdminUser, IsAuthenticated
 from rest_framework.response import Response
-
-from .serializers import ProductSerializer, UserSerializer
+from rest_framework.settings import api_settings
+
+from .bulk import import_products
+from .authentication import local_cache as token_cache
+from .cache import cache_key, product_list_cache
+from .conditional import add_validators, make_etag, not_modified
+from .fast_serializers import (
+    PRODUCT_FIELDS,
+    PRODUCT_LOOKUPS,
+    select_fields,
+    serialize_products,
+)
+from .filters import DIMENSION_FILTERS, filter_products
+from .pagination import ProductKeysetPagination
+from .parsers import CSVParser, NDJSONParser
+from .renderers import (
+    COMPACT_RENDERERS,
+    EXPORT_RENDERERS,
+    PrometheusRenderer,
+    pulled,
+)
+from .serializers import (
+    ProductSerializer,
+    StockAdjustmentSerializer,
+    StockBatchAdjustmentSerializer,
+    UserSerializer,
+)
 from .swagger_docs import (
+    analytics_docs,
+    analytics_trends_docs,
     dashboard_docs,
     forgot_password_docs,
     home_docs,
     login_docs,
     logout_docs,
+    metrics_docs,
+    product_bulk_docs,
+    product_cache_stats_docs,
+    product_changes_docs,
+    product_adjust_stock_batch_docs,
+    product_adjust_stock_docs,
+    product_export_docs,
+    product_export_download_docs,
+    product_export_start_docs,
+    product_export_status_docs,
+    product_facets_docs,
     product_list_docs,
+    reset_password_docs,
     signup_docs,
     verify_otp_docs,
 )
+from .throttling import LoginEmailThrottle, LoginIPThrottle, VerifyOTPThrottle
 
 # Set up logging
 logger = logging.getLogger(__name__)
 User = get_user_model()
 
 
+@skip_write_queue
 @api_view(["POST"])
 @permission_classes([AllowAny])
+@throttle_classes([LoginIPThrottle, LoginEmailThrottle])
 @login_docs
 def login(request):
     logger.info("Login endpoint called.")
     email = request.data.get("email")
     password = request.data.get("password")
-    logger.debug(f"Login request data: email={email}")
+    logger.debug("Login request data: email=%s", email)
 
     try:
-        user = authenticate(email=email, password=password)
+        # Through the configured backends, so user_login_failed fires too;
+        # EmailBackend records whether the email matched a user.
+        user = authenticate(request, email=email, password=password)
         if user:
             token, _ = Token.objects.get_or_create(user=user)
             return Response({"token": token.key, "user": UserSerializer(user).data})
         else:
-            if User.objects.filter(email=email).exists():
-                logger.warning(f"Incorrect password for user {email}.")
+            if getattr(request, "login_user_exists", False):
+                logger.warning("Incorrect password for user %s.", email)
                 return Response(
                     {"error": "Incorrect password"}, status=status.HTTP_401_UNAUTHORIZED
                 )
             else:
-                logger.warning(f"User with email {email} not found.")
+                logger.warning("User with email %s not found.", email)
                 return Response(
                     {"error": "User not found"}, status=status.HTTP_401_UNAUTHORIZED
                 )
     except Exception as e:
-        logger.error(f"Unexpected error during login: {str(e)}", exc_info=True)
+        logger.error("Unexpected error during login: %s", e, exc_info=True)
         return Response(
             {"error": "An unexpected error occurred."},
             status=status.HTTP_500_INTERNAL_SERVER_ERROR,
         )
 
 
+@skip_write_queue
 @api_view(["POST"])
 @permission_classes([AllowAny])
 @signup_docs
 def signup(request):
     logger.info("Signup endpoint called.")
-    logger.debug(f"Signup request data: {request.data}")
+    logger.debug("Signup request data: email=%s", request.data.get("email"))
 
     try:
         serializer = UserSerializer(data=request.data)
         if serializer.is_valid():
             user = serializer.save()
             token, _ = Token.objects.get_or_create(user=user)
-            logger.info(f"User {user.email} created successfully.")
+            logger.info("User %s created successfully.", user.email)
             return Response(
                 {"token": token.key, "user": serializer.data},
                 status=status.HTTP_201_CREATED,
             )
         else:
-            logger.warning(f"Signup validation errors: {serializer.errors}")
+            logger.warning("Signup validation errors: %s", serializer.errors)
             errors = {field: errors[0] for field, errors in serializer.errors.items()}
             return Response({"errors": errors}, status=status.HTTP_400_BAD_REQUEST)
     except Exception as e:
-        logger.error(f"Unexpected error during signup: {str(e)}", exc_info=True)
+        logger.error("Unexpected error during signup: %s", e, exc_info=True)
         return Response(
             {"error": "An unexpected error occurred."},
             status=status.HTTP_500_INTERNAL_SERVER_ERROR,
         )
 
 
+@skip_write_queue
 @api_view(["POST"])
 @permission_classes([AllowAny])
 @forgot_password_docs
 def forgot_password(request):
     logger.info("Forgot password endpoint called.")
     email = request.data.get("email")
-    logger.debug(f"Forgot password request data: email={email}")
+    logger.debug("Forgot password request data: email=%s", email)
 
     try:
         user = User.objects.get(email=email)
-        # Implement Reset Logic here
-        logger.info(f"Password reset email sent to {email}.")
+        # The code is generated and mailed by the task worker.
+        send_password_reset_code.enqueue(user_id=user.pk)
+        logger.info("Password reset email queued for %s.", email)
         return Response({"message": "Reset email sent"})
     except User.DoesNotExist:
-        logger.warning(f"User with email {email} does not exist.")
+        logger.warning("User with email %s does not exist.", email)
         return Response(
             {"error": "User with provided email does not exist"},
             status=status.HTTP_404_NOT_FOUND,
         )
     except Exception as e:
-        logger.error(
-            f"Unexpected error during forgot password: {str(e)}", exc_info=True
-        )
+        logger.error("Unexpected error during forgot password: %s", e, exc_info=True)
         return Response(
             {"error": "An unexpected error occurred."},
             status=status.HTTP_500_INTERNAL_SERVER_ERROR,
         )
 
 
+@skip_write_queue
 @api_view(["POST"])
 @permission_classes([AllowAny])
+@throttle_classes([VerifyOTPThrottle])
 @verify_otp_docs
 def verify_otp(request):
     logger.info("Verify OTP endpoint called.")
     otp = request.data.get("otp")
-    logger.debug(f"Verify OTP request data: otp={otp}")
+    email = request.data.get("email")
+    logger.debug("Verify OTP request data: email=%s", email)
+
+    if not email:
+        return Response(
+            {"error": "Email is required."}, status=status.HTTP_400_BAD_REQUEST
+        )
 
     try:
-        valid_otp = True  # Replace with actual OTP validation logic
-        if valid_otp:
+        user = verify_code(otp, email=email)
+        if user is not None:
             logger.info("OTP verified successfully.")
-            return Response({"message": "OTP verified"})
+            return Response(
+                {"message": "OTP verified", "reset_token": issue_reset_token(user)}
+            )
         else:
             logger.warning("Invalid OTP provided.")
             return Response(
                 {"error": "Invalid OTP"}, status=status.HTTP_400_BAD_REQUEST
             )
     except Exception as e:
-        logger.error(
-            f"Unexpected error during OTP verification: {str(e)}", exc_info=True
+        logger.error("Unexpected error during OTP verification: %s", e, exc_info=True)
+        return Response(
+            {"error": "An unexpected error occurred."},
+            status=status.HTTP_500_INTERNAL_SERVER_ERROR,
         )
+
+
+@skip_write_queue
+@api_view(["POST"])
+@permission_classes([AllowAny])
+@reset_password_docs
+def reset_password(request):
+    logger.info("Reset password endpoint called.")
+    password = request.data.get("password")
+
+    try:
+        user = check_reset_token(request.data.get("reset_token"))
+        if user is None:
+            logger.warning("Invalid or expired reset token provided.")
+            return Response(
+                {"error": "Invalid or expired reset token"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        if not password:
+            return Response(
+                {"error": "Password is required."}, status=status.HTTP_400_BAD_REQUEST
+            )
+        try:
+            validate_password(password, user)
+        except ValidationError as e:
+            return Response(
+                {"error": " ".join(e.messages)}, status=status.HTTP_400_BAD_REQUEST
+            )
+
+        user.set_password(password)
+        user.save(update_fields=["password"])
+        # Sign out every session that used the old password.
+        Token.objects.filter(user=user).delete()
+        logger.info("Password reset for %s.", user.email)
+        return Response({"message": "Password reset"})
+    except Exception as e:
+        logger.error("Unexpected error during password reset: %s", e, exc_info=True)
         return Response(
             {"error": "An unexpected error occurred."},
             status=status.HTTP_500_INTERNAL_SERVER_ERROR,
         )
 
 
+@skip_write_queue
 @api_view(["POST"])
 @permission_classes([IsAuthenticated])
 @logout_docs
@@ -153,7 +269,7 @@ def logout(request):
     logger.info("Logout endpoint called.")
     try:
         request.user.auth_token.delete()
-        logger.info(f"User {request.user.email} logged out successfully.")
+        logger.info("User %s logged out successfully.", request.user.email)
         return Response(
             {"message": "Successfully logged out"}, status=status.HTTP_200_OK
         )
@@ -161,7 +277,7 @@ def logout(request):
         logger.warning("No token found for logout.")
         return Response({"error": "No token found"}, status=status.HTTP_400_BAD_REQUEST)
     except Exception as e:
-        logger.error(f"Unexpected error during logout: {str(e)}", exc_info=True)
+        logger.error("Unexpected error during logout: %s", e, exc_info=True)
         return Response(
             {"error": "An unexpected error occurred."},
             status=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -173,8 +289,14 @@ def logout(request):
 @dashboard_docs
 def dashboard(request):
     try:
-        total_products = Products.objects.count()
-        low_stock_items = Products.objects.filter(stock__lt=10).count()
+        summary = stock_summary.get_summary()
+        etag = make_etag(request, summary.version)
+        cached = not_modified(request, etag, summary.updated_at)
+        if cached is not None:
+            return cached
+
+        total_products = summary.total_products
+        low_stock_items = summary.low_stock_items
 
         dashboard_data = [
             {
@@ -187,10 +309,10 @@ def dashboard(request):
             },
         ]
 
-        return Response(dashboard_data)
+        return add_validators(Response(dashboard_data), etag, summary.updated_at)
     except Exception as e:
         logger.error(
-            f"Unexpected error during dashboard retrieval: {str(e)}", exc_info=True
+            "Unexpected error during dashboard retrieval: %s", e, exc_info=True
         )
         return Response(
             {"error": "An unexpected error occurred."},
@@ -198,27 +320,156 @@ def dashboard(request):
         )
 
 
+def analytics_filters(request):
+    return {
+        "store": request.query_params.get("store") or None,
+        "type": request.query_params.get("type") or None,
+    }
+
+
+def analytics_group(request, default):
+    group_by = request.query_params.get("group_by", default)
+    if group_by and group_by not in analytics.GROUPS:
+        return None
+    return analytics.GROUPS.get(group_by, ())
+
+
+@api_view(["GET"])
+@permission_classes([IsAuthenticated])
+@analytics_docs
+def inventory_analytics(request):
+    """Inventory valuation grouped by store and/or type."""
+    group_by = analytics_group(request, "store")
+    if not group_by:
+        return Response(
+            {"group_by": f"Must be one of {', '.join(analytics.GROUPS)}."},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+    try:
+        # Only product writes change the figures, so the catalog version
+        # validates them like the dashboard.
+        summary = stock_summary.get_summary()
+        etag = make_etag(request, summary.version)
+        cached = not_modified(request, etag, summary.updated_at)
+        if cached is not None:
+            return cached
+        data = analytics.valuation(group_by, **analytics_filters(request))
+        return add_validators(Response(data), etag, summary.updated_at)
+    except Exception as e:
+        logger.error("Unexpected error during analytics retrieval: %s", e, exc_info=True)
+        return Response(
+            {"error": "An unexpected error occurred."},
+            status=status.HTTP_500_INTERNAL_SERVER_ERROR,
+        )
+
+
+@api_view(["GET"])
+@permission_classes([IsAuthenticated])
+@analytics_trends_docs
+def inventory_trends(request):
+    """Daily inventory totals read from the snapshot rollups."""
+    group_by = analytics_group(request, "")
+    if group_by is None:
+        return Response(
+            {"group_by": f"Must be one of {', '.join(analytics.GROUPS)}."},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+    try:
+        days = int(request.query_params.get("days", 90))
+    except ValueError:
+        days = 0
+    if not 1 <= days <= 3660:
+        return Response(
+            {"days": "Must be an integer from 1 to 3660."},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+    return Response(
+        {"days": analytics.trends(days, group_by, **analytics_filters(request))}
+    )
+
+
 class ProductViewSet(viewsets.ModelViewSet):
     queryset = Products.objects.all()
     serializer_class = ProductSerializer
     permission_classes = [IsAuthenticated]
-    pagination_class = None 
+    pagination_class = ProductKeysetPagination
+    renderer_classes = api_settings.DEFAULT_RENDERER_CLASSES + COMPACT_RENDERERS
+    # Actions that honour ?fields= / ?exclude=.
+    projected_actions = ("list", "retrieve", "export")
 
     @product_list_docs
     def get_queryset(self):
-        queryset = Products.objects.all()
-        search = self.request.query_params.get("search", None)
-        type_filter = self.request.query_params.get("type", None)
-        store_filter = self.request.query_params.get("store", None)
-
-        if search:
-            queryset = queryset.filter(name__icontains=search)
-        if type_filter:
-            queryset = queryset.filter(type=type_filter)
-        if store_filter:
-            queryset = queryset.filter(store=store_filter)
-
-        return queryset
+        fields = PRODUCT_FIELDS
+        if self.action in self.projected_actions:
+            fields = self.requested_fields()
+        # Join in the store and type names rather than a query per row.
+        queryset = Products.objects.select_related(
+            *(field for field in DIMENSION_FILTERS if field in fields)
+        )
+        if fields != PRODUCT_FIELDS:
+            # Never read unused columns; the keyset cursor needs its keys.
+            lookups = [PRODUCT_LOOKUPS.get(field, field) for field in fields]
+            queryset = queryset.only(*lookups, "updated_at")
+        return filter_products(queryset, self.request.query_params)
+
+    def requested_fields(self):
+        if not hasattr(self, "_requested_fields"):
+            self._requested_fields = select_fields(self.request.query_params)
+        return self._requested_fields
+
+    def get_serializer(self, *args, **kwargs):
+        if self.action in self.projected_actions:
+            kwargs.setdefault("fields", self.requested_fields())
+        return super().get_serializer(*args, **kwargs)
+
+    def list(self, request, *args, **kwargs):
+        self.requested_fields()  # reject unknown fields before any caching
+        # Read the version before querying: if a write lands in between, the
+        # body is newer than its ETag and the next poll simply refetches.
+        summary = stock_summary.get_summary()
+        etag = make_etag(request, summary.version)
+        cached = not_modified(request, etag, summary.updated_at)
+        if cached is not None:
+            return cached
+
+        results = product_list_cache()
+        key = cache_key(request, summary) if results is not None else None
+        data = results.get(key) if results is not None else None
+        if data is not None:
+            response = Response(data)
+        else:
+            response = self.list_products(request)
+            if results is not None and response.status_code == status.HTTP_200_OK:
+                results.set(key, response.data)
+        return add_validators(response, etag, summary.updated_at)
+
+    def list_products(self, request):
+        queryset = self.filter_queryset(self.get_queryset())
+        page = self.paginate_queryset(queryset)
+        with metrics.timer("serialize"):
+            if page is not None:
+                serializer = self.get_serializer(page, many=True)
+                return self.get_paginated_response(serializer.data)
+            return Response(serialize_products(queryset, self.requested_fields()))
+
+    def retrieve(self, request, *args, **kwargs):
+        lookup = {self.lookup_field: kwargs[self.lookup_url_kwarg or self.lookup_field]}
+        try:
+            updated_at = (
+                Products.objects.filter(**lookup)
+                .values_list("updated_at", flat=True)
+                .first()
+            )
+        except (TypeError, ValueError):
+            updated_at = None
+        if updated_at is None:
+            return super().retrieve(request, *args, **kwargs)
+        etag = make_etag(request, updated_at.isoformat())
+        cached = not_modified(request, etag, updated_at)
+        if cached is not None:
+            return cached
+        response = super().retrieve(request, *args, **kwargs)
+        return add_validators(response, etag, updated_at)
 
     def create(self, request, *args, **kwargs):
         serializer = self.get_serializer(data=request.data)
@@ -251,27 +502,273 @@ class ProductViewSet(viewsets.ModelViewSet):
                 {"error": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR
             )
 
+    @product_bulk_docs
+    @action(
+        detail=False,
+        methods=["post"],
+        parser_classes=[JSONParser, CSVParser, NDJSONParser],
+    )
+    def bulk(self, request):
+        """Upsert products by name from a JSON array, CSV or NDJSON body."""
+        rows = request.data
+        if isinstance(rows, (dict, str)) or not hasattr(rows, "__iter__"):
+            return Response(
+                {"error": "Expected a list of products."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        try:
+            result = import_products(rows, user=request.user)
+        except Exception as e:
+            logger.error("Unexpected error during bulk import: %s", e, exc_info=True)
+            return Response(
+                {"error": "An unexpected error occurred."},
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            )
+
+        if result["errors"] and not result["upserted"]:
+            return Response(result, status=status.HTTP_400_BAD_REQUEST)
+        return Response(result)
+
+    @product_adjust_stock_docs
+    @action(detail=True, methods=["post"], url_path="adjust-stock")
+    def adjust_stock(self, request, pk=None):
+        """Atomically add ``delta`` (negative for sales) to one product's stock."""
+        serializer = StockAdjustmentSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(
+                {"errors": serializer.errors}, status=status.HTTP_400_BAD_REQUEST
+            )
+        try:
+            item = {"id": int(pk), **serializer.validated_data}
+        except ValueError:
+            return Response(
+                {"error": "Product not found."}, status=status.HTTP_404_NOT_FOUND
+            )
+        return self.apply_stock_adjustments([item], many=False)
+
+    @product_adjust_stock_batch_docs
+    @action(
+        detail=False,
+        methods=["post"],
+        url_path="adjust-stock",
+        url_name="adjust-stock-batch",
+    )
+    def adjust_stock_batch(self, request):
+        """Apply several stock adjustments in one all-or-nothing transaction."""
+        serializer = StockBatchAdjustmentSerializer(data=request.data, many=True)
+        if not serializer.is_valid():
+            return Response(
+                {"errors": serializer.errors}, status=status.HTTP_400_BAD_REQUEST
+            )
+        return self.apply_stock_adjustments(serializer.validated_data, many=True)
+
+    def apply_stock_adjustments(self, items, many):
+        try:
+            results = adjust_stock(items, user=self.request.user)
+        except ProductNotFound as e:
+            return Response(
+                {"error": e.message, "id": e.product_id},
+                status=status.HTTP_404_NOT_FOUND,
+            )
+        except InsufficientStock as e:
+            return Response(
+                {"error": e.message, "id": e.product_id},
+                status=status.HTTP_409_CONFLICT,
+            )
+        except Exception as e:
+            logger.error(
+                "Unexpected error during stock adjustment: %s", e, exc_info=True
+            )
+            return Response(
+                {"error": "An unexpected error occurred."},
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            )
+        return Response(results if many else results[0])
+
+    @product_cache_stats_docs
+    @action(
+        detail=False,
+        methods=["get"],
+        url_path="cache-stats",
+        permission_classes=[IsAdminUser],
+    )
+    def cache_stats(self, request):
+        """Hit/miss counters of the product list result cache."""
+        results = product_list_cache()
+        return Response(results.stats() if results is not None else {"enabled": False})
+
+    @product_export_docs
+    @action(detail=False, methods=["get"], renderer_classes=EXPORT_RENDERERS)
+    def export(self, request):
+        """Stream every matching product as NDJSON, CSV or XLSX."""
+        renderer = request.accepted_renderer
+        queryset = self.filter_queryset(self.get_queryset())
+        chunks = exports.encode(queryset, self.requested_fields(), renderer)
+        if isinstance(request._request, ASGIRequest):
+            chunks = pulled(chunks)
+        response = StreamingHttpResponse(chunks, content_type=renderer.media_type)
+        response["Content-Disposition"] = (
+            f'attachment; filename="products.{renderer.extension}"'
+        )
+        return response
+
+    @product_export_start_docs
+    @action(detail=False, methods=["post"], url_path="exports")
+    def start_export(self, request):
+        """Queue an export of the matching products to download later."""
+        export_format = request.data.get("format", "ndjson")
+        if export_format not in exports.FORMATS:
+            return Response(
+                {"format": f"Must be one of {', '.join(exports.FORMATS)}."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        job = exports.start(request.user, export_format, request.query_params)
+        data = self.describe_export(job)
+        return Response(
+            data, status=status.HTTP_202_ACCEPTED, headers={"Location": data["url"]}
+        )
+
+    @product_export_status_docs
+    @action(
+        detail=False,
+        methods=["get"],
+        url_path=r"exports/(?P<export_id>[0-9]+)",
+        url_name="export-status",
+    )
+    def export_status(self, request, export_id=None):
+        job = exports.jobs(request.user).filter(pk=export_id).first()
+        if job is None:
+            return Response(
+                {"error": "Export not found."}, status=status.HTTP_404_NOT_FOUND
+            )
+        return Response(self.describe_export(job))
+
+    @product_export_download_docs
+    @action(
+        detail=False,
+        methods=["get"],
+        url_path=r"exports/(?P<export_id>[0-9]+)/download",
+        url_name="export-download",
+    )
+    def download_export(self, request, export_id=None):
+        job = exports.jobs(request.user).filter(pk=export_id).first()
+        if job is None or job.status != Task.DONE:
+            return Response(
+                {"error": "Export not found or not finished."},
+                status=status.HTTP_404_NOT_FOUND,
+            )
+        storage = exports.storage()
+        if not storage.exists(job.result["file"]):
+            return Response(
+                {"error": "Export has expired."}, status=status.HTTP_410_GONE
+            )
+        renderer = exports.FORMATS[job.payload["format"]]
+        return FileResponse(
+            storage.open(job.result["file"], "rb"),
+            as_attachment=True,
+            filename=f"products.{renderer.extension}",
+            content_type=renderer.media_type,
+        )
+
+    def describe_export(self, job):
+        done = job.status == Task.DONE
+        return {
+            "id": job.pk,
+            "format": job.payload["format"],
+            "status": job.status,
+            "bytes": job.result["bytes"] if done else None,
+            "url": self.reverse_action("export-status", kwargs={"export_id": job.pk}),
+            "download": (
+                self.reverse_action("export-download", kwargs={"export_id": job.pk})
+                if done
+                else None
+            ),
+        }
+
+    @product_facets_docs
+    @action(detail=False, methods=["get"])
+    def facets(self, request):
+        """Product counts per store and per type for the current filters."""
+        summary = stock_summary.get_summary()
+        etag = make_etag(request, summary.version)
+        cached = not_modified(request, etag, summary.updated_at)
+        if cached is not None:
+            return cached
+        data = {"stores": self.facet_counts("store"), "types": self.facet_counts("type")}
+        return add_validators(Response(data), etag, summary.updated_at)
+
+    def facet_counts(self, field):
+        if self.request.query_params.get("search"):
+            # Only a GROUP BY over the matches can count a search.
+            queryset = filter_products(
+                Products.objects.all(), self.request.query_params, skip=field
+            )
+            count = Count("id")
+        else:
+            # Otherwise the per store/type counters already hold the answer.
+            queryset = StockBreakdown.objects.filter(total_products__gt=0)
+            for other in DIMENSION_FILTERS:
+                value = self.request.query_params.get(other)
+                if value and other != field:
+                    queryset = queryset.filter(**{f"{other}__name": value})
+            count = Sum("total_products")
+        rows = (
+            queryset.values_list(f"{field}__name")
+            .annotate(count=count)
+            .order_by("-count", f"{field}__name")
+        )
+        return [{"name": name, "count": total} for name, total in rows]
+
+    @product_changes_docs
+    @action(detail=False, methods=["get"])
+    def changes(self, request):
+        """
+        Delta sync: products changed or deleted since ``?since=<cursor>``.
+        Filters are ignored, since a filtered feed could not report rows
+        that stop matching.
+        """
+        page_size = request.query_params.get("page_size")
+        try:
+            page_size = int(page_size) if page_size else None
+        except ValueError:
+            return Response(
+                {"page_size": "Must be an integer."}, status=status.HTTP_400_BAD_REQUEST
+            )
+        if page_size is not None and page_size < 1:
+            return Response(
+                {"page_size": "Must be a positive integer."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        try:
+            data = product_changes(
+                since=request.query_params.get("since"),
+                limit=page_size,
+                fields=self.requested_fields(),
+            )
+        except InvalidCursor as e:
+            return Response({"since": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        except CursorExpired as e:
+            return Response({"error": str(e)}, status=status.HTTP_410_GONE)
+        return Response(data)
+
 
 @api_view(["GET"])
 @permission_classes([AllowAny])
 @home_docs
 def home(request):
     """Check if user is authenticated based on token in header"""
-    auth_header = request.META.get("HTTP_AUTHORIZATION", "")
-    if auth_header.startswith("Token "):
-        token_key = auth_header.split(" ")[1]
-        try:
-            token = Token.objects.get(key=token_key)
-            user = token.user
-            return Response(
-                {
-                    "authenticated": True,
-                    "token": token_key,
-                    "user": UserSerializer(user).data,
-                }
-            )
-        except Token.DoesNotExist:
-            pass
+    # The token was already resolved (through the token cache) by the
+    # request's authentication classes.
+    if isinstance(request.auth, Token):
+        return Response(
+            {
+                "authenticated": True,
+                "token": request.auth.key,
+                "user": UserSerializer(request.user).data,
+            }
+        )
 
     return Response({"authenticated": False})
 
@@ -284,3 +781,29 @@ def health_check(request):
     Returns a 200 OK response if the server is healthy.
     """
     return HttpResponse("OK", status=status.HTTP_200_OK)
+
+
+@api_view(["GET"])
+@permission_classes([IsAdminUser])
+@renderer_classes([PrometheusRenderer])
+@metrics_docs
+def prometheus_metrics(request):
+    """Request metrics and cache counters in Prometheus text format."""
+    caches = {"product_list": product_list_cache(), "token": token_cache()}
+    gauges = []
+    for stat in ("entries", "bytes", "hits", "misses", "evictions"):
+        values = [
+            ([("cache", name)], cache.stats()[stat])
+            for name, cache in caches.items()
+            if cache is not None and stat in cache.stats()
+        ]
+        if values:
+            gauges.append((f"pearstock_cache_{stat}", f"Cache {stat}.", values))
+    gauges.append(
+        (
+            "pearstock_event_subscribers",
+            "Open event streams in this process.",
+            [([], events.broker().stats()["subscribers"])],
+        )
+    )
+    return Response(metrics.registry.render(gauges))
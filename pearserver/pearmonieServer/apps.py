@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class PearmonieserverConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'pearmonieServer'
+
+    def ready(self):
+        from . import analytics, exports, otp, signals, sync  # noqa: F401
@@ -0,0 +1,34 @@
+"""
+Email and password authentication for the login endpoint.
+
+Django's ``ModelBackend`` hashes the password even for unknown emails, so a
+miss costs as much as a wrong password, and the login view then needed a
+second query to tell the two apart for its error message. ``EmailBackend``
+looks the user up once, skips the hash when there is no such user and
+records the outcome on the request as ``login_user_exists``. It still
+returns ``None`` on failure, so ``authenticate()`` fires
+``user_login_failed`` as before.
+"""
+from django.contrib.auth import get_user_model
+from django.contrib.auth.backends import ModelBackend
+
+UserModel = get_user_model()
+
+
+class EmailBackend(ModelBackend):
+    def authenticate(self, request, username=None, password=None, email=None, **kwargs):
+        # The admin login form sends the email as ``username``.
+        email = email or username or kwargs.get(UserModel.USERNAME_FIELD)
+        if email is None or password is None:
+            return None
+        try:
+            user = UserModel._default_manager.get_by_natural_key(email)
+        except UserModel.DoesNotExist:
+            user = None
+        if request is not None:
+            request.login_user_exists = user is not None
+        if user is None:
+            return None
+        if user.check_password(password) and self.user_can_authenticate(user):
+            return user
+        return None
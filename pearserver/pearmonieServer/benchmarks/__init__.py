@@ -0,0 +1,70 @@
+"""
+Benchmarks run through ``python manage.py benchmark <scenario>``.
+
+A scenario is a function registered with ``@scenario(name)`` that takes the
+command options and returns a JSON-serialisable dict. Scenarios run inside a
+transaction that is rolled back afterwards, so they may be pointed at a
+development database without leaving rows behind. Scenarios that drive a
+separate server process register with ``transactional=False`` and clean up
+after themselves, since that process cannot see uncommitted rows.
+"""
+import math
+import time
+from contextlib import contextmanager
+
+from django.db import transaction
+
+SCENARIOS = {}
+NON_TRANSACTIONAL = set()
+
+
+def scenario(name, transactional=True):
+    def register(func):
+        SCENARIOS[name] = func
+        if not transactional:
+            NON_TRANSACTIONAL.add(name)
+        return func
+
+    return register
+
+
+@contextmanager
+def stopwatch():
+    timing = {}
+    start = time.perf_counter()
+    try:
+        yield timing
+    finally:
+        timing["seconds"] = time.perf_counter() - start
+
+
+def rate(count, seconds):
+    return round(count / seconds, 1) if seconds else None
+
+
+def percentiles(samples, points=(50, 95, 99)):
+    """Nearest-rank percentiles of ``samples`` as ``{"p50": ..., ...}``."""
+    ordered = sorted(samples)
+    return {
+        f"p{point}": ordered[max(0, math.ceil(point / 100 * len(ordered)) - 1)]
+        for point in points
+    }
+
+
+def run(name, **options):
+    if name in NON_TRANSACTIONAL:
+        return SCENARIOS[name](**options)
+    with transaction.atomic():
+        result = SCENARIOS[name](**options)
+        transaction.set_rollback(True)
+    return result
+
+
+from . import (  # noqa: E402,F401
+    api,
+    bulk_import,
+    concurrency,
+    load,
+    login,
+    serialization,
+)
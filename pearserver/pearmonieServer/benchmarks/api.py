@@ -0,0 +1,153 @@
+import random
+import time
+import tracemalloc
+
+from django.contrib.auth import get_user_model
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from pearmonieServer.api.throttling import throttle_settings
+from pearmonieServer.models import Products
+
+from . import percentiles, rate, scenario
+from .data import (
+    CATALOG_PASSWORD,
+    CATALOG_PREFIX,
+    STORES,
+    TYPES,
+    product_rows,
+    seed_catalog,
+)
+
+BULK_ROWS = 500
+MEMORY_SAMPLES = 20
+
+
+def login(client, rng, state):
+    email = rng.choice(state["emails"])
+    return client.post(
+        reverse("login"), {"email": email, "password": CATALOG_PASSWORD}, format="json"
+    )
+
+
+def dashboard(client, rng, state):
+    return client.get(reverse("dashboard"))
+
+
+def filtered_list(client, rng, state):
+    return client.get(
+        reverse("products-list"),
+        {"store": rng.choice(STORES), "type": rng.choice(TYPES), "page_size": 50},
+    )
+
+
+def search(client, rng, state):
+    term = rng.choice([*TYPES, "M-1", "M-42", "Catalog 00001", "paimt"])
+    return client.get(reverse("products-list"), {"search": term, "page_size": 50})
+
+
+def create(client, rng, state):
+    state["created"] += 1
+    prefix = f"Created {state['created']:07d}"
+    row = next(product_rows(1, prefix=prefix, seed=rng.random()))
+    return client.post(reverse("products-list"), row, format="json")
+
+
+def update(client, rng, state):
+    product_id = rng.choice(state["ids"])
+    return client.patch(
+        reverse("products-detail", args=[product_id]),
+        {"stock": rng.randint(1, 200)},
+        format="json",
+    )
+
+
+def bulk(client, rng, state):
+    state["bulk"] += 1
+    prefix = f"Bulk {state['bulk']:05d}"
+    rows = list(product_rows(BULK_ROWS, prefix=prefix, seed=state["bulk"]))
+    return client.post(reverse("products-bulk"), rows, format="json")
+
+
+STEPS = {
+    "login": login,
+    "dashboard": dashboard,
+    "filtered_list": filtered_list,
+    "search": search,
+    "create": create,
+    "update": update,
+    "bulk": bulk,
+}
+
+
+def measure(step, client, rng, state, requests):
+    latencies = []
+    errors = 0
+    started = time.perf_counter()
+    for _ in range(requests):
+        start = time.perf_counter()
+        response = step(client, rng, state)
+        latencies.append(time.perf_counter() - start)
+        errors += response.status_code >= 400
+    elapsed = time.perf_counter() - started
+
+    # tracemalloc slows every allocation down, so memory is sampled in a
+    # separate, shorter pass instead of skewing the latencies above.
+    tracemalloc.start()
+    try:
+        for _ in range(min(requests, MEMORY_SAMPLES)):
+            step(client, rng, state)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {
+        "requests": requests,
+        "errors": errors,
+        "requests_per_sec": rate(requests, elapsed),
+        "latency_ms": {
+            name: round(value * 1000, 2)
+            for name, value in percentiles(latencies).items()
+        },
+        "peak_memory_kib": round(peak / 1024, 1),
+    }
+
+
+@scenario("api")
+def api(rows, requests=50, steps=None, seed=0, **options):
+    """
+    Latency percentiles, throughput and peak traced memory for the scripted
+    API paths, run in-process through the full middleware and token
+    authentication stack against a synthetic catalog of ``rows`` products.
+    A catalog already created by ``seed_catalog`` is reused; otherwise it is
+    generated inside the scenario's transaction and rolled back with it.
+    """
+    seed_catalog(rows, seed=seed)
+    catalog = Products.objects.filter(name__startswith=CATALOG_PREFIX + " ")
+    catalog = catalog.order_by("id")
+    token, _ = Token.objects.get_or_create(user=catalog.first().user)
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f"Token {token.key}")
+    state = {
+        "emails": list(
+            get_user_model()
+            .objects.filter(email__startswith="catalog-")
+            .values_list("email", flat=True)
+        ),
+        "ids": list(catalog.values_list("id", flat=True)[:10000]),
+        "created": 0,
+        "bulk": 0,
+    }
+
+    rng = random.Random(seed)
+    results = {}
+    # Every request comes from one address, so the login throttle would turn
+    # most of the login step into 429s; the ``login`` scenario measures it.
+    unthrottled = {**throttle_settings(), "ENABLED": False}
+    with override_settings(LOGIN_THROTTLE=unthrottled):
+        for name in steps or STEPS:
+            step_requests = max(1, requests // 10) if name == "bulk" else requests
+            results[name] = measure(STEPS[name], client, rng, state, step_requests)
+    return {"rows": rows, "steps": results}
@@ -0,0 +1,46 @@
+from django.conf import settings
+from django.test import override_settings
+from django.urls import reverse
+
+from . import rate, scenario, stopwatch
+from .data import api_client, benchmark_user, product_rows
+
+
+@scenario("bulk_import")
+def bulk_import(rows, single_rows=None, batch_size=None, **options):
+    """
+    Rows/sec through ``POST /api/products/`` one at a time versus
+    ``POST /api/products/bulk/``. The single-create path is sampled on at
+    most ``single_rows`` rows since it is orders of magnitude slower.
+    """
+    client = api_client(benchmark_user())
+    single_rows = min(rows, single_rows or 1000)
+
+    with stopwatch() as single:
+        for row in product_rows(single_rows, prefix="Single"):
+            response = client.post(reverse("products-list"), row, format="json")
+            assert response.status_code == 201, response.content
+
+    batch_size = batch_size or getattr(settings, "PRODUCT_BULK_BATCH_SIZE", 500)
+    payload = list(product_rows(rows, prefix="Bulk"))
+    with override_settings(PRODUCT_BULK_BATCH_SIZE=batch_size), stopwatch() as batched:
+        response = client.post(reverse("products-bulk"), payload, format="json")
+        assert response.status_code == 200 and not response.data["errors"], response.data
+
+    return {
+        "rows": rows,
+        "batch_size": batch_size,
+        "single": {
+            "rows": single_rows,
+            "seconds": round(single["seconds"], 3),
+            "rows_per_sec": rate(single_rows, single["seconds"]),
+        },
+        "bulk": {
+            "rows": rows,
+            "seconds": round(batched["seconds"], 3),
+            "rows_per_sec": rate(rows, batched["seconds"]),
+        },
+        "speedup": round(
+            rate(rows, batched["seconds"]) / rate(single_rows, single["seconds"]), 1
+        ),
+    }
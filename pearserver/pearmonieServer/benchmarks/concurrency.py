@@ -0,0 +1,117 @@
+import random
+import threading
+import time
+
+from django.core.management.base import CommandError
+from django.db import OperationalError, connection, connections, transaction
+from django.test import override_settings
+
+from pearmonieServer import sqlite
+from pearmonieServer.models import Products
+
+from . import rate, scenario
+from .data import STORES, benchmark_user, model_rows, product_rows
+
+PROFILES = ("default", "tuned")
+
+
+def reader(deadline, counts):
+    rng = random.Random()
+    while time.monotonic() < deadline:
+        try:
+            list(
+                Products.objects.filter(store__name=rng.choice(STORES))
+                .order_by("id")
+                .values("id", "stock")[:50]
+            )
+            counts["reads"] += 1
+        except OperationalError:
+            counts["read_errors"] += 1
+
+
+def writer(deadline, counts, ids):
+    """The update path of ``ProductViewSet``: read, then save, in one transaction."""
+    rng = random.Random()
+    while time.monotonic() < deadline:
+        try:
+            with sqlite.write_lock(), transaction.atomic():
+                product = Products.objects.get(pk=rng.choice(ids))
+                product.stock = rng.randint(1, 200)
+                product.save()
+            counts["writes"] += 1
+        except OperationalError:
+            counts["write_errors"] += 1
+
+
+def run_workers(duration, readers, writers, ids):
+    deadline = time.monotonic() + duration
+    results = []
+
+    def worker(target, *args):
+        counts = {"reads": 0, "writes": 0, "read_errors": 0, "write_errors": 0}
+        try:
+            target(deadline, counts, *args)
+        finally:
+            connections.close_all()
+            results.append(counts)
+
+    threads = [threading.Thread(target=worker, args=(reader,)) for _ in range(readers)]
+    threads += [
+        threading.Thread(target=worker, args=(writer, ids)) for _ in range(writers)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return {key: sum(counts[key] for counts in results) for key in results[0]}
+
+
+def set_journal_mode(mode):
+    connection.close()
+    connection.ensure_connection()
+    connection.connection.execute(f"PRAGMA journal_mode = {mode}")
+
+
+@scenario("sqlite-concurrency", transactional=False)
+def sqlite_concurrency(rows, duration=5, concurrency=8, writers=None, **options):
+    """
+    Reads and writes per second, and "database is locked" failures, for
+    mixed reader and writer threads against the configured SQLite file. It
+    runs with SQLite's defaults and then with the ``SQLITE_TUNING`` profile.
+    Seeds ``rows`` products for the run and removes them afterwards.
+    """
+    if connection.vendor != "sqlite" or connection.is_in_memory_db():
+        raise CommandError("sqlite-concurrency needs a file-backed SQLite database.")
+    writers = max(1, concurrency // 4) if writers is None else writers
+    readers = max(concurrency - writers, 0)
+
+    user = benchmark_user("benchmark-concurrency@example.com")
+    Products.objects.bulk_create(
+        (
+            Products(user=user, **row)
+            for row in model_rows(product_rows(rows, prefix="Concurrency"))
+        ),
+        batch_size=5000,
+    )
+    ids = list(Products.objects.filter(user=user).values_list("id", flat=True))
+    runs = {}
+    try:
+        for profile in PROFILES:
+            tuned = {**sqlite.tuning(), "ENABLED": profile == "tuned"}
+            with override_settings(SQLITE_TUNING=tuned):
+                if profile == "default":
+                    set_journal_mode("DELETE")
+                counts = run_workers(duration, readers, writers, ids)
+                connection.close()
+            runs[profile] = {
+                "reads_per_sec": rate(counts["reads"], duration),
+                "writes_per_sec": rate(counts["writes"], duration),
+                "read_errors": counts["read_errors"],
+                "write_errors": counts["write_errors"],
+            }
+    finally:
+        if not sqlite.tuning().get("ENABLED"):
+            set_journal_mode("DELETE")
+        Products.objects.filter(user=user).delete()
+        user.delete()
+    return {"rows": rows, "readers": readers, "writers": writers, "profiles": runs}
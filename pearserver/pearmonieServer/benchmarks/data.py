@@ -0,0 +1,108 @@
+import random
+from decimal import Decimal
+from itertools import islice
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from rest_framework.test import APIClient
+
+from pearmonieServer import stock_summary
+from pearmonieServer.models import Products, ProductType, Store
+
+CATALOG_PREFIX = "Catalog"
+CATALOG_PASSWORD = "benchmark-password"
+
+STORES = ["Ikeja", "Lekki", "Yaba", "Abuja", "Kano", "Ibadan", "Enugu", "Benin"]
+TYPES = ["Tools", "Power Tools", "Paint", "Plumbing", "Electrical", "Garden"]
+
+
+def product_rows(count, prefix="Product", seed=0):
+    """Yield ``count`` serializer-ready product dicts with unique names."""
+    rng = random.Random(seed)
+    for index in range(count):
+        yield {
+            "name": f"{prefix} {index:07d}",
+            "model": f"M-{rng.randint(100, 999)}",
+            "type": rng.choice(TYPES),
+            "store": rng.choice(STORES),
+            "price": str(Decimal(rng.randint(100, 500000)) / 100),
+            "image": f"https://img.example.com/{index}.png",
+            "stock": rng.randint(1, 200),
+        }
+
+
+def model_rows(rows):
+    """``rows`` with store and type names swapped for their dimension rows."""
+    stores = Store.objects.resolve_many(STORES)
+    types = ProductType.objects.resolve_many(TYPES)
+    for row in rows:
+        yield {**row, "store": stores[row["store"]], "type": types[row["type"]]}
+
+
+def benchmark_user(email="benchmark@example.com"):
+    User = get_user_model()
+    user = User.objects.filter(email=email).first()
+    if user is None:
+        user = User.objects.create_user(email=email, password=CATALOG_PASSWORD)
+    return user
+
+
+def api_client(user):
+    client = APIClient()
+    client.force_authenticate(user=user)
+    return client
+
+
+def catalog_emails(count):
+    return [f"catalog-{index:04d}@example.com" for index in range(count)]
+
+
+def catalog_users(count):
+    """The ``count`` catalog users, creating missing ones with one shared hash."""
+    User = get_user_model()
+    emails = catalog_emails(count)
+    existing = set(
+        User.objects.filter(email__in=emails).values_list("email", flat=True)
+    )
+    password = make_password(CATALOG_PASSWORD)
+    User.objects.bulk_create(
+        User(email=email, password=password)
+        for email in emails
+        if email not in existing
+    )
+    return list(User.objects.filter(email__in=emails).order_by("email"))
+
+
+def seed_catalog(products, users=10, seed=0, batch_size=5000):
+    """
+    Top the synthetic catalog up to ``products`` rows owned round-robin by
+    ``users`` catalog users. Rows are deterministic for a given ``seed``, so
+    rerunning never duplicates them and two databases seeded alike match.
+    Returns the number of products inserted.
+    """
+    owners = catalog_users(users)
+    existing = Products.objects.filter(name__startswith=CATALOG_PREFIX + " ").count()
+    rows = product_rows(products, prefix=CATALOG_PREFIX, seed=seed)
+    rows = model_rows(islice(rows, existing, None))
+    created = 0
+    while True:
+        batch = [
+            Products(user=owners[(existing + created + offset) % len(owners)], **row)
+            for offset, row in enumerate(islice(rows, batch_size))
+        ]
+        if not batch:
+            break
+        Products.objects.bulk_create(batch)
+        created += len(batch)
+    # bulk_create bypasses the signals that keep the counters current.
+    stock_summary.rebuild()
+    return created
+
+
+def clear_catalog():
+    User = get_user_model()
+    Products.objects.filter(name__startswith=CATALOG_PREFIX + " ").delete()
+    User.objects.filter(
+        email__startswith="catalog-", email__endswith="@example.com"
+    ).delete()
+    stock_summary.rebuild()
@@ -0,0 +1,119 @@
+import http.client
+import os
+import socket
+import subprocess
+import sys
+import threading
+import time
+
+from django.conf import settings
+from rest_framework.authtoken.models import Token
+
+from pearmonieServer.models import Products
+
+from . import scenario
+from .data import benchmark_user, model_rows, product_rows
+
+ENDPOINTS = {
+    "health": "/api/health/",
+    "dashboard": "/api/dashboard/",
+    "products": "/api/products/?store=Ikeja&page_size=50",
+}
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def wait_until_up(port, timeout=30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            connection = http.client.HTTPConnection("127.0.0.1", port, timeout=1)
+            connection.request("GET", ENDPOINTS["health"])
+            if connection.getresponse().status == 200:
+                return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError(f"server on port {port} did not come up")
+
+
+def hammer(port, path, headers, duration, concurrency):
+    """Keep-alive GET loop on ``concurrency`` threads; returns (ok, errors)."""
+    counts = [[0, 0] for _ in range(concurrency)]
+    deadline = time.monotonic() + duration
+
+    def client(slot):
+        connection = http.client.HTTPConnection("127.0.0.1", port, timeout=10)
+        while time.monotonic() < deadline:
+            try:
+                connection.request("GET", path, headers=headers)
+                response = connection.getresponse()
+                response.read()
+                counts[slot][0 if response.status == 200 else 1] += 1
+            except (OSError, http.client.HTTPException):
+                counts[slot][1] += 1
+                connection.close()
+                connection = http.client.HTTPConnection("127.0.0.1", port, timeout=10)
+
+    threads = [threading.Thread(target=client, args=(i,)) for i in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return sum(c[0] for c in counts), sum(c[1] for c in counts)
+
+
+@scenario("serve", transactional=False)
+def serve(rows, workers=None, mode=None, duration=5, concurrency=32, **options):
+    """
+    Requests/sec per endpoint against ``manage.py serve`` started with each
+    worker count in ``workers``. Seeds ``rows`` products into the configured
+    database for the run and removes them afterwards.
+    """
+    user = benchmark_user("benchmark-serve@example.com")
+    token, _ = Token.objects.get_or_create(user=user)
+    Products.objects.bulk_create(
+        (
+            Products(user=user, **row)
+            for row in model_rows(product_rows(rows, prefix="Serve"))
+        ),
+        batch_size=5000,
+    )
+    headers = {"Authorization": f"Token {token.key}"}
+    mode = mode or settings.SERVER["MODE"]
+    results = []
+    try:
+        for count in workers or [1, 2, 4]:
+            port = free_port()
+            server = subprocess.Popen(
+                [
+                    sys.executable, "manage.py", "serve",
+                    "--mode", mode,
+                    "--workers", str(count),
+                    "--bind", f"127.0.0.1:{port}",
+                ],
+                cwd=settings.BASE_DIR,
+                env={**os.environ, "SERVER_MAX_REQUESTS": "1000000"},
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL,
+            )
+            try:
+                wait_until_up(port)
+                run = {"workers": count}
+                for name, path in ENDPOINTS.items():
+                    ok, errors = hammer(port, path, headers, duration, concurrency)
+                    run[name] = {
+                        "requests_per_sec": round(ok / duration, 1),
+                        "errors": errors,
+                    }
+                results.append(run)
+            finally:
+                server.terminate()
+                server.wait(timeout=30)
+    finally:
+        Products.objects.filter(user=user).delete()
+        user.delete()
+    return {"rows": rows, "mode": mode, "concurrency": concurrency, "runs": results}
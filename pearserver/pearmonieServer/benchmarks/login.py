@@ -0,0 +1,88 @@
+import time
+
+from django.core.cache import cache
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from pearmonieServer.api.throttling import throttle_settings
+
+from . import percentiles, rate, scenario
+from .data import CATALOG_PASSWORD, benchmark_user
+
+ATTACKER_IP = "203.0.113.7"
+USER_IP = "198.51.100.20"
+# Legitimate logins interleaved with the attack: one per this many attempts.
+LEGIT_EVERY = 10
+
+
+def attack(client, requests, target):
+    """A credential-stuffing flood from one IP: the real account, then made-up ones."""
+    latencies = {"user": [], "attack": []}
+    statuses = {"user": [], "attack": []}
+    cpu = time.process_time()
+    start = time.perf_counter()
+    for attempt in range(requests):
+        email = target if attempt % 2 else f"stuffed-{attempt}@example.com"
+        began = time.perf_counter()
+        response = client.post(
+            reverse("login"),
+            {"email": email, "password": f"guess-{attempt}"},
+            format="json",
+            REMOTE_ADDR=ATTACKER_IP,
+        )
+        latencies["attack"].append(time.perf_counter() - began)
+        statuses["attack"].append(response.status_code)
+
+        if attempt % LEGIT_EVERY == 0:
+            began = time.perf_counter()
+            response = client.post(
+                reverse("login"),
+                {"email": f"legit-{attempt}@example.com", "password": CATALOG_PASSWORD},
+                format="json",
+                REMOTE_ADDR=USER_IP,
+            )
+            latencies["user"].append(time.perf_counter() - began)
+            statuses["user"].append(response.status_code)
+    return latencies, statuses, time.perf_counter() - start, time.process_time() - cpu
+
+
+def summarise(latencies, statuses):
+    return {
+        "requests": len(statuses),
+        "ok": sum(code == 200 for code in statuses),
+        "throttled": sum(code == 429 for code in statuses),
+        "latency_ms": {
+            name: round(value * 1000, 2)
+            for name, value in percentiles(latencies).items()
+        },
+    }
+
+
+@scenario("login_attack")
+def login_attack(rows, requests=50, **options):
+    """
+    Login throughput while one IP floods ``/api/login/`` with bad passwords
+    for a real account and for made-up ones, with and without the login
+    throttle. A legitimate user on another IP logs in to a fresh account
+    after every ``LEGIT_EVERY`` attack requests. ``rows`` is unused.
+    """
+    target = benchmark_user("attacked@example.com").email
+    for attempt in range(0, requests, LEGIT_EVERY):
+        benchmark_user(f"legit-{attempt}@example.com")
+
+    client = APIClient()
+    results = {}
+    for profile in ("unthrottled", "throttled"):
+        config = {**throttle_settings(), "ENABLED": profile == "throttled"}
+        cache.clear()
+        with override_settings(LOGIN_THROTTLE=config):
+            latencies, statuses, seconds, cpu = attack(client, requests, target)
+        results[profile] = {
+            "seconds": round(seconds, 3),
+            "cpu_seconds": round(cpu, 3),
+            "attack_requests_per_sec": rate(requests, seconds),
+            "attack": summarise(latencies["attack"], statuses["attack"]),
+            "user": summarise(latencies["user"], statuses["user"]),
+        }
+    return {"requests": requests, "profiles": results}
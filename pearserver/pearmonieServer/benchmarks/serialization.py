@@ -0,0 +1,51 @@
+from rest_framework.renderers import JSONRenderer
+
+from pearmonieServer.api.fast_serializers import serialize_products
+from pearmonieServer.api.renderers import FastJSONRenderer
+from pearmonieServer.api.serializers import ProductSerializer
+from pearmonieServer.models import Products
+
+from . import rate, scenario, stopwatch
+from .data import benchmark_user, model_rows, product_rows
+
+
+def seed_products(count, batch_size=5000):
+    user = benchmark_user()
+    Products.objects.bulk_create(
+        (
+            Products(user=user, **row)
+            for row in model_rows(product_rows(count, prefix="Serialize"))
+        ),
+        batch_size=batch_size,
+    )
+
+
+@scenario("serializer")
+def serializer(rows, **options):
+    """
+    Rows/sec serializing and rendering the product list with
+    ``ProductSerializer`` + ``JSONRenderer`` versus the ``values_list`` fast
+    path + ``FastJSONRenderer``. Fails if the two bodies differ by a byte.
+    """
+    seed_products(rows)
+    queryset = Products.objects.order_by("id")
+
+    with stopwatch() as drf:
+        expected = JSONRenderer().render(ProductSerializer(queryset, many=True).data)
+    with stopwatch() as fast:
+        body = FastJSONRenderer().render(serialize_products(queryset))
+
+    assert body == expected, "fast path output differs from ProductSerializer"
+    return {
+        "rows": rows,
+        "bytes": len(body),
+        "product_serializer": {
+            "seconds": round(drf["seconds"], 3),
+            "rows_per_sec": rate(rows, drf["seconds"]),
+        },
+        "fast_path": {
+            "seconds": round(fast["seconds"], 3),
+            "rows_per_sec": rate(rows, fast["seconds"]),
+        },
+        "speedup": round(drf["seconds"] / fast["seconds"], 1),
+    }
@@ -0,0 +1,246 @@
+"""
+Push notifications for product and stock changes.
+
+Write paths call ``product_changed()``, ``stock_adjusted()`` or
+``products_imported()``. These queue an ``Event`` for after the surrounding
+transaction commits. The broker then fans the event out to every subscriber
+whose store filter matches. Subscribers are the ``/api/events/`` streams
+(``api/streams.py``), each holding a bounded ``asyncio.Queue`` on the
+server's event loop. An idle client therefore costs one coroutine and no
+database work.
+
+``EVENTS["BACKEND"]`` selects the broker:
+
+* ``"local"`` fans out inside the process. This is enough for one worker.
+* ``"redis"`` publishes to a Redis channel. Each process relays the channel
+  to its own subscribers from one listener thread, so events reach clients
+  on every worker. This needs the optional ``redis`` package.
+
+A subscriber that falls ``QUEUE_SIZE`` events behind is not blocked on.
+Its queue is dropped and it is told to resync through the delta feed
+(``/api/products/changes/``).
+"""
+import json
+import logging
+import threading
+from dataclasses import dataclass, field
+
+from django.conf import settings
+from django.db import transaction
+
+try:
+    import redis
+except ImportError:  # pragma: no cover - optional dependency
+    redis = None
+
+from .models import Products, Store
+
+logger = logging.getLogger(__name__)
+
+DEFAULTS = {
+    "ENABLED": True,
+    "BACKEND": "local",
+    "REDIS_URL": "redis://localhost:6379/0",
+    "CHANNEL": "pearstock:events",
+    "QUEUE_SIZE": 100,
+    "HEARTBEAT_SECONDS": 15,
+    "RETRY_MS": 3000,
+}
+
+RESYNC = "resync"
+
+
+def events_settings():
+    return {**DEFAULTS, **getattr(settings, "EVENTS", {})}
+
+
+@dataclass(frozen=True)
+class Event:
+    kind: str
+    data: dict
+    # Stores the event concerns; a product moved between stores has two.
+    stores: frozenset = field(default_factory=frozenset)
+
+    def to_json(self):
+        return json.dumps(
+            {"kind": self.kind, "data": self.data, "stores": sorted(self.stores)}
+        )
+
+    @classmethod
+    def from_json(cls, raw):
+        payload = json.loads(raw)
+        return cls(payload["kind"], payload["data"], frozenset(payload["stores"]))
+
+
+class Subscription:
+    def __init__(self, broker, loop, queue, stores):
+        self.broker = broker
+        self.loop = loop
+        self.queue = queue
+        self.stores = frozenset(stores or ())
+
+    def wants(self, event):
+        return not self.stores or not event.stores or bool(self.stores & event.stores)
+
+    def deliver(self, event):
+        # Runs on the subscriber's event loop.
+        if self.queue.full():
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            event = Event(RESYNC, {})
+        self.queue.put_nowait(event)
+
+    def close(self):
+        self.broker.unsubscribe(self)
+
+
+class LocalBroker:
+    def __init__(self, config):
+        self.config = config
+        self.subscriptions = set()
+        self.lock = threading.Lock()
+
+    def subscribe(self, loop, queue, stores=None):
+        subscription = Subscription(self, loop, queue, stores)
+        with self.lock:
+            self.subscriptions.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self.lock:
+            self.subscriptions.discard(subscription)
+
+    def publish(self, event):
+        self.fan_out(event)
+
+    def fan_out(self, event):
+        with self.lock:
+            targets = [s for s in self.subscriptions if s.wants(event)]
+        for subscription in targets:
+            try:
+                subscription.loop.call_soon_threadsafe(subscription.deliver, event)
+            except RuntimeError:  # the loop has closed under a dead stream
+                self.unsubscribe(subscription)
+
+    def stats(self):
+        with self.lock:
+            return {"backend": "local", "subscribers": len(self.subscriptions)}
+
+
+class RedisBroker(LocalBroker):
+    def __init__(self, config):
+        if redis is None:
+            raise ImportError("EVENTS['BACKEND'] = 'redis' needs the redis package.")
+        super().__init__(config)
+        self.client = redis.Redis.from_url(config["REDIS_URL"])
+        self.listener = None
+
+    def subscribe(self, loop, queue, stores=None):
+        self.start_listener()
+        return super().subscribe(loop, queue, stores)
+
+    def publish(self, event):
+        try:
+            self.client.publish(self.config["CHANNEL"], event.to_json())
+        except redis.RedisError as e:
+            logger.warning("Could not publish %s event: %s", event.kind, e)
+
+    def start_listener(self):
+        with self.lock:
+            if self.listener is not None and self.listener.is_alive():
+                return
+            self.listener = threading.Thread(
+                target=self.listen, name="events-redis-listener", daemon=True
+            )
+            self.listener.start()
+
+    def listen(self):
+        pubsub = self.client.pubsub(ignore_subscribe_messages=True)
+        try:
+            pubsub.subscribe(self.config["CHANNEL"])
+            for message in pubsub.listen():
+                self.fan_out(Event.from_json(message["data"]))
+        except redis.RedisError as e:
+            logger.error("Event relay from Redis stopped: %s", e)
+            # Subscribers may have missed events; let them catch up.
+            self.fan_out(Event(RESYNC, {}))
+        finally:
+            pubsub.close()
+
+
+BACKENDS = {"local": LocalBroker, "redis": RedisBroker}
+
+_broker = None
+_broker_lock = threading.Lock()
+
+
+def broker():
+    global _broker
+    if _broker is None:
+        with _broker_lock:
+            if _broker is None:
+                config = events_settings()
+                _broker = BACKENDS[config["BACKEND"]](config)
+    return _broker
+
+
+def publish(event):
+    """Publish ``event`` once the current transaction commits."""
+    if not events_settings()["ENABLED"]:
+        return
+    transaction.on_commit(lambda: broker().publish(event))
+
+
+def dimension_name(product, field):
+    """The name of ``product``'s store or type, read from the loaded row if any."""
+    relation = Products._meta.get_field(field)
+    if relation.is_cached(product):
+        return getattr(product, field).name
+    names = relation.related_model.objects.values_list("name", flat=True)
+    return names.get(pk=getattr(product, relation.attname))
+
+
+def product_changed(kind, product, before=None):
+    if not events_settings()["ENABLED"]:
+        return
+    store = dimension_name(product, "store")
+    stores = {store}
+    if before is not None and before["store_id"] != product.store_id:
+        # The product moved; subscribers of the old store hear about it too.
+        stores.add(Store.objects.values_list("name", flat=True).get(pk=before["store_id"]))
+    publish(
+        Event(
+            kind,
+            {
+                "id": product.pk,
+                "name": product.name,
+                "store": store,
+                "type": dimension_name(product, "type"),
+                "stock": product.stock,
+            },
+            frozenset(stores),
+        )
+    )
+
+
+def stock_adjusted(product_id, delta, after):
+    """``after`` holds the product's ``store__name``, ``type__name`` and ``stock``."""
+    publish(
+        Event(
+            "stock.adjusted",
+            {
+                "id": product_id,
+                "delta": delta,
+                "store": after["store__name"],
+                "type": after["type__name"],
+                "stock": after["stock"],
+            },
+            frozenset([after["store__name"]]),
+        )
+    )
+
+
+def products_imported(count, stores):
+    # One event per batch rather than per row; clients pull the rows
+    # through the delta feed.
+    publish(Event("products.imported", {"count": count}, frozenset(stores)))
@@ -0,0 +1,94 @@
+"""
+Product catalog exports as NDJSON, CSV or XLSX.
+
+``GET /api/products/export/`` streams the file as it is encoded from chunked
+``.iterator()`` reads, so memory stays flat at any catalog size. Under ASGI
+the chunks are pulled one at a time through ``renderers.pulled()``. Text a
+spreadsheet would take for a formula is escaped. Exports a
+client would rather not wait for are queued through
+``POST /api/products/exports/`` instead. The ``export_products`` task writes
+the same file to the ``exports`` storage, and the client polls the job and
+downloads the file once it is done. Files are deleted ``KEEP_HOURS`` after
+they are written.
+
+Both paths replay the request's query string, so ``?search=``, ``?store=``,
+``?type=``, ``?fields=`` and ``?exclude=`` select the same rows and columns
+as the product list.
+"""
+import tempfile
+import uuid
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.files import File
+from django.core.files.storage import storages
+from django.http import QueryDict
+from django.utils import timezone
+
+from .api.fast_serializers import iter_product_rows, select_fields
+from .api.filters import filter_products
+from .api.renderers import EXPORT_RENDERERS, buffered
+from .models import Products, Task
+from .tasks import task
+
+DEFAULTS = {
+    "CHUNK_SIZE": 2000,
+    "KEEP_HOURS": 24,
+}
+
+FORMATS = {renderer.format: renderer for renderer in EXPORT_RENDERERS}
+
+TASK_NAME = "export_products"
+
+
+def export_settings():
+    return {**DEFAULTS, **getattr(settings, "PRODUCT_EXPORTS", {})}
+
+
+def storage():
+    return storages["exports"]
+
+
+def encode(queryset, fields, renderer):
+    """The export of ``queryset`` in ``renderer``'s format, as byte chunks."""
+    rows = iter_product_rows(
+        queryset.order_by("id"),
+        fields,
+        chunk_size=export_settings()["CHUNK_SIZE"],
+        convert=not renderer.native_values,
+    )
+    return buffered(renderer.encode(rows, fields))
+
+
+def start(user, format, params):
+    """Queue an export of the products ``params`` select; returns its task."""
+    select_fields(params)  # reject unknown fields now rather than in the worker
+    return export_products.enqueue(user_id=user.pk, format=format, query=params.urlencode())
+
+
+def jobs(user):
+    return Task.objects.filter(name=TASK_NAME, payload__user_id=user.pk)
+
+
+@task(name=TASK_NAME)
+def export_products(user_id, format, query):
+    params = QueryDict(query)
+    renderer = FORMATS[format]()
+    fields = select_fields(params)
+    queryset = filter_products(Products.objects.all(), params)
+    with tempfile.TemporaryFile() as out:
+        for chunk in encode(queryset, fields, renderer):
+            out.write(chunk)
+        size = out.tell()
+        out.seek(0)
+        name = storage().save(f"{uuid.uuid4().hex}.{renderer.extension}", File(out))
+    remove_export.enqueue(
+        run_at=timezone.now() + timedelta(hours=export_settings()["KEEP_HOURS"]),
+        name=name,
+    )
+    return {"file": name, "bytes": size}
+
+
+@task(name="remove_export")
+def remove_export(name):
+    storage().delete(name)
@@ -0,0 +1,39 @@
+"""
+scrypt and Argon2 hashers whose cost is read from
+``settings.PASSWORD_HASHER_COST``.
+
+They keep the stock algorithm names, so their hashes stay interchangeable
+with Django's own. When the configured cost changes, ``must_update`` makes
+Django rehash each password at that user's next successful login.
+"""
+from django.conf import settings
+from django.contrib.auth.hashers import Argon2PasswordHasher, ScryptPasswordHasher
+
+
+def hasher_cost(name, default):
+    return getattr(settings, "PASSWORD_HASHER_COST", {}).get(name, default)
+
+
+class TunedScryptPasswordHasher(ScryptPasswordHasher):
+    @property
+    def work_factor(self):
+        return hasher_cost("SCRYPT_WORK_FACTOR", ScryptPasswordHasher.work_factor)
+
+    @property
+    def maxmem(self):
+        # scrypt needs 128 * N * r bytes; OpenSSL's default cap is 32 MiB.
+        return 2 * 128 * self.work_factor * self.block_size
+
+
+class TunedArgon2PasswordHasher(Argon2PasswordHasher):
+    @property
+    def time_cost(self):
+        return hasher_cost("ARGON2_TIME_COST", Argon2PasswordHasher.time_cost)
+
+    @property
+    def memory_cost(self):
+        return hasher_cost("ARGON2_MEMORY_COST", Argon2PasswordHasher.memory_cost)
+
+    @property
+    def parallelism(self):
+        return hasher_cost("ARGON2_PARALLELISM", Argon2PasswordHasher.parallelism)
@@ -0,0 +1,92 @@
+import json
+import subprocess
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from pearmonieServer import benchmarks
+
+
+class Command(BaseCommand):
+    help = (
+        "Run a benchmark scenario and print its results as JSON. All writes "
+        "are rolled back when the scenario finishes."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("scenario", choices=sorted(benchmarks.SCENARIOS))
+        parser.add_argument(
+            "--rows",
+            type=int,
+            nargs="+",
+            default=[10000],
+            help="Catalog sizes to run the scenario with.",
+        )
+        parser.add_argument(
+            "--single-rows",
+            type=int,
+            help="Rows to send through the single-create path (bulk_import).",
+        )
+        parser.add_argument("--batch-size", type=int, help="Bulk write batch size.")
+        parser.add_argument(
+            "--workers",
+            type=int,
+            nargs="+",
+            help="Server worker counts to compare (serve).",
+        )
+        parser.add_argument("--mode", choices=["asgi", "wsgi"], help="Server mode (serve).")
+        parser.add_argument(
+            "--duration", type=int, default=5, help="Seconds per load run."
+        )
+        parser.add_argument(
+            "--concurrency",
+            type=int,
+            default=32,
+            help="Concurrent clients (serve) or worker threads (sqlite-concurrency).",
+        )
+        parser.add_argument(
+            "--writers",
+            type=int,
+            help="How many of the threads write (sqlite-concurrency).",
+        )
+        parser.add_argument(
+            "--requests", type=int, default=50, help="Requests per step (api) or attack requests (login_attack)."
+        )
+        parser.add_argument(
+            "--steps",
+            nargs="+",
+            choices=sorted(benchmarks.api.STEPS),
+            help="Only run these steps (api).",
+        )
+        parser.add_argument("--seed", type=int, default=0, help="Catalog seed (api).")
+        parser.add_argument("--output", help="Also write the JSON results to this file.")
+
+    def handle(self, *args, **options):
+        scenario = options.pop("scenario")
+        sizes = options.pop("rows")
+        results = {
+            "scenario": scenario,
+            "commit": current_commit(),
+            "database": connection.vendor,
+            "runs": [benchmarks.run(scenario, rows=rows, **options) for rows in sizes],
+        }
+        report = json.dumps(results, indent=2, default=str)
+        if options.get("output"):
+            with open(options["output"], "w") as handle:
+                handle.write(report + "\n")
+        self.stdout.write(report)
+
+
+def current_commit():
+    """The checked-out commit, so results can be compared across commits."""
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=settings.BASE_DIR,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
@@ -0,0 +1,30 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from pearmonieServer.sync import compact_tombstones, sync_settings
+
+
+class Command(BaseCommand):
+    help = (
+        "Delete product tombstones older than the delta sync window. Clients "
+        "with an older cursor are told to resync from scratch."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--days",
+            type=int,
+            default=None,
+            help="Override PRODUCT_SYNC['TOMBSTONE_DAYS'].",
+        )
+
+    def handle(self, *args, **options):
+        days = options["days"]
+        window = sync_settings()["TOMBSTONE_DAYS"]
+        if days is not None and days < window:
+            # Cursors are only rejected after TOMBSTONE_DAYS; compacting
+            # sooner would let those clients miss deletions.
+            raise CommandError(
+                f"--days must be at least PRODUCT_SYNC['TOMBSTONE_DAYS'] ({window})."
+            )
+        deleted = compact_tombstones(days=days)
+        self.stdout.write(self.style.SUCCESS(f"Removed {deleted} tombstone(s)."))
@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+
+from pearmonieServer.media import offload_inline_images
+
+
+class Command(BaseCommand):
+    help = (
+        "Move product images stored inline as data: URIs to media storage and "
+        "replace them with short URLs, generating thumbnails on the way."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=500)
+
+    def handle(self, *args, **options):
+        offloaded, errors = offload_inline_images(batch_size=options["batch_size"])
+        for pk, reason in sorted(errors.items()):
+            self.stderr.write(f"Product {pk}: {reason}")
+        self.stdout.write(
+            self.style.SUCCESS(f"Offloaded {offloaded} image(s), {len(errors)} skipped.")
+        )
@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from pearmonieServer import stock_summary
+
+
+class Command(BaseCommand):
+    help = "Rebuild the dashboard stock counters from the product catalog."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--check",
+            action="store_true",
+            help="Only report drift between the counters and the catalog.",
+        )
+
+    def handle(self, *args, **options):
+        problems = stock_summary.reconcile()
+        for problem in problems:
+            self.stdout.write(problem)
+
+        if options["check"]:
+            if problems:
+                raise CommandError(f"{len(problems)} stock counter(s) out of date.")
+            self.stdout.write(self.style.SUCCESS("Stock counters are up to date."))
+            return
+
+        stock_summary.rebuild()
+        self.stdout.write(self.style.SUCCESS("Stock counters rebuilt."))
@@ -0,0 +1,49 @@
+import signal
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from pearmonieServer import tasks
+
+# Seconds between checks for periodic tasks that are due to be queued again.
+SCHEDULE_INTERVAL = 60
+
+
+class Command(BaseCommand):
+    help = "Run queued background tasks until stopped (or once with --once)."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--once", action="store_true", help="Run one batch of due tasks and exit."
+        )
+        parser.add_argument("--batch-size", type=int, help="Tasks claimed per poll.")
+        parser.add_argument(
+            "--poll-interval", type=float, help="Seconds to sleep when the queue is empty."
+        )
+
+    def handle(self, *args, **options):
+        config = tasks.queue_settings()
+        batch_size = options["batch_size"] or config["BATCH_SIZE"]
+        poll_interval = options["poll_interval"] or config["POLL_INTERVAL"]
+
+        if options["once"]:
+            tasks.schedule_periodic()
+            ran = tasks.run_pending(batch_size)
+            self.stdout.write(f"Ran {ran} task(s).")
+            return
+
+        stopping = []
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            signal.signal(signum, lambda *_: stopping.append(True))
+
+        self.stdout.write(f"Task worker started (batch size {batch_size}).")
+        next_schedule = 0
+        while not stopping:
+            close_old_connections()
+            if time.monotonic() >= next_schedule:
+                tasks.schedule_periodic()
+                next_schedule = time.monotonic() + SCHEDULE_INTERVAL
+            if not tasks.run_pending(batch_size):
+                time.sleep(poll_interval)
+        self.stdout.write("Task worker stopped.")
@@ -0,0 +1,46 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from pearmonieServer.benchmarks import stopwatch
+from pearmonieServer.benchmarks.data import clear_catalog, seed_catalog
+
+
+class Command(BaseCommand):
+    help = (
+        "Generate a deterministic synthetic catalog (users and products across "
+        "all stores and types) for benchmarking. Existing catalog rows are kept "
+        "and only the missing ones are added."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--products", type=int, default=10000, help="Catalog size (1k to 1M)."
+        )
+        parser.add_argument("--users", type=int, default=10, help="Catalog owners.")
+        parser.add_argument("--seed", type=int, default=0, help="Random seed.")
+        parser.add_argument("--batch-size", type=int, default=5000)
+        parser.add_argument(
+            "--clear",
+            action="store_true",
+            help="Delete the synthetic catalog and its users instead.",
+        )
+
+    def handle(self, *args, **options):
+        if options["clear"]:
+            clear_catalog()
+            self.stdout.write(self.style.SUCCESS("Synthetic catalog removed."))
+            return
+        if options["products"] < 1 or options["users"] < 1:
+            raise CommandError("--products and --users must be positive.")
+
+        with stopwatch() as timing:
+            created = seed_catalog(
+                options["products"],
+                users=options["users"],
+                seed=options["seed"],
+                batch_size=options["batch_size"],
+            )
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Inserted {created} products in {timing['seconds']:.1f}s."
+            )
+        )
@@ -0,0 +1,91 @@
+import os
+import shutil
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from pearmonieServer import events
+
+WORKER_CLASSES = {
+    "asgi": "uvicorn_worker.UvicornWorker",
+    "wsgi": "gthread",
+}
+
+APPLICATIONS = {
+    "asgi": "pearserver.asgi:application",
+    "wsgi": "pearserver.wsgi:application",
+}
+
+
+def default_workers(mode):
+    cpus = os.cpu_count() or 1
+    # Event-loop workers saturate a core each; threaded WSGI workers block on I/O.
+    return cpus if mode == "asgi" else cpus * 2 + 1
+
+
+def gunicorn_command(mode, bind, workers, threads, timeout, max_requests):
+    command = [
+        "gunicorn",
+        APPLICATIONS[mode],
+        "--bind", bind,
+        "--workers", str(workers),
+        "--worker-class", WORKER_CLASSES[mode],
+        "--timeout", str(timeout),
+        "--max-requests", str(max_requests),
+        "--max-requests-jitter", str(max(max_requests // 10, 1)),
+        "--access-logfile", "-",
+    ]
+    if mode == "wsgi":
+        command += ["--threads", str(threads)]
+    return command
+
+
+class Command(BaseCommand):
+    help = (
+        "Run the production server: gunicorn with uvicorn workers (asgi) or "
+        "threaded workers (wsgi), configured from settings.SERVER."
+    )
+
+    def add_arguments(self, parser):
+        config = settings.SERVER
+        parser.add_argument("--mode", choices=sorted(APPLICATIONS), default=config["MODE"])
+        parser.add_argument("--bind", default=config["BIND"])
+        parser.add_argument("--workers", type=int, default=config["WORKERS"])
+        parser.add_argument("--threads", type=int, default=config["THREADS"])
+        parser.add_argument("--timeout", type=int, default=config["TIMEOUT"])
+        parser.add_argument("--max-requests", type=int, default=config["MAX_REQUESTS"])
+        parser.add_argument(
+            "--dry-run", action="store_true", help="Print the command instead of running it."
+        )
+
+    def handle(self, *args, **options):
+        mode = options["mode"]
+        workers = options["workers"] or default_workers(mode)
+        config = events.events_settings()
+        if config["ENABLED"] and config["BACKEND"] == "local" and workers > 1:
+            # Each worker has its own local broker, so a change only reaches
+            # the event streams held by the worker that made it.
+            self.stderr.write(
+                self.style.WARNING(
+                    f"EVENTS_BACKEND=local with {workers} workers: /api/events/ "
+                    "clients only hear about changes made on their own worker. "
+                    "Set EVENTS_BACKEND=redis or run a single worker."
+                )
+            )
+        command = gunicorn_command(
+            mode,
+            options["bind"],
+            workers,
+            options["threads"],
+            options["timeout"],
+            options["max_requests"],
+        )
+        if options["dry_run"]:
+            self.stdout.write(" ".join(command))
+            return
+
+        if shutil.which(command[0]) is None:
+            raise CommandError("gunicorn is not installed; see requirements.txt.")
+        if mode == "asgi":
+            os.environ.setdefault("ASYNC_READ_VIEWS", "True")
+        os.execvp(command[0], command)
@@ -0,0 +1,26 @@
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+
+from pearmonieServer.analytics import take_snapshot
+
+
+class Command(BaseCommand):
+    help = (
+        "Store today's inventory rollup (products, units and value per store "
+        "and type) for the analytics trends endpoint. Run daily; rerunning "
+        "replaces the day's rows."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--date", help="Day to record as, YYYY-MM-DD (default: today).")
+
+    def handle(self, *args, **options):
+        day = None
+        if options["date"]:
+            try:
+                day = date.fromisoformat(options["date"])
+            except ValueError:
+                raise CommandError("--date must be YYYY-MM-DD.")
+        rows = take_snapshot(day)
+        self.stdout.write(self.style.SUCCESS(f"Stored {rows} inventory snapshot row(s)."))
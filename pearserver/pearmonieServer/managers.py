@@ -1,4 +1,5 @@
 from django.contrib.auth.base_user import BaseUserManager
+from django.db import models, router
 
 class CustomUserManager(BaseUserManager):
     use_in_migrations = True
@@ -19,4 +20,27 @@ class CustomUserManager(BaseUserManager):
             raise ValueError('Superuser must have is_staff=True.')
         if extra_fields.get('is_superuser') is not True:
             raise ValueError('Superuser must have is_superuser=True.')
-        return self.create_user(email, password, **extra_fields)
\ No newline at end of file
+        return self.create_user(email, password, **extra_fields)
+
+class DimensionManager(models.Manager):
+    """Lookups for the small name-keyed tables (stores, product types)."""
+
+    def resolve(self, name):
+        """The row called ``name``, created on first use."""
+        return self.resolve_many([name])[name]
+
+    def resolve_many(self, names):
+        """``{name: row}`` for ``names``, creating the missing ones in one insert."""
+        names = set(names)
+        # Read where the rows are written; a lagging replica would miss them.
+        queryset = self.using(router.db_for_write(self.model))
+        rows = {row.name: row for row in queryset.filter(name__in=names)}
+        missing = names - set(rows)
+        if missing:
+            # A concurrent writer may add the same name; let the unique
+            # constraint sort it out and read the winners back.
+            queryset.bulk_create(
+                [self.model(name=name) for name in missing], ignore_conflicts=True
+            )
+            rows.update((row.name, row) for row in queryset.filter(name__in=missing))
+        return rows
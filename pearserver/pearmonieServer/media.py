@@ -0,0 +1,166 @@
+"""
+Product image storage.
+
+Clients used to put whole images into ``Products.image`` as ``data:`` URIs,
+which every list response then carried. ``ingest()`` takes an uploaded file
+or a ``data:`` URI and writes the bytes to the default storage under a
+content-hashed name (``products/ab/<sha256>.png``), so identical uploads
+are stored once and the files can be cached forever. It also renders
+thumbnails once, at upload time, and returns the short URLs that go into the
+row. Plain URLs and paths pass through unchanged.
+
+Storage is Django's ``default`` storage (``STORAGES``), so local disk can be
+swapped for any pluggable backend. Thumbnails need Pillow. Without it,
+images are still offloaded but get no thumbnail.
+"""
+import base64
+import binascii
+import hashlib
+import io
+import re
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.utils import timezone
+
+try:
+    from PIL import Image
+except ImportError:  # pragma: no cover - optional dependency
+    Image = None
+
+DEFAULTS = {
+    "MAX_BYTES": 5 * 1024 * 1024,
+    "THUMBNAIL_SIZE": 256,
+    "THUMBNAIL_FORMAT": "WEBP",
+    "PREFIX": "products",
+}
+
+DATA_URI = re.compile(r"^data:(?P<type>[\w/+.-]*)(?P<params>(;[^,;]*)*?);base64,", re.I)
+
+SIGNATURES = (
+    (b"\x89PNG\r\n\x1a\n", "png"),
+    (b"\xff\xd8\xff", "jpg"),
+    (b"GIF87a", "gif"),
+    (b"GIF89a", "gif"),
+)
+
+
+def image_settings():
+    return {**DEFAULTS, **getattr(settings, "PRODUCT_IMAGES", {})}
+
+
+def sniff(data):
+    """The file extension for ``data``'s image format, or ``None``."""
+    for signature, extension in SIGNATURES:
+        if data.startswith(signature):
+            return extension
+    if data[:4] == b"RIFF" and data[8:12] == b"WEBP":
+        return "webp"
+    return None
+
+
+def is_inline(value):
+    return isinstance(value, str) and DATA_URI.match(value) is not None
+
+
+def decode_data_uri(value):
+    match = DATA_URI.match(value)
+    try:
+        return base64.b64decode(value[match.end():], validate=True)
+    except (binascii.Error, ValueError):
+        raise ValidationError("Image data is not valid base64.")
+
+
+def url_for(name):
+    return default_storage.url(name)
+
+
+def save_once(name, data):
+    if not default_storage.exists(name):
+        default_storage.save(name, ContentFile(data))
+    return name
+
+
+def make_thumbnail(data, digest, config):
+    if Image is None:
+        return None
+    size = config["THUMBNAIL_SIZE"]
+    fmt = config["THUMBNAIL_FORMAT"].upper()
+    name = f"{config['PREFIX']}/{digest[:2]}/{digest}_{size}.{fmt.lower()}"
+    if default_storage.exists(name):
+        return name
+    try:
+        with Image.open(io.BytesIO(data)) as image:
+            image.thumbnail((size, size))
+            if image.mode not in ("RGB", "RGBA"):
+                image = image.convert("RGBA")
+            out = io.BytesIO()
+            image.save(out, format=fmt)
+    except Image.DecompressionBombError:
+        # A small file that would decode to gigabytes of pixels.
+        raise ValidationError("Image dimensions are too large.")
+    except (OSError, ValueError):
+        return None
+    return save_once(name, out.getvalue())
+
+
+def store(data):
+    """Store image bytes; returns ``(image_url, thumbnail_url)``."""
+    config = image_settings()
+    if len(data) > config["MAX_BYTES"]:
+        raise ValidationError(f"Images may be at most {config['MAX_BYTES']} bytes.")
+    extension = sniff(data)
+    if extension is None:
+        raise ValidationError("Unsupported image format; use PNG, JPEG, GIF or WebP.")
+
+    digest = hashlib.sha256(data).hexdigest()
+    # Thumbnail first, so an image Pillow rejects is never stored.
+    thumbnail = make_thumbnail(data, digest, config)
+    name = save_once(f"{config['PREFIX']}/{digest[:2]}/{digest}.{extension}", data)
+    return url_for(name), url_for(thumbnail) if thumbnail else ""
+
+
+def ingest(value):
+    """
+    Resolve an incoming ``image`` value to ``(image, thumbnail)``: uploads and
+    ``data:`` URIs are stored, anything else is kept as given.
+    """
+    if hasattr(value, "read"):
+        return store(value.read())
+    if is_inline(value):
+        return store(decode_data_uri(value))
+    return value, None
+
+
+def offload_inline_images(batch_size=500):
+    """
+    Move ``data:`` images already stored in product rows to storage.
+
+    Returns ``(offloaded, errors)``, where ``errors`` maps product ids to the
+    reason their image was left in place.
+    """
+    from . import stock_summary
+    from .models import Products
+
+    inline = Products.objects.filter(image__startswith="data:").order_by("pk")
+    offloaded, errors, last_pk = 0, {}, 0
+    while True:
+        rows = list(inline.filter(pk__gt=last_pk).values_list("pk", "image")[:batch_size])
+        if not rows:
+            break
+        last_pk = rows[-1][0]
+        for pk, image in rows:
+            try:
+                url, thumbnail = ingest(image)
+            except ValidationError as e:
+                errors[pk] = " ".join(e.messages)
+                continue
+            # Only the image columns change, so the stock counters are untouched.
+            offloaded += Products.objects.filter(pk=pk, image=image).update(
+                image=url, thumbnail=thumbnail or "", updated_at=timezone.now()
+            )
+    if offloaded:
+        stock_summary.touch()
+    return offloaded, errors
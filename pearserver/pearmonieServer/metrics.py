@@ -0,0 +1,314 @@
+"""
+Per-request performance metrics, exposed in Prometheus text format at
+``/api/metrics/``.
+
+``MetricsMiddleware`` times every request and labels it with the URL name
+(``login``, ``dashboard``, ``products-list``...). Every database connection
+gets an execute wrapper that adds each query's count and time to the current
+request. ``timer(phase)`` blocks, such as serialization and JSON rendering,
+add their time the same way. The per-request state lives in a context
+variable, so it follows the request into ``sync_to_async`` threads.
+
+Requests slower than ``METRICS["SLOW_REQUEST_MS"]`` are sampled at
+``METRICS["SLOW_SAMPLE_RATE"]`` and logged with their most expensive
+statements and any statement repeated within the request (usually an N+1).
+Only the ``METRICS["SLOW_QUERIES"]`` slowest statements of a request are
+kept, parameters included. ``EXPLAIN`` runs more queries on the request
+thread, so plans are only added for the first ``METRICS["EXPLAIN_QUERIES"]``
+SELECTs when that is set; it is off by default.
+
+Metrics are kept per process. Under several server workers, each scrape
+reports whichever worker answered it.
+"""
+import heapq
+import logging
+import random
+import threading
+import time
+from bisect import bisect_left
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import connections
+
+logger = logging.getLogger(__name__)
+
+DEFAULTS = {
+    "ENABLED": True,
+    "SLOW_REQUEST_MS": 500,
+    "SLOW_SAMPLE_RATE": 1.0,
+    "SLOW_QUERIES": 5,
+    "EXPLAIN_QUERIES": 0,
+}
+
+# Distinct statements counted per request to spot repeats.
+MAX_DISTINCT_STATEMENTS = 1000
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+_current = ContextVar("request_metrics", default=None)
+
+
+def metrics_settings():
+    return {**DEFAULTS, **getattr(settings, "METRICS", {})}
+
+
+class Histogram:
+    def __init__(self, name, help, buckets, labels):
+        self.name = name
+        self.help = help
+        self.buckets = buckets
+        self.labels = labels
+        self.series = defaultdict(lambda: [[0] * (len(buckets) + 1), 0.0, 0])
+
+    def observe(self, value, *labels):
+        counts, _, _ = series = self.series[labels]
+        counts[bisect_left(self.buckets, value)] += 1
+        series[1] += value
+        series[2] += 1
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        for labels, (counts, total, count) in sorted(self.series.items()):
+            base = format_labels(zip(self.labels, labels))
+            cumulative = 0
+            for bound, bucket in zip(self.buckets, counts):
+                cumulative += bucket
+                le = format_labels([*zip(self.labels, labels), ("le", bound)])
+                lines.append(f"{self.name}_bucket{le} {cumulative}")
+            le = format_labels([*zip(self.labels, labels), ("le", "+Inf")])
+            lines.append(f"{self.name}_bucket{le} {count}")
+            lines.append(f"{self.name}_sum{base} {total:.6f}")
+            lines.append(f"{self.name}_count{base} {count}")
+        return lines
+
+
+class CounterMetric:
+    def __init__(self, name, help, labels):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self.series = Counter()
+
+    def inc(self, *labels):
+        self.series[labels] += 1
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        for labels, value in sorted(self.series.items()):
+            lines.append(f"{self.name}{format_labels(zip(self.labels, labels))} {value}")
+        return lines
+
+
+def format_labels(pairs):
+    pairs = list(pairs)
+    if not pairs:
+        return ""
+    body = ",".join(
+        '{}="{}"'.format(
+            key, str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+        )
+        for key, value in pairs
+    )
+    return "{" + body + "}"
+
+
+class Registry:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.requests = Histogram(
+            "pearstock_request_duration_seconds",
+            "Request latency.",
+            LATENCY_BUCKETS,
+            ("route", "method", "status"),
+        )
+        self.queries = Histogram(
+            "pearstock_db_queries_per_request",
+            "Database queries per request.",
+            QUERY_COUNT_BUCKETS,
+            ("route",),
+        )
+        self.query_time = Histogram(
+            "pearstock_db_query_seconds_per_request",
+            "Time spent in database queries per request.",
+            LATENCY_BUCKETS,
+            ("route",),
+        )
+        self.phases = Histogram(
+            "pearstock_phase_seconds",
+            "Time spent serializing and rendering per request.",
+            LATENCY_BUCKETS,
+            ("route", "phase"),
+        )
+        self.sizes = Histogram(
+            "pearstock_response_size_bytes",
+            "Response body size.",
+            SIZE_BUCKETS,
+            ("route",),
+        )
+        self.slow = CounterMetric(
+            "pearstock_slow_requests_total",
+            "Requests slower than the slow request threshold.",
+            ("route",),
+        )
+
+    def record(self, stats, method, status, size):
+        route = stats.route
+        with self.lock:
+            self.requests.observe(stats.seconds, route, method, str(status))
+            self.queries.observe(stats.query_count, route)
+            self.query_time.observe(stats.query_seconds, route)
+            for phase, seconds in stats.phases.items():
+                self.phases.observe(seconds, route, phase)
+            if size is not None:
+                self.sizes.observe(size, route)
+            if stats.slow:
+                self.slow.inc(route)
+
+    def render(self, gauges=()):
+        with self.lock:
+            lines = []
+            for metric in (
+                self.requests,
+                self.queries,
+                self.query_time,
+                self.phases,
+                self.sizes,
+                self.slow,
+            ):
+                lines.extend(metric.render())
+        for name, help, labelled_values in gauges:
+            lines.append(f"# HELP {name} {help}")
+            lines.append(f"# TYPE {name} gauge")
+            for labels, value in labelled_values:
+                lines.append(f"{name}{format_labels(labels)} {value}")
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+
+class RequestStats:
+    def __init__(self, keep=DEFAULTS["SLOW_QUERIES"]):
+        self.route = "unmatched"
+        self.seconds = 0.0
+        self.query_count = 0
+        self.query_seconds = 0.0
+        self.phases = defaultdict(float)
+        self.keep = keep
+        # Min-heap of (elapsed, n, alias, sql, params): the slowest ``keep``.
+        self.slowest = []
+        self.repeats = Counter()
+        self.slow = False
+
+    def add_statement(self, elapsed, alias, sql, params):
+        self.query_count += 1
+        self.query_seconds += elapsed
+        if sql in self.repeats or len(self.repeats) < MAX_DISTINCT_STATEMENTS:
+            self.repeats[sql] += 1
+        entry = (elapsed, self.query_count, alias, sql, params)
+        if len(self.slowest) < self.keep:
+            heapq.heappush(self.slowest, entry)
+        elif self.slowest and elapsed > self.slowest[0][0]:
+            heapq.heapreplace(self.slowest, entry)
+
+
+def record_query(execute, sql, params, many, context):
+    stats = _current.get()
+    if stats is None:
+        return execute(sql, params, many, context)
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        stats.add_statement(
+            time.perf_counter() - start, context["connection"].alias, sql, params
+        )
+
+
+def instrument_connection(connection):
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_query)
+
+
+@contextmanager
+def timer(phase):
+    """Add the block's wall time to ``phase`` of the current request, if any."""
+    stats = _current.get()
+    if stats is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        stats.phases[phase] += time.perf_counter() - start
+
+
+def explain(alias, sql, params):
+    connection = connections[alias]
+    prefix = connection.ops.explain_query_prefix()
+    with connection.cursor() as cursor:
+        cursor.execute(f"{prefix} {sql}", params)
+        return "\n".join(" ".join(str(column) for column in row) for row in cursor.fetchall())
+
+
+def log_slow_request(stats, request, explain_limit):
+    lines = [
+        f"Slow request {request.method} {request.path} ({stats.route}): "
+        f"{stats.seconds * 1000:.0f} ms, {stats.query_count} queries "
+        f"in {stats.query_seconds * 1000:.0f} ms"
+    ]
+    for sql, count in stats.repeats.most_common():
+        if count < 2:
+            break
+        lines.append(f"  repeated {count}x: {sql}")
+    for elapsed, _, alias, sql, params in sorted(stats.slowest, reverse=True):
+        lines.append(f"  {elapsed * 1000:.1f} ms: {sql}")
+        if explain_limit <= 0 or not sql.lstrip().upper().startswith("SELECT"):
+            continue
+        explain_limit -= 1
+        try:
+            plan = explain(alias, sql, params)
+        except Exception as e:  # the plan is best effort
+            plan = f"EXPLAIN failed: {e}"
+        lines.extend(f"    {line}" for line in plan.splitlines())
+    logger.warning("%s", "\n".join(lines))
+
+
+def response_size(response):
+    if getattr(response, "streaming", False):
+        return None
+    return len(response.content)
+
+
+class MetricsMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        options = metrics_settings()
+        if not options["ENABLED"]:
+            return self.get_response(request)
+
+        stats = RequestStats(options["SLOW_QUERIES"])
+        token = _current.set(stats)
+        start = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        stats.seconds = time.perf_counter() - start
+
+        match = getattr(request, "resolver_match", None)
+        if match is not None and match.url_name:
+            stats.route = match.url_name
+        stats.slow = stats.seconds * 1000 >= options["SLOW_REQUEST_MS"]
+        registry.record(stats, request.method, response.status_code, response_size(response))
+        if stats.slow and random.random() < options["SLOW_SAMPLE_RATE"]:
+            log_slow_request(stats, request, options["EXPLAIN_QUERIES"])
+        return response
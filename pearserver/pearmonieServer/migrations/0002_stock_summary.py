@@ -0,0 +1,37 @@
+# Generated by Django 4.2.20 on 2026-10-18 08:44
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pearmonieServer', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StockBreakdown',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('store', models.CharField(max_length=50)),
+                ('type', models.CharField(max_length=30)),
+                ('total_products', models.IntegerField(default=0)),
+                ('low_stock_items', models.IntegerField(default=0)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='StockSummary',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('total_products', models.IntegerField(default=0)),
+                ('low_stock_items', models.IntegerField(default=0)),
+                ('updated_at', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='stockbreakdown',
+            constraint=models.UniqueConstraint(fields=('store', 'type'), name='unique_stock_breakdown'),
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 4.2.20 on 2026-10-18 08:44
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pearmonieServer', '0002_stock_summary'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='products',
+            index=models.Index(fields=['store', 'type'], name='products_store_type_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='products',
+            index=models.Index(fields=['type'], name='products_type_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='products',
+            index=models.Index(fields=['stock'], name='products_stock_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='products',
+            index=models.Index(fields=['user', 'updated_at'], name='products_user_updated_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='products',
+            index=models.Index(fields=['updated_at', 'id'], name='products_updated_id_idx'),
+        ),
+    ]
@@ -0,0 +1,105 @@
+from django.db import migrations
+
+SQLITE_FORWARD = [
+    """
+    CREATE VIRTUAL TABLE "pearmonieServer_products_fts" USING fts5(
+        name, model, type, store,
+        content='pearmonieServer_products', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+    )
+    """,
+    """
+    CREATE VIRTUAL TABLE "pearmonieServer_products_fts_vocab"
+    USING fts5vocab('pearmonieServer_products_fts', 'row')
+    """,
+    """
+    CREATE TRIGGER "pearmonieServer_products_fts_ai"
+    AFTER INSERT ON "pearmonieServer_products" BEGIN
+        INSERT INTO "pearmonieServer_products_fts" (rowid, name, model, type, store)
+        VALUES (new.id, new.name, new.model, new.type, new.store);
+    END
+    """,
+    """
+    CREATE TRIGGER "pearmonieServer_products_fts_ad"
+    AFTER DELETE ON "pearmonieServer_products" BEGIN
+        INSERT INTO "pearmonieServer_products_fts"
+            ("pearmonieServer_products_fts", rowid, name, model, type, store)
+        VALUES ('delete', old.id, old.name, old.model, old.type, old.store);
+    END
+    """,
+    """
+    CREATE TRIGGER "pearmonieServer_products_fts_au"
+    AFTER UPDATE OF name, model, type, store ON "pearmonieServer_products" BEGIN
+        INSERT INTO "pearmonieServer_products_fts"
+            ("pearmonieServer_products_fts", rowid, name, model, type, store)
+        VALUES ('delete', old.id, old.name, old.model, old.type, old.store);
+        INSERT INTO "pearmonieServer_products_fts" (rowid, name, model, type, store)
+        VALUES (new.id, new.name, new.model, new.type, new.store);
+    END
+    """,
+    """
+    INSERT INTO "pearmonieServer_products_fts" ("pearmonieServer_products_fts")
+    VALUES ('rebuild')
+    """,
+]
+
+SQLITE_REVERSE = [
+    'DROP TRIGGER IF EXISTS "pearmonieServer_products_fts_au"',
+    'DROP TRIGGER IF EXISTS "pearmonieServer_products_fts_ad"',
+    'DROP TRIGGER IF EXISTS "pearmonieServer_products_fts_ai"',
+    'DROP TABLE IF EXISTS "pearmonieServer_products_fts_vocab"',
+    'DROP TABLE IF EXISTS "pearmonieServer_products_fts"',
+]
+
+POSTGRES_FORWARD = [
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    """
+    CREATE INDEX IF NOT EXISTS products_search_document_idx
+    ON "pearmonieServer_products" USING gin ((
+        setweight(to_tsvector('simple', coalesce(name, '')), 'A') ||
+        setweight(to_tsvector('simple', coalesce(model, '')), 'B') ||
+        setweight(to_tsvector('simple', coalesce(type, '')), 'C') ||
+        setweight(to_tsvector('simple', coalesce(store, '')), 'C')
+    ))
+    """,
+    """
+    CREATE INDEX IF NOT EXISTS products_name_trgm_idx
+    ON "pearmonieServer_products" USING gin (name gin_trgm_ops)
+    """,
+]
+
+POSTGRES_REVERSE = [
+    "DROP INDEX IF EXISTS products_name_trgm_idx",
+    "DROP INDEX IF EXISTS products_search_document_idx",
+]
+
+
+def sqlite_has_fts5(connection):
+    with connection.cursor() as cursor:
+        cursor.execute("PRAGMA compile_options")
+        return any("FTS5" in row[0] for row in cursor.fetchall())
+
+
+def run(statements_by_vendor):
+    def apply(apps, schema_editor):
+        connection = schema_editor.connection
+        if connection.vendor == "sqlite" and not sqlite_has_fts5(connection):
+            return
+        for statement in statements_by_vendor.get(connection.vendor, []):
+            schema_editor.execute(statement)
+
+    return apply
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pearmonieServer', '0003_product_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            run({"sqlite": SQLITE_FORWARD, "postgresql": POSTGRES_FORWARD}),
+            run({"sqlite": SQLITE_REVERSE, "postgresql": POSTGRES_REVERSE}),
+        ),
+    ]
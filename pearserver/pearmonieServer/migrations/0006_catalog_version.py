@@ -0,0 +1,18 @@
+# Generated by Django 4.2.20 on 2026-10-18 08:51
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pearmonieServer', '0005_stock_movement'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='stocksummary',
+            name='version',
+            field=models.BigIntegerField(default=0),
+        ),
+    ]
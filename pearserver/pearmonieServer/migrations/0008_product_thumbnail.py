@@ -0,0 +1,32 @@
+# Generated by Django 4.2.20 on 2026-10-18 09:23
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pearmonieServer', '0007_task_queue_and_otp'),
+    ]
+
+    # On SQLite, AddField with a default rebuilds the products table, which
+    # drops the full-text search triggers from 0004 and copies every row. A
+    # plain ADD COLUMN does neither and works the same on Postgres.
+    operations = [
+        migrations.SeparateDatabaseAndState(
+            database_operations=[
+                migrations.RunSQL(
+                    'ALTER TABLE "pearmonieServer_products" '
+                    "ADD COLUMN \"thumbnail\" varchar(200) NOT NULL DEFAULT ''",
+                    'ALTER TABLE "pearmonieServer_products" DROP COLUMN "thumbnail"',
+                ),
+            ],
+            state_operations=[
+                migrations.AddField(
+                    model_name='products',
+                    name='thumbnail',
+                    field=models.CharField(blank=True, default='', max_length=200),
+                ),
+            ],
+        ),
+    ]
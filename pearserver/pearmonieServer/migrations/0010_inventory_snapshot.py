@@ -0,0 +1,29 @@
+# Generated by Django 4.2.20 on 2026-10-18 09:34
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pearmonieServer', '0009_product_tombstone'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='InventorySnapshot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('store', models.CharField(max_length=50)),
+                ('type', models.CharField(max_length=30)),
+                ('products', models.IntegerField(default=0)),
+                ('units', models.BigIntegerField(default=0)),
+                ('value', models.DecimalField(decimal_places=2, default=0, max_digits=20)),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='inventorysnapshot',
+            constraint=models.UniqueConstraint(fields=('date', 'store', 'type'), name='unique_inventory_snapshot'),
+        ),
+    ]
@@ -0,0 +1,306 @@
+import importlib
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Q, Subquery
+import django.db.models.deletion
+
+product_search = importlib.import_module("pearmonieServer.migrations.0004_product_search")
+
+# The FTS5 index keeps its columns, but store and type names now live in the
+# dimension tables. The content table becomes a view joining them back, and
+# the triggers look the names up; renaming a store or type reindexes its rows.
+SQLITE_FORWARD = [
+    """
+    CREATE VIEW "pearmonieServer_products_search" AS
+    SELECT p.id, p.name, p.model, t.name AS type, s.name AS store
+    FROM "pearmonieServer_products" p
+    JOIN "pearmonieServer_producttype" t ON t.id = p.type_id
+    JOIN "pearmonieServer_store" s ON s.id = p.store_id
+    """,
+    """
+    CREATE VIRTUAL TABLE "pearmonieServer_products_fts" USING fts5(
+        name, model, type, store,
+        content='pearmonieServer_products_search', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+    )
+    """,
+    """
+    CREATE VIRTUAL TABLE "pearmonieServer_products_fts_vocab"
+    USING fts5vocab('pearmonieServer_products_fts', 'row')
+    """,
+    """
+    CREATE TRIGGER "pearmonieServer_products_fts_ai"
+    AFTER INSERT ON "pearmonieServer_products" BEGIN
+        INSERT INTO "pearmonieServer_products_fts" (rowid, name, model, type, store)
+        SELECT id, name, model, type, store FROM "pearmonieServer_products_search"
+        WHERE id = new.id;
+    END
+    """,
+    """
+    CREATE TRIGGER "pearmonieServer_products_fts_ad"
+    AFTER DELETE ON "pearmonieServer_products" BEGIN
+        INSERT INTO "pearmonieServer_products_fts"
+            ("pearmonieServer_products_fts", rowid, name, model, type, store)
+        VALUES (
+            'delete', old.id, old.name, old.model,
+            (SELECT name FROM "pearmonieServer_producttype" WHERE id = old.type_id),
+            (SELECT name FROM "pearmonieServer_store" WHERE id = old.store_id)
+        );
+    END
+    """,
+    """
+    CREATE TRIGGER "pearmonieServer_products_fts_au"
+    AFTER UPDATE OF name, model, type_id, store_id ON "pearmonieServer_products" BEGIN
+        INSERT INTO "pearmonieServer_products_fts"
+            ("pearmonieServer_products_fts", rowid, name, model, type, store)
+        VALUES (
+            'delete', old.id, old.name, old.model,
+            (SELECT name FROM "pearmonieServer_producttype" WHERE id = old.type_id),
+            (SELECT name FROM "pearmonieServer_store" WHERE id = old.store_id)
+        );
+        INSERT INTO "pearmonieServer_products_fts" (rowid, name, model, type, store)
+        SELECT id, name, model, type, store FROM "pearmonieServer_products_search"
+        WHERE id = new.id;
+    END
+    """,
+    """
+    CREATE TRIGGER "pearmonieServer_store_fts_au"
+    AFTER UPDATE OF name ON "pearmonieServer_store" BEGIN
+        INSERT INTO "pearmonieServer_products_fts"
+            ("pearmonieServer_products_fts", rowid, name, model, type, store)
+        SELECT 'delete', id, name, model, type, old.name
+        FROM "pearmonieServer_products_search" WHERE store = new.name;
+        INSERT INTO "pearmonieServer_products_fts" (rowid, name, model, type, store)
+        SELECT id, name, model, type, store FROM "pearmonieServer_products_search"
+        WHERE store = new.name;
+    END
+    """,
+    """
+    CREATE TRIGGER "pearmonieServer_producttype_fts_au"
+    AFTER UPDATE OF name ON "pearmonieServer_producttype" BEGIN
+        INSERT INTO "pearmonieServer_products_fts"
+            ("pearmonieServer_products_fts", rowid, name, model, type, store)
+        SELECT 'delete', id, name, model, old.name, store
+        FROM "pearmonieServer_products_search" WHERE type = new.name;
+        INSERT INTO "pearmonieServer_products_fts" (rowid, name, model, type, store)
+        SELECT id, name, model, type, store FROM "pearmonieServer_products_search"
+        WHERE type = new.name;
+    END
+    """,
+    """
+    INSERT INTO "pearmonieServer_products_fts" ("pearmonieServer_products_fts")
+    VALUES ('rebuild')
+    """,
+]
+
+SQLITE_REVERSE = [
+    'DROP TRIGGER IF EXISTS "pearmonieServer_producttype_fts_au"',
+    'DROP TRIGGER IF EXISTS "pearmonieServer_store_fts_au"',
+    *product_search.SQLITE_REVERSE,
+    'DROP VIEW IF EXISTS "pearmonieServer_products_search"',
+]
+
+# An index cannot reach into the dimension tables, so the document covers
+# name and model only; the search backend matches store and type names
+# against the (tiny) dimension tables instead. Columns are qualified to
+# match the backend, whose queries join tables that also have a ``name``.
+POSTGRES_FORWARD = [
+    """
+    CREATE INDEX IF NOT EXISTS products_search_document_idx
+    ON "pearmonieServer_products" USING gin ((
+        setweight(to_tsvector('simple', coalesce("pearmonieServer_products"."name", '')), 'A') ||
+        setweight(to_tsvector('simple', coalesce("pearmonieServer_products"."model", '')), 'B')
+    ))
+    """,
+]
+
+POSTGRES_REVERSE = [
+    "DROP INDEX IF EXISTS products_search_document_idx",
+]
+
+# Only the document index reads the store and type columns; the trigram
+# index on name is left alone.
+POSTGRES_DROP_LEGACY = [
+    "DROP INDEX IF EXISTS products_search_document_idx",
+]
+
+
+def fill_dimensions(apps, schema_editor):
+    db = schema_editor.connection.alias
+    Products = apps.get_model("pearmonieServer", "Products")
+    for field, model_name in (("store", "Store"), ("type", "ProductType")):
+        Dimension = apps.get_model("pearmonieServer", model_name)
+        names = (
+            Products.objects.using(db)
+            .order_by()
+            .values_list(field, flat=True)
+            .distinct()
+        )
+        Dimension.objects.using(db).bulk_create(
+            [Dimension(name=name) for name in names], ignore_conflicts=True
+        )
+        Products.objects.using(db).update(
+            **{
+                f"{field}_dim": Subquery(
+                    Dimension.objects.filter(name=OuterRef(field)).values("pk")[:1]
+                )
+            }
+        )
+
+
+def restore_names(apps, schema_editor):
+    db = schema_editor.connection.alias
+    Products = apps.get_model("pearmonieServer", "Products")
+    for field, model_name in (("store", "Store"), ("type", "ProductType")):
+        Dimension = apps.get_model("pearmonieServer", model_name)
+        Products.objects.using(db).update(
+            **{
+                field: Subquery(
+                    Dimension.objects.filter(pk=OuterRef(f"{field}_dim")).values(
+                        "name"
+                    )[:1]
+                )
+            }
+        )
+
+
+def count_breakdown(apps, schema_editor):
+    """Fill the per store/type counters from the catalog, in either schema."""
+    db = schema_editor.connection.alias
+    Products = apps.get_model("pearmonieServer", "Products")
+    StockBreakdown = apps.get_model("pearmonieServer", "StockBreakdown")
+    store = Products._meta.get_field("store").attname
+    type_ = Products._meta.get_field("type").attname
+    low = Q(stock__lt=getattr(settings, "LOW_STOCK_THRESHOLD", 10))
+    rows = (
+        Products.objects.using(db)
+        .values(store, type_)
+        .annotate(total=Count("id"), low=Count("id", filter=low))
+        .order_by()
+    )
+    StockBreakdown.objects.using(db).bulk_create(
+        StockBreakdown(
+            **{store: row[store], type_: row[type_]},
+            total_products=row["total"],
+            low_stock_items=row["low"],
+        )
+        for row in rows
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pearmonieServer', '0010_inventory_snapshot'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProductType',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=30, unique=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='Store',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=50, unique=True)),
+            ],
+        ),
+        # The breakdown counters are keyed on the new columns too; they are
+        # counted again from the catalog once it is converted, either way.
+        migrations.RunPython(migrations.RunPython.noop, count_breakdown),
+        migrations.DeleteModel(
+            name='StockBreakdown',
+        ),
+        # The search index reads the columns being replaced; drop it first
+        # and build it again over the dimension tables at the end.
+        migrations.RunPython(
+            product_search.run({"sqlite": product_search.SQLITE_REVERSE, "postgresql": POSTGRES_DROP_LEGACY}),
+            product_search.run({"sqlite": product_search.SQLITE_FORWARD, "postgresql": product_search.POSTGRES_FORWARD}),
+        ),
+        # Nullable while the rows are copied, so the migration also reverses
+        # over a populated table.
+        migrations.AlterField(
+            model_name='products',
+            name='store',
+            field=models.CharField(max_length=50, null=True),
+        ),
+        migrations.AlterField(
+            model_name='products',
+            name='type',
+            field=models.CharField(max_length=30, null=True),
+        ),
+        migrations.AddField(
+            model_name='products',
+            name='store_dim',
+            field=models.ForeignKey(db_index=False, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='products', to='pearmonieServer.store'),
+        ),
+        migrations.AddField(
+            model_name='products',
+            name='type_dim',
+            field=models.ForeignKey(null=True, on_delete=django.db.models.deletion.PROTECT, related_name='products', to='pearmonieServer.producttype'),
+        ),
+        migrations.RunPython(fill_dimensions, restore_names),
+        migrations.RemoveIndex(
+            model_name='products',
+            name='products_store_type_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='products',
+            name='products_type_idx',
+        ),
+        migrations.RemoveField(
+            model_name='products',
+            name='store',
+        ),
+        migrations.RemoveField(
+            model_name='products',
+            name='type',
+        ),
+        migrations.RenameField(
+            model_name='products',
+            old_name='store_dim',
+            new_name='store',
+        ),
+        migrations.RenameField(
+            model_name='products',
+            old_name='type_dim',
+            new_name='type',
+        ),
+        migrations.AlterField(
+            model_name='products',
+            name='store',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.PROTECT, related_name='products', to='pearmonieServer.store'),
+        ),
+        migrations.AlterField(
+            model_name='products',
+            name='type',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='products', to='pearmonieServer.producttype'),
+        ),
+        migrations.AddIndex(
+            model_name='products',
+            index=models.Index(fields=['store', 'type'], name='products_store_type_idx'),
+        ),
+        migrations.CreateModel(
+            name='StockBreakdown',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('total_products', models.IntegerField(default=0)),
+                ('low_stock_items', models.IntegerField(default=0)),
+                ('store', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='pearmonieServer.store')),
+                ('type', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='pearmonieServer.producttype')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('store', 'type'), name='unique_stock_breakdown')],
+            },
+        ),
+        migrations.RunPython(count_breakdown, migrations.RunPython.noop),
+        migrations.RunPython(
+            product_search.run({"sqlite": SQLITE_FORWARD, "postgresql": POSTGRES_FORWARD}),
+            product_search.run({"sqlite": SQLITE_REVERSE, "postgresql": POSTGRES_REVERSE}),
+        ),
+    ]
@@ -4,7 +4,7 @@ from django.db import models
 from django.utils import timezone
 from phonenumber_field.modelfields import PhoneNumberField
 
-from .managers import CustomUserManager
+from .managers import CustomUserManager, DimensionManager
 
 
 class CustomUser(AbstractUser):
@@ -26,14 +26,40 @@ class CustomUser(AbstractUser):
         return self.email
 
 
+class Store(models.Model):
+    name = models.CharField(max_length=50, unique=True)
+
+    objects = DimensionManager()
+
+    def __str__(self):
+        return self.name
+
+
+class ProductType(models.Model):
+    name = models.CharField(max_length=30, unique=True)
+
+    objects = DimensionManager()
+
+    def __str__(self):
+        return self.name
+
+
 class Products(models.Model):
+    # Columns the stock summary counters are keyed on.
+    SUMMARY_FIELDS = ("store_id", "type_id", "stock")
+
     user = models.ForeignKey(
         CustomUser, on_delete=models.CASCADE, related_name="products"
     )  
     name = models.CharField(max_length=100, unique=True, blank=False, null=False)
     model = models.CharField(max_length=50, blank=False, null=False)
-    type = models.CharField(max_length=30, blank=False, null=False)
-    store = models.CharField(max_length=50, blank=False, null=False)
+    type = models.ForeignKey(
+        ProductType, on_delete=models.PROTECT, related_name="products"
+    )
+    # Indexed as the leading column of products_store_type_idx.
+    store = models.ForeignKey(
+        Store, on_delete=models.PROTECT, related_name="products", db_index=False
+    )
     price = models.DecimalField(
         max_digits=10,
         decimal_places=2,
@@ -42,11 +68,198 @@ class Products(models.Model):
         null=False,
     )
     image = models.TextField(max_length=100, blank=False, null=False)
+    thumbnail = models.CharField(max_length=200, blank=True, default="")
     stock = models.PositiveIntegerField(
         validators=[MinValueValidator(1)], blank=False, null=False
     )
     created_at = models.DateTimeField(default=timezone.now)
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=["store", "type"], name="products_store_type_idx"),
+            models.Index(fields=["stock"], name="products_stock_idx"),
+            models.Index(fields=["user", "updated_at"], name="products_user_updated_idx"),
+            models.Index(fields=["updated_at", "id"], name="products_updated_id_idx"),
+        ]
+
     def __str__(self):
         return self.name
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remember the counted columns as loaded, so the stock summary can
+        # apply deltas on save/delete without re-reading the row.
+        if all(field in instance.__dict__ for field in cls.SUMMARY_FIELDS):
+            instance._summary_snapshot = {
+                field: instance.__dict__[field] for field in cls.SUMMARY_FIELDS
+            }
+        return instance
+
+
+class StockSummary(models.Model):
+    """Single-row catalog totals maintained incrementally on product writes."""
+
+    total_products = models.IntegerField(default=0)
+    low_stock_items = models.IntegerField(default=0)
+    # Bumped on every product write; a cheap validator for cached reads.
+    version = models.BigIntegerField(default=0)
+    updated_at = models.DateTimeField(default=timezone.now)
+
+
+class StockBreakdown(models.Model):
+    """Per store/type product and low-stock counts."""
+
+    store = models.ForeignKey(Store, on_delete=models.CASCADE, related_name="+")
+    type = models.ForeignKey(ProductType, on_delete=models.CASCADE, related_name="+")
+    total_products = models.IntegerField(default=0)
+    low_stock_items = models.IntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["store", "type"], name="unique_stock_breakdown"
+            )
+        ]
+
+    def __str__(self):
+        return f"{self.store_id} / {self.type_id}"
+
+
+class StockMovement(models.Model):
+    """Append-only ledger of stock adjustments."""
+
+    product = models.ForeignKey(
+        Products,
+        on_delete=models.SET_NULL,
+        null=True,
+        related_name="stock_movements",
+    )
+    user = models.ForeignKey(
+        CustomUser,
+        on_delete=models.SET_NULL,
+        null=True,
+        related_name="stock_movements",
+    )
+    delta = models.IntegerField()
+    stock_after = models.PositiveIntegerField()
+    reason = models.CharField(max_length=100, blank=True)
+    created_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["product", "created_at"], name="movement_product_created_idx"
+            ),
+        ]
+
+    def save(self, *args, **kwargs):
+        if not self._state.adding:
+            raise ValueError("Stock movements are append-only.")
+        super().save(*args, **kwargs)
+
+    def __str__(self):
+        return f"{self.product_id}: {self.delta:+d}"
+
+
+class InventorySnapshot(models.Model):
+    """Daily per store/type rollup of the catalog, written by ``analytics.py``."""
+
+    date = models.DateField()
+    store = models.CharField(max_length=50)
+    type = models.CharField(max_length=30)
+    products = models.IntegerField(default=0)
+    units = models.BigIntegerField(default=0)
+    value = models.DecimalField(max_digits=20, decimal_places=2, default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["date", "store", "type"], name="unique_inventory_snapshot"
+            )
+        ]
+
+    def __str__(self):
+        return f"{self.date} {self.store} / {self.type}"
+
+
+class ProductTombstone(models.Model):
+    """
+    Marks a deleted product for the delta sync feed (``sync.py``); removed
+    by ``manage.py compact_tombstones`` once older than the sync window.
+    """
+
+    # Not a foreign key: the product row is gone.
+    product_id = models.BigIntegerField()
+    deleted_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["deleted_at", "product_id"], name="tombstone_deleted_idx"
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.product_id} deleted at {self.deleted_at}"
+
+
+class Task(models.Model):
+    """A unit of background work, run by ``manage.py run_tasks``."""
+
+    PENDING = "pending"
+    RUNNING = "running"
+    DONE = "done"
+    FAILED = "failed"
+    STATUS_CHOICES = [
+        (PENDING, "Pending"),
+        (RUNNING, "Running"),
+        (DONE, "Done"),
+        (FAILED, "Failed"),
+    ]
+
+    name = models.CharField(max_length=100)
+    payload = models.JSONField(default=dict)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=PENDING)
+    attempts = models.PositiveIntegerField(default=0)
+    max_attempts = models.PositiveIntegerField(default=3)
+    run_at = models.DateTimeField(default=timezone.now)
+    locked_at = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField(blank=True)
+    result = models.JSONField(null=True, blank=True)
+    created_at = models.DateTimeField(default=timezone.now)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["status", "run_at"], name="task_status_run_at_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.name} #{self.pk} ({self.status})"
+
+
+class OneTimePassword(models.Model):
+    """A short-lived code sent to a user; only an HMAC of the code is stored."""
+
+    PASSWORD_RESET = "password_reset"
+
+    user = models.ForeignKey(
+        CustomUser, on_delete=models.CASCADE, related_name="one_time_passwords"
+    )
+    purpose = models.CharField(max_length=30, default=PASSWORD_RESET)
+    code_hash = models.CharField(max_length=64)
+    attempts = models.PositiveIntegerField(default=0)
+    expires_at = models.DateTimeField()
+    used_at = models.DateTimeField(null=True, blank=True)
+    created_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["code_hash"], name="otp_code_hash_idx"),
+            models.Index(fields=["user", "purpose"], name="otp_user_purpose_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.purpose} code for {self.user_id}"
@@ -0,0 +1,124 @@
+"""
+One-time passwords for password resets.
+
+Codes are random digits and only their HMAC (keyed on ``SECRET_KEY``) is
+stored. Issuing a new code for a user and purpose invalidates the earlier
+ones. A code expires after ``OTP["TTL_SECONDS"]`` and is burnt after
+``OTP["MAX_ATTEMPTS"]`` wrong guesses. Codes are only checked against the
+latest code of the given email, so every guess counts against one code and
+a guess can never consume another user's.
+
+A verified code is exchanged for a reset token, which allows one password
+change within ``PASSWORD_RESET_TIMEOUT`` seconds: it is signed over the
+user's password hash, so setting a new password invalidates it.
+"""
+import secrets
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.auth.tokens import default_token_generator
+from django.core.mail import send_mail
+from django.utils import timezone
+from django.utils.crypto import salted_hmac
+from django.utils.encoding import force_bytes, force_str
+from django.utils.http import urlsafe_base64_decode, urlsafe_base64_encode
+
+from .models import CustomUser, OneTimePassword
+from .tasks import task
+
+DEFAULTS = {
+    "LENGTH": 6,
+    "TTL_SECONDS": 600,
+    "MAX_ATTEMPTS": 5,
+}
+
+
+def otp_settings():
+    return {**DEFAULTS, **getattr(settings, "OTP", {})}
+
+
+def hash_code(code):
+    return salted_hmac("pearmonieServer.otp", str(code).strip()).hexdigest()
+
+
+def issue(user, purpose=OneTimePassword.PASSWORD_RESET):
+    """Create a fresh code for ``user``, invalidating earlier ones; returns the code."""
+    config = otp_settings()
+    code = "".join(secrets.choice("0123456789") for _ in range(config["LENGTH"]))
+    now = timezone.now()
+    OneTimePassword.objects.filter(user=user, purpose=purpose, used_at=None).update(
+        used_at=now
+    )
+    OneTimePassword.objects.create(
+        user=user,
+        purpose=purpose,
+        code_hash=hash_code(code),
+        expires_at=now + timedelta(seconds=config["TTL_SECONDS"]),
+    )
+    return code
+
+
+def verify(code, email, purpose=OneTimePassword.PASSWORD_RESET):
+    """
+    Consume ``email``'s latest valid code if ``code`` matches and return its
+    user, or ``None``. Wrong guesses count against that code.
+    """
+    if not code or not email:
+        return None
+    now = timezone.now()
+    otp = (
+        OneTimePassword.objects.filter(
+            purpose=purpose, used_at=None, expires_at__gt=now, user__email=email
+        )
+        .select_related("user")
+        .order_by("-created_at")
+        .first()
+    )
+    if otp is None:
+        return None
+    if not secrets.compare_digest(otp.code_hash, hash_code(code)):
+        otp.attempts += 1
+        if otp.attempts >= otp_settings()["MAX_ATTEMPTS"]:
+            otp.used_at = now
+        otp.save(update_fields=["attempts", "used_at"])
+        return None
+
+    # Consume atomically so two concurrent requests cannot both succeed.
+    if not OneTimePassword.objects.filter(pk=otp.pk, used_at=None).update(used_at=now):
+        return None
+    return otp.user
+
+
+def issue_reset_token(user):
+    """Return a token allowing one password change for ``user``."""
+    uid = urlsafe_base64_encode(force_bytes(user.pk))
+    return f"{uid}:{default_token_generator.make_token(user)}"
+
+
+def check_reset_token(reset_token):
+    """Return the user ``reset_token`` was issued for if it is still valid, or ``None``."""
+    uid, _, token = str(reset_token or "").partition(":")
+    try:
+        pk = force_str(urlsafe_base64_decode(uid))
+        user = CustomUser.objects.filter(pk=pk).first()
+    except (TypeError, ValueError, OverflowError):
+        return None
+    if user is None or not default_token_generator.check_token(user, token):
+        return None
+    return user
+
+
+@task(name="send_password_reset_code")
+def send_password_reset_code(user_id):
+    user = CustomUser.objects.filter(pk=user_id).first()
+    if user is None:
+        return {"sent": False}
+    code = issue(user)
+    minutes = otp_settings()["TTL_SECONDS"] // 60
+    send_mail(
+        "Your PearStock password reset code",
+        f"Your password reset code is {code}. It expires in {minutes} minutes.",
+        settings.DEFAULT_FROM_EMAIL,
+        [user.email],
+    )
+    return {"sent": True}
@@ -0,0 +1,92 @@
+"""
+Primary/replica database routing with read-your-writes stickiness.
+
+Reads of the catalog models go to ``settings.REPLICA_DATABASE_ALIAS`` when it
+is configured; every write, and every read of anything else (users, tokens),
+goes to ``default``. Reads are pinned to the primary for the rest of any
+request with an unsafe method, and for ``REPLICA_STICKY_SECONDS`` afterwards
+for the same client, so a client never reads a replica that has not caught
+up with its own write.
+"""
+import hashlib
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import connections
+
+REPLICA_MODELS = {
+    "products",
+    "stocksummary",
+    "stockbreakdown",
+    "store",
+    "producttype",
+    "stockmovement",
+    "inventorysnapshot",
+}
+SAFE_METHODS = ("GET", "HEAD", "OPTIONS")
+
+_pinned = ContextVar("pinned_to_primary", default=False)
+
+
+def replica_alias():
+    alias = getattr(settings, "REPLICA_DATABASE_ALIAS", "replica")
+    return alias if alias in connections.settings else None
+
+
+@contextmanager
+def pinned_to_primary():
+    token = _pinned.set(True)
+    try:
+        yield
+    finally:
+        _pinned.reset(token)
+
+
+class PrimaryReplicaRouter:
+    def db_for_read(self, model, **hints):
+        if _pinned.get():
+            return "default"
+        if (
+            model._meta.app_label == "pearmonieServer"
+            and model._meta.model_name in REPLICA_MODELS
+        ):
+            return replica_alias()
+        return None
+
+    def db_for_write(self, model, **hints):
+        return "default"
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Both aliases hold the same data, so relations across them are fine.
+        return True
+
+
+def client_key(request):
+    credential = request.META.get("HTTP_AUTHORIZATION") or request.META.get(
+        "REMOTE_ADDR", ""
+    )
+    return "replica-pin:" + hashlib.sha256(credential.encode()).hexdigest()
+
+
+class ReplicaPinningMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if replica_alias() is None:
+            return self.get_response(request)
+
+        cache = caches[settings.REPLICA_STICKY_CACHE_ALIAS]
+        key = client_key(request)
+        writing = request.method not in SAFE_METHODS
+        token = _pinned.set(writing or cache.get(key) is not None)
+        try:
+            response = self.get_response(request)
+        finally:
+            _pinned.reset(token)
+
+        if writing and response.status_code < 400:
+            cache.set(key, True, settings.REPLICA_STICKY_SECONDS)
+        return response
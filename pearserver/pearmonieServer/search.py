@@ -0,0 +1,185 @@
+"""
+Pluggable product search backends.
+
+``get_search_backend()`` returns the backend named by
+``settings.PRODUCT_SEARCH_BACKEND`` or, when unset, the best one available on
+the database vendor: FTS5 on SQLite, ``tsvector``/``pg_trgm`` on PostgreSQL and
+an ``icontains`` scan everywhere else. Every backend narrows a ``Products``
+queryset to the matches for ``query`` and orders them by relevance.
+"""
+import difflib
+import re
+
+from django.conf import settings
+from django.db import connections
+from django.db.models import BooleanField, FloatField, Q
+from django.db.models.expressions import RawSQL
+from django.utils.module_loading import import_string
+
+from .models import ProductType, Store
+
+SEARCH_FIELDS = ("name", "model", "type__name", "store__name")
+
+_backends = {}
+
+
+def search_terms(query):
+    return re.findall(r"\w+", query.lower())
+
+
+class SearchBackend:
+    def search(self, queryset, query):
+        raise NotImplementedError
+
+
+class SimpleSearchBackend(SearchBackend):
+    """Unindexed substring match across the search fields, without ranking."""
+
+    def search(self, queryset, query):
+        condition = Q()
+        for term in search_terms(query):
+            term_condition = Q()
+            for field in SEARCH_FIELDS:
+                term_condition |= Q(**{f"{field}__icontains": term})
+            condition &= term_condition
+        return queryset.filter(condition)
+
+
+class SQLiteFTSSearchBackend(SearchBackend):
+    """
+    BM25-ranked prefix search over the ``pearmonieServer_products_fts`` FTS5
+    index, which triggers keep in sync with the products table.
+
+    When no product matches, each term is replaced by its closest spellings
+    from the index vocabulary and the search is retried once.
+    """
+
+    table = "pearmonieServer_products_fts"
+    vocab_table = "pearmonieServer_products_fts_vocab"
+    # bm25() column weights, in SEARCH_FIELDS order.
+    weights = (10.0, 5.0, 2.0, 2.0)
+
+    def search(self, queryset, query):
+        terms = search_terms(query)
+        if not terms:
+            return queryset.none()
+        results = self.match(queryset, terms)
+        if results.exists():
+            return results
+        corrected = [self.correct(queryset.db, term) for term in terms]
+        if all(corrected):
+            return self.match(queryset, corrected, prefix=False)
+        return results
+
+    def match(self, queryset, terms, prefix=True):
+        groups = []
+        for term in terms:
+            spellings = term if isinstance(term, list) else [term]
+            options = [f'"{word}"*' if prefix else f'"{word}"' for word in spellings]
+            groups.append("(" + " OR ".join(options) + ")")
+        product_table = queryset.model._meta.db_table
+        weights = ", ".join(str(weight) for weight in self.weights)
+        return queryset.extra(
+            tables=[self.table],
+            where=[
+                f'"{self.table}".rowid = "{product_table}"."id"',
+                f'"{self.table}" MATCH %s',
+            ],
+            params=[" AND ".join(groups)],
+            select={"search_rank": f'bm25("{self.table}", {weights})'},
+            order_by=["search_rank"],
+        )
+
+    def correct(self, alias, term):
+        """Return up to three indexed words spelled like ``term``."""
+        with connections[alias].cursor() as cursor:
+            cursor.execute(
+                f'SELECT term FROM "{self.vocab_table}" '
+                "WHERE term >= %s AND term < %s AND length(term) BETWEEN %s AND %s",
+                [term[0], chr(ord(term[0]) + 1), len(term) - 2, len(term) + 2],
+            )
+            candidates = [row[0] for row in cursor.fetchall()]
+        return difflib.get_close_matches(term, candidates, n=3, cutoff=0.7)
+
+
+class PostgresSearchBackend(SearchBackend):
+    """
+    Weighted ``tsvector`` prefix search with ``pg_trgm`` similarity on the name
+    for misspellings. The document expression matches the GIN index created in
+    the ``store_and_type_dimensions`` migration, so it must be kept identical
+    to it. Store and type names live in their own small tables; a term may
+    match those instead of the document.
+    """
+
+    # Qualified, since product queries join the store and type tables, which
+    # have a ``name`` column of their own.
+    name = '"pearmonieServer_products"."name"'
+    model = '"pearmonieServer_products"."model"'
+    document = (
+        f"(setweight(to_tsvector('simple', coalesce({name}, '')), 'A') || "
+        f"setweight(to_tsvector('simple', coalesce({model}, '')), 'B'))"
+    )
+    dimensions = (("store_id", Store), ("type_id", ProductType))
+
+    def term_condition(self):
+        options = [f"{self.document} @@ to_tsquery('simple', %s)"] + [
+            f'{column} IN (SELECT id FROM "{model._meta.db_table}" '
+            "WHERE to_tsvector('simple', name) @@ to_tsquery('simple', %s))"
+            for column, model in self.dimensions
+        ]
+        return "(" + " OR ".join(options) + ")"
+
+    def search(self, queryset, query):
+        terms = search_terms(query)
+        if not terms:
+            return queryset.none()
+        text = " ".join(terms)
+        condition = " AND ".join(self.term_condition() for _ in terms)
+        params = [
+            f"{term}:*" for term in terms for _ in range(len(self.dimensions) + 1)
+        ]
+        matches = RawSQL(
+            f"(({condition}) OR {self.name} %% %s)",
+            params + [text],
+            output_field=BooleanField(),
+        )
+        rank = RawSQL(
+            f"ts_rank({self.document}, to_tsquery('simple', %s)) "
+            f"+ similarity({self.name}, %s)",
+            [" | ".join(f"{term}:*" for term in terms), text],
+            output_field=FloatField(),
+        )
+        return (
+            queryset.filter(matches)
+            .annotate(search_rank=rank)
+            .order_by("-search_rank", "id")
+        )
+
+
+def default_backend_path(vendor):
+    if vendor == "sqlite":
+        return "pearmonieServer.search.SQLiteFTSSearchBackend"
+    if vendor == "postgresql":
+        return "pearmonieServer.search.PostgresSearchBackend"
+    return "pearmonieServer.search.SimpleSearchBackend"
+
+
+def get_search_backend(alias="default"):
+    path = getattr(settings, "PRODUCT_SEARCH_BACKEND", None)
+    if not path:
+        connection = connections[alias]
+        path = default_backend_path(connection.vendor)
+        if connection.vendor == "sqlite" and not _has_fts_table(alias):
+            path = "pearmonieServer.search.SimpleSearchBackend"
+    if path not in _backends:
+        _backends[path] = import_string(path)()
+    return _backends[path]
+
+
+def _has_fts_table(alias):
+    with connections[alias].cursor() as cursor:
+        cursor.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = %s",
+            [SQLiteFTSSearchBackend.table],
+        )
+        return cursor.fetchone() is not None
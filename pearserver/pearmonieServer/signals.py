@@ -0,0 +1,74 @@
+from django.db.backends.signals import connection_created
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from rest_framework.authtoken.models import Token
+
+from . import events, metrics, sqlite, stock_summary
+from .api import authentication
+from .models import CustomUser, Products, ProductTombstone, ProductType, Store
+
+
+@receiver(pre_save, sender=Products)
+def remember_stock_state(sender, instance, raw, using, **kwargs):
+    if raw or instance.pk is None:
+        return
+    if getattr(instance, "_summary_snapshot", None) is None:
+        instance._summary_snapshot = stock_summary.load_snapshot(
+            instance.pk, using
+        )
+
+
+@receiver(post_save, sender=Products)
+def update_stock_summary_on_save(sender, instance, created, raw, **kwargs):
+    if raw:
+        return
+    before = None if created else getattr(instance, "_summary_snapshot", None)
+    after = stock_summary.snapshot(instance)
+    stock_summary.apply_changes([(before, after)])
+    instance._summary_snapshot = after
+    events.product_changed(
+        "product.created" if created else "product.updated", instance, before
+    )
+
+
+@receiver(post_delete, sender=Products)
+def update_stock_summary_on_delete(sender, instance, **kwargs):
+    before = getattr(instance, "_summary_snapshot", None)
+    stock_summary.apply_changes([(before or stock_summary.snapshot(instance), None)])
+    ProductTombstone.objects.create(product_id=instance.pk)
+    events.product_changed("product.deleted", instance, before)
+
+
+@receiver(post_save, sender=Store)
+@receiver(post_save, sender=ProductType)
+def invalidate_catalog_on_rename(sender, instance, created, raw, using, **kwargs):
+    # Products render the store and type names, so cached lists are stale,
+    # and so are per-row ETags and sync cursors, which follow updated_at.
+    if not (created or raw):
+        instance.products.using(using).update(updated_at=timezone.now())
+        stock_summary.touch()
+
+
+@receiver(post_save, sender=Token)
+@receiver(post_delete, sender=Token)
+def invalidate_cached_token(sender, instance, **kwargs):
+    authentication.invalidate_token(instance.key)
+
+
+@receiver(post_save, sender=CustomUser)
+@receiver(post_delete, sender=CustomUser)
+def invalidate_cached_user_tokens(sender, instance, **kwargs):
+    authentication.invalidate_user(instance)
+
+
+@receiver(connection_created)
+def tune_sqlite_connection(sender, connection, **kwargs):
+    if connection.vendor == "sqlite" and sqlite.tuning().get("ENABLED"):
+        sqlite.apply_pragmas(connection.connection)
+
+
+@receiver(connection_created)
+def instrument_connection(sender, connection, **kwargs):
+    metrics.instrument_connection(connection)
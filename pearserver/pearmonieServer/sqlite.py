@@ -0,0 +1,104 @@
+"""
+Opt-in SQLite tuning profile, enabled with ``SQLITE_TUNING["ENABLED"]``.
+
+Every new SQLite connection gets WAL journaling (readers no longer block the
+writer), ``synchronous=NORMAL`` (fsync at checkpoints rather than on every
+commit, which is durable under WAL except against power loss), a memory map,
+a larger page cache and a busy timeout so a second process waits for the
+write lock instead of failing with "database is locked".
+
+SQLite allows one writer at a time, and a transaction that starts by reading
+and then writes cannot wait for the lock: it fails at once. Inside a
+process, writes are therefore queued on a single lock by
+``SQLiteWriteQueueMiddleware``. Between processes, the busy timeout covers
+them. Views whose writes are single statements or start with the write,
+such as login and signup, are marked ``@skip_write_queue`` and bypass the
+lock, so a slow password hash never holds up catalog writes.
+"""
+import threading
+from contextlib import ExitStack, contextmanager
+
+from django.conf import settings
+from django.db import connections
+
+PRAGMAS = (
+    ("JOURNAL_MODE", "journal_mode"),
+    ("SYNCHRONOUS", "synchronous"),
+    ("MMAP_SIZE", "mmap_size"),
+    ("CACHE_SIZE", "cache_size"),
+    ("BUSY_TIMEOUT", "busy_timeout"),
+)
+
+_write_lock = threading.Lock()
+
+
+def tuning():
+    return getattr(settings, "SQLITE_TUNING", {"ENABLED": False})
+
+
+def enabled(alias="default"):
+    return tuning().get("ENABLED", False) and connections[alias].vendor == "sqlite"
+
+
+def apply_pragmas(connection, options=None):
+    """Run the profile's ``PRAGMA`` statements on a raw SQLite connection."""
+    options = options or tuning()
+    for key, pragma in PRAGMAS:
+        if options.get(key) is not None:
+            connection.execute(f"PRAGMA {pragma} = {options[key]}")
+
+
+def pragmas(connection):
+    return {
+        pragma: connection.execute(f"PRAGMA {pragma}").fetchone()[0]
+        for _, pragma in PRAGMAS
+    }
+
+
+@contextmanager
+def write_lock(alias="default"):
+    """
+    Hold the process-wide writer lock for the block. Gives up waiting after
+    the busy timeout and lets SQLite's own lock decide instead.
+    """
+    if not enabled(alias):
+        yield
+        return
+    acquired = _write_lock.acquire(timeout=tuning().get("BUSY_TIMEOUT", 5000) / 1000)
+    try:
+        yield
+    finally:
+        if acquired:
+            _write_lock.release()
+
+
+def skip_write_queue(view):
+    """Let ``view`` run without queueing on the writer lock."""
+    view.skip_write_queue = True
+    return view
+
+
+class SQLiteWriteQueueMiddleware:
+    SAFE_METHODS = ("GET", "HEAD", "OPTIONS")
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        try:
+            return self.get_response(request)
+        finally:
+            held = request.__dict__.pop("_sqlite_write_lock", None)
+            if held is not None:
+                held.close()
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        # Resolved here rather than in __call__ so the view's mark is known.
+        if request.method in self.SAFE_METHODS:
+            return None
+        if getattr(view_func, "skip_write_queue", False):
+            return None
+        held = ExitStack()
+        held.enter_context(write_lock())
+        request._sqlite_write_lock = held
+        return None
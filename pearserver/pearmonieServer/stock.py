@@ -0,0 +1,79 @@
+"""
+Atomic stock adjustments.
+
+Each adjustment is a single ``UPDATE ... SET stock = stock + delta`` guarded
+against going negative, so concurrent sales never lose updates and the rest
+of the product row is left alone. Every applied delta is appended to the
+``StockMovement`` ledger in the same transaction.
+"""
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from . import events, stock_summary
+from .models import Products, StockMovement
+from .routers import pinned_to_primary
+
+
+class StockAdjustmentError(Exception):
+    def __init__(self, product_id, message):
+        super().__init__(message)
+        self.product_id = product_id
+        self.message = message
+
+
+class ProductNotFound(StockAdjustmentError):
+    pass
+
+
+class InsufficientStock(StockAdjustmentError):
+    pass
+
+
+def adjust_stock(adjustments, user=None):
+    """
+    Apply ``[{"id", "delta", "reason"}]`` all-or-nothing and return
+    ``[{"id", "delta", "stock"}]`` in the order given.
+
+    Rows are updated in primary key order so concurrent batches touching the
+    same products lock them in the same order instead of deadlocking.
+    """
+    now = timezone.now()
+    results = {}
+    changes = []
+    movements = []
+
+    with pinned_to_primary(), transaction.atomic():
+        for item in sorted(adjustments, key=lambda item: item["id"]):
+            product_id, delta = item["id"], item["delta"]
+            products = Products.objects.filter(pk=product_id)
+            guarded = products.filter(stock__gte=-delta) if delta < 0 else products
+            if not guarded.update(stock=F("stock") + delta, updated_at=now):
+                if products.exists():
+                    raise InsufficientStock(product_id, "Insufficient stock.")
+                raise ProductNotFound(product_id, "Product not found.")
+
+            after = products.values(
+                *Products.SUMMARY_FIELDS, "store__name", "type__name"
+            ).get()
+            changes.append(({**after, "stock": after["stock"] - delta}, after))
+            movements.append(
+                StockMovement(
+                    product_id=product_id,
+                    user=user,
+                    delta=delta,
+                    stock_after=after["stock"],
+                    reason=item.get("reason", ""),
+                    created_at=now,
+                )
+            )
+            results[product_id] = after["stock"]
+            events.stock_adjusted(product_id, delta, after)
+
+        StockMovement.objects.bulk_create(movements)
+        stock_summary.apply_changes(changes)
+
+    return [
+        {"id": item["id"], "delta": item["delta"], "stock": results[item["id"]]}
+        for item in adjustments
+    ]
@@ -0,0 +1,176 @@
+"""
+Incrementally maintained stock counters backing the dashboard.
+
+Every product write is turned into a ``(before, after)`` pair of
+``{"store_id", "type_id", "stock"}`` snapshots (``None`` for a missing side) and
+applied as counter deltas with ``F()`` updates, so reading the dashboard is a
+single-row lookup instead of a scan of ``Products``.
+
+The summary row also carries the catalog ``version``, bumped on every product
+write, which read endpoints use as a cheap validator for conditional GETs.
+The bump runs after the write commits, in its own statement. Inside the
+write's transaction it would hold the row lock until commit and queue every
+concurrent writer behind it. A reader may briefly see new rows under the old
+version, which only costs a cache entry; the reverse, old rows cached under
+the new version, cannot happen.
+"""
+from collections import defaultdict
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, F, Q
+from django.utils import timezone
+
+from .models import Products, ProductType, StockBreakdown, StockSummary, Store
+from .routers import pinned_to_primary
+
+SUMMARY_ID = 1
+
+
+def low_stock_threshold():
+    return getattr(settings, "LOW_STOCK_THRESHOLD", 10)
+
+
+def snapshot(product):
+    return {field: getattr(product, field) for field in Products.SUMMARY_FIELDS}
+
+
+def load_snapshot(product_id, using="default"):
+    return (
+        Products.objects.using(using)
+        .filter(pk=product_id)
+        .values(*Products.SUMMARY_FIELDS)
+        .first()
+    )
+
+
+def apply_changes(changes):
+    """Apply an iterable of ``(before, after)`` snapshots to the counters."""
+    changes = list(changes)
+    if not changes:
+        return
+
+    threshold = low_stock_threshold()
+    deltas = defaultdict(lambda: [0, 0])
+    for before, after in changes:
+        for row, sign in ((before, -1), (after, 1)):
+            if row is None:
+                continue
+            delta = deltas[(row["store_id"], row["type_id"])]
+            delta[0] += sign
+            delta[1] += sign if row["stock"] < threshold else 0
+
+    deltas = {key: delta for key, delta in deltas.items() if any(delta)}
+    touch()
+    if not deltas:
+        return
+
+    with transaction.atomic():
+        updated = StockSummary.objects.filter(pk=SUMMARY_ID).update(
+            total_products=F("total_products") + sum(d[0] for d in deltas.values()),
+            low_stock_items=F("low_stock_items") + sum(d[1] for d in deltas.values()),
+            updated_at=timezone.now(),
+        )
+        if not updated:
+            # Never built: count from scratch, which already includes this write.
+            rebuild()
+            return
+        for (store_id, type_id), (total, low) in deltas.items():
+            StockBreakdown.objects.get_or_create(store_id=store_id, type_id=type_id)
+            StockBreakdown.objects.filter(store_id=store_id, type_id=type_id).update(
+                total_products=F("total_products") + total,
+                low_stock_items=F("low_stock_items") + low,
+            )
+
+
+def touch():
+    """Bump the catalog version once the current transaction commits."""
+    transaction.on_commit(bump_version)
+
+
+def bump_version():
+    with pinned_to_primary():
+        updated = StockSummary.objects.filter(pk=SUMMARY_ID).update(
+            version=F("version") + 1, updated_at=timezone.now()
+        )
+    if not updated:
+        rebuild()
+
+
+def compute():
+    """
+    Count the catalog from scratch:
+    ``(totals, {(store_id, type_id): (total, low)})``.
+    """
+    low = Q(stock__lt=low_stock_threshold())
+    rows = Products.objects.values("store_id", "type_id").annotate(
+        total=Count("id"), low=Count("id", filter=low)
+    )
+    breakdown = {
+        (row["store_id"], row["type_id"]): (row["total"], row["low"]) for row in rows
+    }
+    totals = (
+        sum(total for total, _ in breakdown.values()),
+        sum(low for _, low in breakdown.values()),
+    )
+    return totals, breakdown
+
+
+def rebuild():
+    """Replace all counters with a fresh count of the catalog."""
+    with pinned_to_primary(), transaction.atomic():
+        (total, low), breakdown = compute()
+        values = {
+            "total_products": total,
+            "low_stock_items": low,
+            "updated_at": timezone.now(),
+        }
+        updated = StockSummary.objects.filter(pk=SUMMARY_ID).update(
+            version=F("version") + 1, **values
+        )
+        if not updated:
+            StockSummary.objects.create(pk=SUMMARY_ID, version=1, **values)
+        StockBreakdown.objects.all().delete()
+        StockBreakdown.objects.bulk_create(
+            StockBreakdown(
+                store_id=store_id, type_id=type_id, total_products=t, low_stock_items=l
+            )
+            for (store_id, type_id), (t, l) in breakdown.items()
+        )
+
+
+def reconcile():
+    """Return a list of human readable differences between counters and catalog."""
+    with pinned_to_primary():
+        (total, low), breakdown = compute()
+        summary = StockSummary.objects.filter(pk=SUMMARY_ID).first()
+        stored = {
+            (row.store_id, row.type_id): (row.total_products, row.low_stock_items)
+            for row in StockBreakdown.objects.all()
+        }
+        stores = Store.objects.in_bulk()
+        types = ProductType.objects.in_bulk()
+    if summary is None:
+        return ["stock summary has not been built"]
+
+    problems = []
+    if (summary.total_products, summary.low_stock_items) != (total, low):
+        problems.append(
+            f"totals: stored ({summary.total_products}, {summary.low_stock_items}) "
+            f"!= actual ({total}, {low})"
+        )
+    for key in sorted(set(stored) | set(breakdown)):
+        if stored.get(key, (0, 0)) != breakdown.get(key, (0, 0)):
+            problems.append(
+                f"{stores[key[0]]} / {types[key[1]]}: stored {stored.get(key, (0, 0))} "
+                f"!= actual {breakdown.get(key, (0, 0))}"
+            )
+    return problems
+
+
+def get_summary():
+    summary = StockSummary.objects.filter(pk=SUMMARY_ID).first()
+    if summary is None:
+        rebuild()
+        summary = StockSummary.objects.using("default").get(pk=SUMMARY_ID)
+    return summary
@@ -0,0 +1,153 @@
+"""
+Delta sync feed for ``GET /api/products/changes/?since=<cursor>``.
+
+Every product write path stamps ``updated_at`` and every delete leaves a
+``ProductTombstone``. The feed walks both streams in ``(timestamp, id)``
+order from the client's cursor, using the ``(updated_at, id)`` index, and
+returns the changed rows plus the ids of deleted products.
+
+Timestamps are taken before commit, so a slow transaction can commit a row
+stamped earlier than rows another client has already seen. Once a client
+has caught up, its cursor is therefore held ``LAG_SECONDS`` behind the
+start of the scan. A page that reaches past that point ends the sync with
+``has_more`` false rather than offer a cursor that would return the same
+page. The next sync may repeat a few recent rows, which clients simply
+upsert again. Tombstones older than ``TOMBSTONE_DAYS`` are compacted away, so a
+cursor records when its sync began and is rejected once that is older than
+the window; the client must then resync from scratch. The position itself
+may be much older, e.g. while paging through rows nobody has edited lately.
+"""
+import base64
+import json
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.conf import settings
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from .api.fast_serializers import PRODUCT_FIELDS, iter_product_rows
+from .models import Products, ProductTombstone
+from .tasks import task
+from .routers import pinned_to_primary
+
+DEFAULTS = {
+    "PAGE_SIZE": 500,
+    "MAX_PAGE_SIZE": 5000,
+    "LAG_SECONDS": 5,
+    "TOMBSTONE_DAYS": 30,
+}
+
+EPOCH = datetime(1970, 1, 1, tzinfo=dt_timezone.utc)
+
+
+class InvalidCursor(Exception):
+    pass
+
+
+class CursorExpired(Exception):
+    pass
+
+
+def sync_settings():
+    return {**DEFAULTS, **getattr(settings, "PRODUCT_SYNC", {})}
+
+
+def encode_cursor(key, issued):
+    moment, pk = key
+    payload = json.dumps(
+        {"t": moment.isoformat(), "id": pk, "i": issued.isoformat()},
+        separators=(",", ":"),
+    )
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def parse_moment(value):
+    moment = parse_datetime(value)
+    if moment is None or timezone.is_naive(moment):
+        raise ValueError("bad timestamp")
+    return moment
+
+
+def decode_cursor(encoded):
+    """Return ``((timestamp, id), issued)``; cursors from before ``issued``
+    was recorded fall back to their position."""
+    try:
+        padded = encoded + "=" * (-len(encoded) % 4)
+        cursor = json.loads(base64.urlsafe_b64decode(padded.encode()).decode())
+        moment = parse_moment(cursor["t"])
+        issued = parse_moment(cursor["i"]) if "i" in cursor else moment
+        return (moment, int(cursor["id"])), issued
+    except (TypeError, ValueError, KeyError, AttributeError):
+        raise InvalidCursor("Invalid cursor.")
+
+
+def after(time_field, id_field, key):
+    moment, pk = key
+    return Q(**{f"{time_field}__gt": moment}) | Q(
+        **{time_field: moment, f"{id_field}__gt": pk}
+    )
+
+
+def changes(since=None, limit=None, fields=None):
+    """
+    Return ``{"changed": [...], "deleted": [...], "cursor", "has_more"}`` for
+    everything after the ``since`` cursor (from the beginning when ``None``).
+    """
+    config = sync_settings()
+    limit = min(limit or config["PAGE_SIZE"], config["MAX_PAGE_SIZE"])
+    fields = tuple(fields or PRODUCT_FIELDS)
+    if "id" not in fields:
+        fields = ("id",) + fields
+    start = timezone.now()
+
+    key, issued = decode_cursor(since) if since else ((EPOCH, 0), start)
+    if issued < start - timedelta(days=config["TOMBSTONE_DAYS"]):
+        raise CursorExpired("Cursor is older than the sync window; resync.")
+
+    # A replica that lags behind would make the cursor skip rows for good.
+    with pinned_to_primary():
+        rows = Products.objects.filter(after("updated_at", "id", key)).order_by(
+            "updated_at", "id"
+        )
+        items = [
+            ((row.pop("updated_at"), row["id"]), row)
+            for row in iter_product_rows(rows[: limit + 1], fields + ("updated_at",))
+        ]
+        # A first sync has nothing to delete.
+        if since:
+            tombstones = (
+                ProductTombstone.objects.filter(after("deleted_at", "product_id", key))
+                .order_by("deleted_at", "product_id")
+                .values_list("deleted_at", "product_id")[: limit + 1]
+            )
+            items.extend(((deleted_at, pk), None) for deleted_at, pk in tombstones)
+
+    items.sort(key=lambda item: item[0])
+    has_more = len(items) > limit
+    page = items[:limit]
+    horizon = (start - timedelta(seconds=config["LAG_SECONDS"]), 0)
+    if has_more and page[-1][0] <= horizon:
+        next_key = page[-1][0]
+    else:
+        # The page reaches rows too recent to step past. They are sent again
+        # on the next poll, and paging on now would repeat this page.
+        has_more = False
+        next_key = max(key, horizon)
+
+    return {
+        "changed": [row for _, row in page if row is not None],
+        "deleted": [item_key[1] for item_key, row in page if row is None],
+        # Paging through one sync keeps the time it began.
+        "cursor": encode_cursor(next_key, issued if has_more else start),
+        "has_more": has_more,
+    }
+
+
+@task(name="compact_tombstones")
+def compact_tombstones(days=None, now=None):
+    """Delete tombstones older than the sync window; returns how many."""
+    days = sync_settings()["TOMBSTONE_DAYS"] if days is None else days
+    horizon = (now or timezone.now()) - timedelta(days=days)
+    deleted, _ = ProductTombstone.objects.filter(deleted_at__lt=horizon).delete()
+    return deleted
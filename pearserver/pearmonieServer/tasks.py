@@ -0,0 +1,167 @@
+"""
+A small database-backed background task queue.
+
+Functions registered with ``@task`` are queued with ``func.enqueue(**payload)``,
+which only inserts a ``Task`` row. The insert is part of the caller's
+transaction, so rolled-back work never runs. ``manage.py run_tasks``
+processes queued tasks outside the request cycle:
+
+* Workers claim up to ``TASK_QUEUE["BATCH_SIZE"]`` due tasks per poll. Each
+  claim is a conditional ``UPDATE``, so several workers never run the same
+  task twice, on SQLite or Postgres.
+* A failing task is retried with exponential backoff
+  (``RETRY_BACKOFF * 2 ** (attempts - 1)`` seconds) until it has run
+  ``max_attempts`` times, and is then marked failed with its last error.
+* A task left ``running`` longer than ``LEASE_SECONDS``, because its worker
+  died, is claimed again.
+
+* ``TASK_QUEUE["PERIODIC"]`` maps task names to an interval in seconds.
+  The worker queues each of them again one interval after its last run
+  finished, so recurring jobs need no cron.
+
+With ``TASK_QUEUE["EAGER"]`` set, ``enqueue`` runs the task inline instead,
+which is convenient for local development without a worker.
+"""
+import logging
+import traceback
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import Task
+
+logger = logging.getLogger(__name__)
+
+DEFAULTS = {
+    "EAGER": False,
+    "BATCH_SIZE": 20,
+    "POLL_INTERVAL": 1.0,
+    "RETRY_BACKOFF": 10,
+    "LEASE_SECONDS": 300,
+    "MAX_ATTEMPTS": 3,
+    "PERIODIC": {},
+}
+
+REGISTRY = {}
+
+
+def queue_settings():
+    return {**DEFAULTS, **getattr(settings, "TASK_QUEUE", {})}
+
+
+def task(name=None, max_attempts=None):
+    """Register a function as a task; it gains ``.enqueue(**payload)``."""
+
+    def register(func):
+        task_name = name or f"{func.__module__}.{func.__name__}"
+        REGISTRY[task_name] = func
+
+        def enqueue(run_at=None, **payload):
+            return enqueue_task(
+                task_name, payload, run_at=run_at, max_attempts=max_attempts
+            )
+
+        func.task_name = task_name
+        func.enqueue = enqueue
+        return func
+
+    return register
+
+
+def enqueue_task(name, payload, run_at=None, max_attempts=None):
+    if name not in REGISTRY:
+        raise KeyError(f"Unknown task {name!r}")
+    config = queue_settings()
+    task_row = Task.objects.create(
+        name=name,
+        payload=payload,
+        run_at=run_at or timezone.now(),
+        max_attempts=max_attempts or config["MAX_ATTEMPTS"],
+    )
+    if config["EAGER"]:
+        execute(task_row)
+    return task_row
+
+
+def claim(batch_size, now=None):
+    """Mark up to ``batch_size`` due tasks as running and return them."""
+    now = now or timezone.now()
+    stale = now - timedelta(seconds=queue_settings()["LEASE_SECONDS"])
+    due = Q(status=Task.PENDING, run_at__lte=now) | Q(
+        status=Task.RUNNING, locked_at__lt=stale
+    )
+    claimed = []
+    candidates = Task.objects.filter(due).order_by("run_at", "id")
+    for candidate in candidates.values("id", "status", "locked_at")[:batch_size]:
+        won = Task.objects.filter(
+            pk=candidate["id"],
+            status=candidate["status"],
+            locked_at=candidate["locked_at"],
+        ).update(status=Task.RUNNING, locked_at=now)
+        if won:
+            claimed.append(candidate["id"])
+    return list(Task.objects.filter(pk__in=claimed).order_by("run_at", "id"))
+
+
+def execute(task_row):
+    """Run one claimed task and record the outcome; returns True on success."""
+    func = REGISTRY.get(task_row.name)
+    task_row.attempts += 1
+    try:
+        if func is None:
+            raise LookupError(f"Unknown task {task_row.name!r}")
+        with transaction.atomic():
+            result = func(**task_row.payload)
+    except Exception:
+        task_row.last_error = traceback.format_exc()
+        task_row.locked_at = None
+        if task_row.attempts >= task_row.max_attempts:
+            task_row.status = Task.FAILED
+            task_row.finished_at = timezone.now()
+            logger.error(
+                "Task %s failed permanently:\n%s", task_row, task_row.last_error
+            )
+        else:
+            delay = queue_settings()["RETRY_BACKOFF"] * 2 ** (task_row.attempts - 1)
+            task_row.status = Task.PENDING
+            task_row.run_at = timezone.now() + timedelta(seconds=delay)
+            logger.warning("Task %s failed, retrying in %ss.", task_row, delay)
+        task_row.save()
+        return False
+
+    task_row.status = Task.DONE
+    task_row.result = result
+    task_row.locked_at = None
+    task_row.finished_at = timezone.now()
+    task_row.save()
+    return True
+
+
+def schedule_periodic(now=None):
+    """Queue the next run of every periodic task with none queued; returns them."""
+    now = now or timezone.now()
+    queued = []
+    for name, interval in queue_settings()["PERIODIC"].items():
+        runs = Task.objects.filter(name=name)
+        if runs.filter(status__in=(Task.PENDING, Task.RUNNING)).exists():
+            continue
+        last = (
+            runs.exclude(finished_at=None)
+            .order_by("-finished_at")
+            .values_list("finished_at", flat=True)
+            .first()
+        )
+        run_at = max(now, last + timedelta(seconds=interval)) if last else now
+        queued.append(enqueue_task(name, {}, run_at=run_at))
+    return queued
+
+
+def run_pending(batch_size=None):
+    """Claim and run one batch of due tasks; returns how many ran."""
+    tasks = claim(batch_size or queue_settings()["BATCH_SIZE"])
+    for task_row in tasks:
+        execute(task_row)
+    return len(tasks)
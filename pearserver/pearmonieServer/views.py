@@ -1,3 +1,15 @@
-from django.shortcuts import render
+from django.conf import settings
+from django.utils.cache import patch_cache_control
+from django.views.static import serve
 
-# Create your views here.
+# Media files are named by content hash (see media.py), so a URL never
+# changes content and browsers and CDNs may keep it indefinitely.
+MEDIA_MAX_AGE = 60 * 60 * 24 * 365
+
+
+def serve_media(request, path):
+    """Serve an uploaded file from ``MEDIA_ROOT`` with long-lived caching."""
+    response = serve(request, path, document_root=settings.MEDIA_ROOT)
+    if response.status_code == 200:
+        patch_cache_control(response, public=True, max_age=MEDIA_MAX_AGE, immutable=True)
+    return response
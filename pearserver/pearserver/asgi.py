@@ -13,4 +13,9 @@ from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'pearserver.settings')
 
-application = get_asgi_application()
+django_application = get_asgi_application()
+
+# Imported once Django is set up; see pearmonieServer/api/streams.py.
+from pearmonieServer.api.streams import watch_disconnect  # noqa: E402
+
+application = watch_disconnect(django_application)
@@ -0,0 +1,117 @@
+"""
+Logging setup used through ``LOGGING_CONFIG``.
+
+After the usual ``dictConfig``, when ``LOGGING["queue"]`` is true, the
+handlers of every configured logger are moved behind a ``QueueHandler``.
+Request threads then only put the record on an in-memory queue, and a
+``QueueListener`` thread formats it and writes it to the file. A full queue
+drops records and counts them rather than blocking the request.
+
+The stdlib ``QueueHandler.prepare()`` formats each record on the calling
+thread so it can be pickled; the queue never leaves the process, so records
+are passed on as they are.
+
+Every worker process appends to the same log file, which a plain
+``RotatingFileHandler`` cannot rotate safely. ``SharedRotatingFileHandler``
+rotates it under a file lock once it reaches ``maxBytes``, and the other
+processes reopen the new file like a ``WatchedFileHandler`` would.
+"""
+import atexit
+import logging
+import logging.config
+import os
+import queue
+from logging.handlers import QueueHandler, QueueListener, WatchedFileHandler
+
+try:
+    import fcntl
+except ImportError:  # Windows: a single development process, no lock needed
+    fcntl = None
+
+_listeners = {}
+
+
+class SharedRotatingFileHandler(WatchedFileHandler):
+    """
+    ``WatchedFileHandler`` that also keeps the file under ``maxBytes``,
+    keeping ``backupCount`` rotated copies (``maxBytes=0`` leaves rotation
+    to logrotate).
+    """
+
+    def __init__(self, filename, maxBytes=0, backupCount=5, **kwargs):
+        super().__init__(filename, **kwargs)
+        self.maxBytes = maxBytes
+        self.backupCount = backupCount
+
+    def emit(self, record):
+        self.reopenIfNeeded()
+        if self.maxBytes and self.stream is not None:
+            if os.fstat(self.stream.fileno()).st_size >= self.maxBytes:
+                self.rotate()
+        logging.FileHandler.emit(self, record)
+
+    def rotate(self):
+        with open(self.baseFilename + ".lock", "a") as lock:
+            if fcntl is not None:
+                fcntl.flock(lock, fcntl.LOCK_EX)
+            # Another process may have rotated while this one waited.
+            try:
+                full = os.stat(self.baseFilename).st_size >= self.maxBytes
+            except FileNotFoundError:
+                full = False
+            if full:
+                for n in range(self.backupCount - 1, 0, -1):
+                    source = f"{self.baseFilename}.{n}"
+                    if os.path.exists(source):
+                        os.replace(source, f"{self.baseFilename}.{n + 1}")
+                if self.backupCount:
+                    os.replace(self.baseFilename, self.baseFilename + ".1")
+                else:
+                    os.remove(self.baseFilename)
+        self.reopenIfNeeded()
+
+
+class DroppingQueueHandler(QueueHandler):
+    def __init__(self, queue_):
+        super().__init__(queue_)
+        self.dropped = 0
+
+    def prepare(self, record):
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+def enqueue_handlers(logger, maxsize):
+    """Replace ``logger``'s handlers with a queue feeding a listener thread."""
+    handlers = tuple(logger.handlers)
+    if not handlers:
+        return
+    if handlers not in _listeners:
+        handler = DroppingQueueHandler(queue.Queue(maxsize))
+        listener = QueueListener(handler.queue, *handlers, respect_handler_level=True)
+        listener.start()
+        atexit.register(listener.stop)
+        _listeners[handlers] = (handler, listener)
+    logger.handlers = [_listeners[handlers][0]]
+
+
+def stop_listener(handler):
+    """Flush and stop the listener thread draining ``handler``'s queue."""
+    for handlers, (queued, listener) in list(_listeners.items()):
+        if queued is handler:
+            atexit.unregister(listener.stop)
+            listener.stop()
+            del _listeners[handlers]
+
+
+def configure(config):
+    logging.config.dictConfig(config)
+    if config.get("queue"):
+        maxsize = config.get("queue_maxsize", 10000)
+        for name in config.get("loggers", {}):
+            enqueue_handlers(logging.getLogger(name), maxsize)
@@ -3,6 +3,8 @@ from pathlib import Path
 
 from dotenv import load_dotenv
 
+from .database import parse_database_url
+
 # Load environment variables
 load_dotenv()
 
@@ -33,12 +35,15 @@ INSTALLED_APPS = [
 
 # Middleware
 MIDDLEWARE = [
+    "pearmonieServer.metrics.MetricsMiddleware",
     "corsheaders.middleware.CorsMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
     "django.contrib.auth.middleware.AuthenticationMiddleware",
+    "pearmonieServer.routers.ReplicaPinningMiddleware",
+    "pearmonieServer.sqlite.SQLiteWriteQueueMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
 ]
@@ -64,14 +69,62 @@ TEMPLATES = [
 
 WSGI_APPLICATION = "pearserver.wsgi.application"
 
-# Database
+# Database: DATABASE_URL (sqlite:///db.sqlite3 or postgres://...) and an
+# optional read replica at DATABASE_REPLICA_URL
+DATABASE_CONNECTION = {
+    # Keep connections open between requests and ping them before reuse
+    "CONN_MAX_AGE": int(os.getenv("DB_CONN_MAX_AGE", "60")),
+    "CONN_HEALTH_CHECKS": True,
+}
 DATABASES = {
     "default": {
-        "ENGINE": "django.db.backends.sqlite3",
-        "NAME": BASE_DIR / "db.sqlite3",
+        **parse_database_url(os.getenv("DATABASE_URL", "sqlite:///db.sqlite3"), BASE_DIR),
+        **DATABASE_CONNECTION,
+    }
+}
+if os.getenv("DATABASE_REPLICA_URL"):
+    DATABASES["replica"] = {
+        **parse_database_url(os.getenv("DATABASE_REPLICA_URL"), BASE_DIR),
+        **DATABASE_CONNECTION,
+        "TEST": {"MIRROR": "default"},
     }
+
+# Opt-in SQLite tuning profile applied to every new connection, plus one
+# in-process writer at a time (see pearmonieServer/sqlite.py)
+SQLITE_TUNING = {
+    "ENABLED": os.getenv("SQLITE_TUNING", "False").lower() == "true",
+    "JOURNAL_MODE": "WAL",
+    "SYNCHRONOUS": "NORMAL",
+    "MMAP_SIZE": int(os.getenv("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024))),
+    # Negative values are KiB: 64 MiB of page cache per connection
+    "CACHE_SIZE": int(os.getenv("SQLITE_CACHE_SIZE", str(-64 * 1024))),
+    "BUSY_TIMEOUT": int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000")),
+}
+
+# Catalog reads go to the replica unless the client wrote within the last
+# REPLICA_STICKY_SECONDS; the marker lives in REPLICA_STICKY_CACHE_ALIAS,
+# which must be shared between workers in production
+DATABASE_ROUTERS = ["pearmonieServer.routers.PrimaryReplicaRouter"]
+REPLICA_DATABASE_ALIAS = "replica"
+REPLICA_STICKY_SECONDS = int(os.getenv("REPLICA_STICKY_SECONDS", "5"))
+REPLICA_STICKY_CACHE_ALIAS = os.getenv("REPLICA_STICKY_CACHE_ALIAS", "default")
+
+# Production server launched by `manage.py serve`
+SERVER = {
+    "MODE": os.getenv("SERVER_MODE", "asgi"),
+    "BIND": os.getenv("SERVER_BIND", f"0.0.0.0:{os.getenv('PORT', '8000')}"),
+    "WORKERS": int(os.getenv("WEB_CONCURRENCY", "0")) or None,
+    "THREADS": int(os.getenv("SERVER_THREADS", "4")),
+    "TIMEOUT": int(os.getenv("SERVER_TIMEOUT", "30")),
+    "MAX_REQUESTS": int(os.getenv("SERVER_MAX_REQUESTS", "10000")),
 }
 
+# Serve the read-only endpoints through async views (enabled by `serve` in ASGI mode)
+ASYNC_READ_VIEWS = os.getenv("ASYNC_READ_VIEWS", "False").lower() == "true"
+
+# Logins look the user up once and skip hashing for unknown emails
+AUTHENTICATION_BACKENDS = ["pearmonieServer.backends.EmailBackend"]
+
 # Password Validation
 AUTH_PASSWORD_VALIDATORS = [
     {
@@ -82,6 +135,95 @@ AUTH_PASSWORD_VALIDATORS = [
     {"NAME": "django.contrib.auth.password_validation.NumericPasswordValidator"},
 ]
 
+# Password hashing: PASSWORD_HASHER picks the hasher for new hashes
+# (pbkdf2, scrypt, or argon2 which needs argon2-cffi). Hashes made by the
+# others keep verifying and are upgraded at the user's next login.
+PASSWORD_HASHER_CHOICES = {
+    "pbkdf2": "django.contrib.auth.hashers.PBKDF2PasswordHasher",
+    "scrypt": "pearmonieServer.hashers.TunedScryptPasswordHasher",
+    "argon2": "pearmonieServer.hashers.TunedArgon2PasswordHasher",
+}
+PASSWORD_HASHER = os.getenv("PASSWORD_HASHER", "pbkdf2")
+PASSWORD_HASHERS = [
+    PASSWORD_HASHER_CHOICES[PASSWORD_HASHER],
+    *(path for name, path in PASSWORD_HASHER_CHOICES.items() if name != PASSWORD_HASHER),
+]
+PASSWORD_HASHER_COST = {
+    "SCRYPT_WORK_FACTOR": int(os.getenv("SCRYPT_WORK_FACTOR", str(2**14))),
+    "ARGON2_TIME_COST": int(os.getenv("ARGON2_TIME_COST", "2")),
+    "ARGON2_MEMORY_COST": int(os.getenv("ARGON2_MEMORY_COST", "102400")),
+    "ARGON2_PARALLELISM": int(os.getenv("ARGON2_PARALLELISM", "8")),
+}
+
+# Login attempts allowed per email address and per client IP; throttled
+# attempts are rejected before any database query or password hashing
+LOGIN_THROTTLE = {
+    "ENABLED": os.getenv("LOGIN_THROTTLE_ENABLED", "True").lower() == "true",
+    "EMAIL_RATE": os.getenv("LOGIN_THROTTLE_EMAIL_RATE", "5/min"),
+    "IP_RATE": os.getenv("LOGIN_THROTTLE_IP_RATE", "30/min"),
+}
+
+# Delta sync feed (pearmonieServer/sync.py); tombstones are compacted daily
+# by the task worker (TASK_QUEUE["PERIODIC"]) or `manage.py compact_tombstones`
+PRODUCT_SYNC = {
+    "PAGE_SIZE": int(os.getenv("PRODUCT_SYNC_PAGE_SIZE", "500")),
+    "LAG_SECONDS": int(os.getenv("PRODUCT_SYNC_LAG_SECONDS", "5")),
+    "TOMBSTONE_DAYS": int(os.getenv("PRODUCT_SYNC_TOMBSTONE_DAYS", "30")),
+}
+
+# Product exports at /api/products/export/ (pearmonieServer/exports.py);
+# background exports are removed after KEEP_HOURS
+PRODUCT_EXPORTS = {
+    "CHUNK_SIZE": int(os.getenv("PRODUCT_EXPORT_CHUNK_SIZE", "2000")),
+    "KEEP_HOURS": int(os.getenv("PRODUCT_EXPORT_KEEP_HOURS", "24")),
+}
+
+# Server-Sent Events at /api/events/ (pearmonieServer/events.py); the
+# "redis" backend relays events between workers
+EVENTS = {
+    "ENABLED": os.getenv("EVENTS_ENABLED", "True").lower() == "true",
+    "BACKEND": os.getenv("EVENTS_BACKEND", "local"),
+    "REDIS_URL": os.getenv("EVENTS_REDIS_URL", "redis://localhost:6379/0"),
+    "QUEUE_SIZE": int(os.getenv("EVENTS_QUEUE_SIZE", "100")),
+    "HEARTBEAT_SECONDS": int(os.getenv("EVENTS_HEARTBEAT_SECONDS", "15")),
+}
+
+# Background tasks (pearmonieServer/tasks.py), run by `manage.py run_tasks`
+TASK_QUEUE = {
+    "EAGER": os.getenv("TASK_QUEUE_EAGER", "False").lower() == "true",
+    "BATCH_SIZE": int(os.getenv("TASK_QUEUE_BATCH_SIZE", "20")),
+    "POLL_INTERVAL": float(os.getenv("TASK_QUEUE_POLL_INTERVAL", "1.0")),
+    "RETRY_BACKOFF": int(os.getenv("TASK_QUEUE_RETRY_BACKOFF", "10")),
+    "LEASE_SECONDS": int(os.getenv("TASK_QUEUE_LEASE_SECONDS", "300")),
+    "MAX_ATTEMPTS": int(os.getenv("TASK_QUEUE_MAX_ATTEMPTS", "3")),
+    # Recurring tasks the worker queues itself: name -> seconds between runs
+    "PERIODIC": {
+        "snapshot_inventory": 24 * 60 * 60,
+        "compact_tombstones": 24 * 60 * 60,
+    },
+}
+
+# One-time password reset codes
+OTP = {
+    "LENGTH": 6,
+    "TTL_SECONDS": int(os.getenv("OTP_TTL_SECONDS", "600")),
+    "MAX_ATTEMPTS": int(os.getenv("OTP_MAX_ATTEMPTS", "5")),
+}
+
+# Seconds a verified code's reset token can be used to set a new password
+PASSWORD_RESET_TIMEOUT = int(os.getenv("PASSWORD_RESET_TIMEOUT", "900"))
+
+# Email
+EMAIL_BACKEND = os.getenv(
+    "EMAIL_BACKEND", "django.core.mail.backends.console.EmailBackend"
+)
+EMAIL_HOST = os.getenv("EMAIL_HOST", "localhost")
+EMAIL_PORT = int(os.getenv("EMAIL_PORT", "25"))
+EMAIL_HOST_USER = os.getenv("EMAIL_HOST_USER", "")
+EMAIL_HOST_PASSWORD = os.getenv("EMAIL_HOST_PASSWORD", "")
+EMAIL_USE_TLS = os.getenv("EMAIL_USE_TLS", "False").lower() == "true"
+DEFAULT_FROM_EMAIL = os.getenv("DEFAULT_FROM_EMAIL", "PearStock <no-reply@pearstock.local>")
+
 # Custom User Model
 AUTH_USER_MODEL = "pearmonieServer.CustomUser"
 
@@ -97,21 +239,94 @@ USE_TZ = True
 
 # Static Files
 STATIC_URL = "static/"
+
+# Uploaded product images (pearmonieServer/media.py). Files are named by
+# content hash, so they are served with a one-year immutable Cache-Control.
+MEDIA_ROOT = Path(os.getenv("MEDIA_ROOT", BASE_DIR / "media"))
+MEDIA_URL = os.getenv("MEDIA_URL", "/media/")
+SERVE_MEDIA = os.getenv("SERVE_MEDIA", "True").lower() == "true"
+STORAGES = {
+    "default": {
+        "BACKEND": os.getenv(
+            "MEDIA_STORAGE_BACKEND", "django.core.files.storage.FileSystemStorage"
+        ),
+    },
+    "staticfiles": {
+        "BACKEND": "django.contrib.staticfiles.storage.StaticFilesStorage",
+    },
+    # Background product exports; kept out of MEDIA_ROOT, which may be
+    # served publicly, and downloaded through the API instead.
+    "exports": {
+        "BACKEND": os.getenv(
+            "EXPORT_STORAGE_BACKEND", "django.core.files.storage.FileSystemStorage"
+        ),
+        "OPTIONS": {"location": os.getenv("EXPORT_ROOT", str(BASE_DIR / "exports"))},
+    },
+}
+PRODUCT_IMAGES = {
+    "MAX_BYTES": int(os.getenv("PRODUCT_IMAGE_MAX_BYTES", str(5 * 1024 * 1024))),
+    "THUMBNAIL_SIZE": int(os.getenv("PRODUCT_THUMBNAIL_SIZE", "256")),
+    "THUMBNAIL_FORMAT": os.getenv("PRODUCT_THUMBNAIL_FORMAT", "WEBP"),
+}
 # Default Primary Key Field Type
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
 # REST Framework Configuration
 REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": [
-        "rest_framework.authentication.TokenAuthentication",
+        "pearmonieServer.api.authentication.CachedTokenAuthentication",
+    ],
+    "DEFAULT_RENDERER_CLASSES": [
+        "pearmonieServer.api.renderers.FastJSONRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
     ],
     "DEFAULT_PERMISSION_CLASSES": [
         "rest_framework.permissions.IsAuthenticated",
     ],
     "DEFAULT_PAGINATION_CLASS": "rest_framework.pagination.PageNumberPagination",
     "PAGE_SIZE": 50,
+    # Reverse proxies in front of the app; throttles read the client IP from
+    # X-Forwarded-For only this many hops deep (0: use REMOTE_ADDR)
+    "NUM_PROXIES": int(os.getenv("NUM_PROXIES", "0")),
+}
+
+# Token authentication cache: a shared Django cache alias when set, so logouts
+# are seen by every worker at once, otherwise an in-process LRU
+TOKEN_AUTH_CACHE = {
+    "MAXSIZE": int(os.getenv("TOKEN_AUTH_CACHE_MAXSIZE", "1024")),
+    "LOCAL_TTL": int(os.getenv("TOKEN_AUTH_CACHE_LOCAL_TTL", "60")),
+    "TTL": int(os.getenv("TOKEN_AUTH_CACHE_TTL", "300")),
+    "CACHE_ALIAS": os.getenv("TOKEN_AUTH_CACHE_ALIAS") or None,
+}
+
+# Rows written per INSERT ... ON CONFLICT batch by POST /api/products/bulk/
+PRODUCT_BULK_BATCH_SIZE = int(os.getenv("PRODUCT_BULK_BATCH_SIZE", "500"))
+
+# Product list result cache: "local" in-process LRU or "django" to use the
+# PRODUCT_LIST_CACHE_ALIAS cache (e.g. Redis) shared by every worker
+PRODUCT_LIST_CACHE = {
+    "ENABLED": os.getenv("PRODUCT_LIST_CACHE_ENABLED", "True").lower() == "true",
+    "BACKEND": os.getenv("PRODUCT_LIST_CACHE_BACKEND", "local"),
+    "MAXSIZE": int(os.getenv("PRODUCT_LIST_CACHE_MAXSIZE", "256")),
+    "MAX_BYTES": int(os.getenv("PRODUCT_LIST_CACHE_MAX_BYTES", str(32 * 1024 * 1024))),
+    "CACHE_ALIAS": os.getenv("PRODUCT_LIST_CACHE_ALIAS", "default"),
+    "TTL": int(os.getenv("PRODUCT_LIST_CACHE_TTL", "300")),
 }
 
+# Request metrics served at /api/metrics/; slow requests are logged with
+# their heaviest queries, and with query plans when EXPLAIN_QUERIES is set
+# (EXPLAIN runs on the request thread, so leave it at 0 unless diagnosing)
+METRICS = {
+    "ENABLED": os.getenv("METRICS_ENABLED", "True").lower() == "true",
+    "SLOW_REQUEST_MS": int(os.getenv("SLOW_REQUEST_MS", "500")),
+    "SLOW_SAMPLE_RATE": float(os.getenv("SLOW_REQUEST_SAMPLE_RATE", "1.0")),
+    "SLOW_QUERIES": int(os.getenv("SLOW_REQUEST_QUERIES", "5")),
+    "EXPLAIN_QUERIES": int(os.getenv("SLOW_REQUEST_EXPLAIN_QUERIES", "0")),
+}
+
+# Product search backend (dotted path); picked from the database vendor when unset
+PRODUCT_SEARCH_BACKEND = os.getenv("PRODUCT_SEARCH_BACKEND") or None
+
 #SSL settings for production
 SECURE_PROXY_SSL_HEADER = ("HTTP_X_FORWARDED_PROTO", "https")
 
@@ -130,25 +345,45 @@ SECURE_PROXY_SSL_HEADER = ("HTTP_X_FORWARDED_PROTO", "https")
 #         os.getenv("SECURE_CONTENT_TYPE_NOSNIFF", "True").lower() == "true"
 #     )
 
+# Records go through an in-memory queue to a listener thread (LOG_QUEUE) and
+# into LOG_FILE, which is rotated once it reaches LOG_MAX_BYTES, keeping
+# LOG_BACKUP_COUNT old files (see pearserver/log.py). Set LOG_MAX_BYTES=0 to
+# rotate with logrotate instead. SQL statements are only logged when
+# SQL_LOG_LEVEL=DEBUG.
+LOG_LEVEL = os.getenv("LOG_LEVEL", "DEBUG" if DEBUG else "INFO").upper()
+LOGGING_CONFIG = "pearserver.log.configure"
 LOGGING = {
     "version": 1,
     "disable_existing_loggers": False,
+    "queue": os.getenv("LOG_QUEUE", "True").lower() == "true",
+    "queue_maxsize": int(os.getenv("LOG_QUEUE_MAXSIZE", "10000")),
+    "formatters": {
+        "verbose": {
+            "format": "%(asctime)s %(levelname)s %(name)s %(process)d %(message)s",
+        },
+    },
     "handlers": {
         "file": {
-            "level": "DEBUG",
-            "class": "logging.FileHandler",
-            "filename": "debug.log",
+            "level": LOG_LEVEL,
+            "class": "pearserver.log.SharedRotatingFileHandler",
+            "filename": os.getenv("LOG_FILE", "debug.log"),
+            "maxBytes": int(os.getenv("LOG_MAX_BYTES", str(10 * 1024 * 1024))),
+            "backupCount": int(os.getenv("LOG_BACKUP_COUNT", "5")),
+            "formatter": "verbose",
         },
     },
     "loggers": {
         "django": {
             "handlers": ["file"],
-            "level": "DEBUG",
+            "level": LOG_LEVEL,
             "propagate": True,
         },
+        "django.db.backends": {
+            "level": os.getenv("SQL_LOG_LEVEL", "INFO").upper(),
+        },
         "pearmonieServer": {
             "handlers": ["file"],
-            "level": "DEBUG",
+            "level": LOG_LEVEL,
             "propagate": True,
         },
     },
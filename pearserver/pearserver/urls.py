@@ -1,9 +1,14 @@
+import re
+
+from django.conf import settings
 from django.contrib import admin
-from django.urls import path, include
+from django.urls import path, include, re_path
 from rest_framework import permissions
 from drf_yasg.views import get_schema_view
 from drf_yasg import openapi
 
+from pearmonieServer.views import serve_media
+
 schema_view = get_schema_view(
     openapi.Info(
         title="PearStock API",
@@ -21,4 +26,14 @@ urlpatterns = [
     path('api/', include('pearmonieServer.api.urls')),
     path('swagger/', schema_view.with_ui('swagger', cache_timeout=0), name='schema-swagger-ui'),
     path('redoc/', schema_view.with_ui('redoc', cache_timeout=0), name='schema-redoc'),
-]
\ No newline at end of file
+]
+
+if settings.SERVE_MEDIA and settings.MEDIA_URL.startswith("/"):
+    # Without a web server or CDN in front, serve uploads from the app.
+    urlpatterns.append(
+        re_path(
+            r"^%s(?P<path>.*)$" % re.escape(settings.MEDIA_URL.lstrip("/")),
+            serve_media,
+            name="media",
+        )
+    )
@@ -4,6 +4,7 @@ import Image from "next/image";
 import Link from "next/link";
 const loginpic = "/loginpic.png";
 const VerifyOtp: React.FC = () => {
+  const [email, setEmail] = useState("");
   const [otp, setOtp] = useState("");
 
   const handleOTPVerification = async (e: React.FormEvent) => {
@@ -12,6 +13,7 @@ const VerifyOtp: React.FC = () => {
       const response = await axios.post(
         `${process.env.NEXT_PUBLIC_API_URL}/api/verify-otp/`,
         {
+          email,
           otp,
         },
       );
@@ -39,6 +41,22 @@ const VerifyOtp: React.FC = () => {
         <h1 className="text-2xl font-bold mb-4">Verify OTP</h1>
         <p className="mb-6">Enter the OTP sent to your email</p>
         <form onSubmit={handleOTPVerification}>
+          <div className="mb-4">
+            <label
+              htmlFor="email"
+              className="block text-sm font-medium text-gray-700"
+            >
+              Email
+            </label>
+            <input
+              type="email"
+              id="email"
+              value={email}
+              onChange={(e) => setEmail(e.target.value)}
+              required
+              className="mt-1 block w-full px-3 py-2 border border-gray-300 rounded-md shadow-sm focus:outline-none focus:ring-indigo-500 focus:border-indigo-500 sm:text-sm"
+            />
+          </div>
           <div className="mb-4">
             <label
               htmlFor="otp"